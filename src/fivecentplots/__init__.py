@@ -1,2 +1,3 @@
 from .fcp import *  # noqa
 from .fcp import __version__  # noqa
+from .fcp import __getattr__  # noqa, lazy theme values
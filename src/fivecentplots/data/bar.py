@@ -53,7 +53,10 @@ class Bar(data.Data):
 
         # Apply a custom filter
         if self.filter:
-            self.df_all = utl.df_filter(self.df_all, self.filter)
+            if self.batch is not None:
+                self.df_all = self.batch.df_filter(self.df_all, self.filter)
+            else:
+                self.df_all = utl.df_filter(self.df_all, self.filter)
             if len(self.df_all) == 0:
                 raise data.DataError('DataFrame is empty after applying filter')
 
@@ -69,7 +72,7 @@ class Bar(data.Data):
     def _get_data_ranges(self):
         """Barplot-specific data range calculator by subplot."""
         # First get any user defined range values and apply optional auto scaling
-        df_fig = self.df_fig.copy()  # use temporarily for setting ranges
+        df_fig = self.df_fig  # use temporarily for setting ranges (read-only)
         self._get_data_ranges_user_defined()
         df_fig = self._get_auto_scale(df_fig)
 
@@ -84,9 +87,9 @@ class Bar(data.Data):
             if self.share_y and ir == 0 and ic == 0:
                 df_rc = df_fig
             elif self.share_row:
-                df_rc = df_fig[df_fig[self.row[0]] == self.row_vals[ir]].copy()
+                df_rc = df_fig[df_fig[self.row[0]] == self.row_vals[ir]]
             elif self.share_col:
-                df_rc = df_fig[df_fig[self.col[0]] == self.col_vals[ic]].copy()
+                df_rc = df_fig[df_fig[self.col[0]] == self.col_vals[ic]]
             elif self.share_y and ir > 0 or ic > 0:
                 self._add_range(ir, ic, 'y', 'min', self.ranges[0, 0]['ymin'])
                 self._add_range(ir, ic, 'y', 'max', self.ranges[0, 0]['ymax'])
@@ -1,5 +1,6 @@
 from . import data
 import pdb
+import numpy as np
 import pandas as pd
 from .. import utilities
 from natsort import natsorted
@@ -19,10 +20,12 @@ class Box(data.Data):
         req = ['y']
         opt = []
 
+        self._changes_cache = {}  # group keys -> (indices, changes)
+
         super().__init__(name, req, opt, **kwargs)
 
     def _get_groups(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Return the groupby keys of a DataFrame
+        """Return the groupby keys of a DataFrame (in no particular order)
 
         Args:
             df: input DataFrame
@@ -30,7 +33,11 @@ class Box(data.Data):
         Returns:
             DataFrame of the groupby keys
         """
-        return pd.DataFrame(df.groupby(self.groups).groups.keys())
+        if df is self.df_all:
+            # cached for every subplot
+            return pd.DataFrame(self._get_group_vals(df, self.groups))
+
+        return pd.DataFrame(utl.group_vals(df, self.groups, sort=False))
 
     def get_box_index_changes(self):
         """Make a DataFrame that shows when groups vals change; used for grouping
@@ -50,34 +57,36 @@ class Box(data.Data):
                     self.groups.remove(group)
                     print('Column "%s" for at least one subplot is all NaN and will be excluded from plot' % group)
 
-        # Get the changes df
+        # Get the group keys (only the keys are needed so skip building every group subset)
         if self.groups is None or self.groups == []:
-            groups = [(None, self.df_rc.copy())]
+            gidx = [None]
             self.ngroups = 0
         else:
-            groups = self.df_rc.groupby(self.groups, sort=self.sort)
-            self.ngroups = groups.ngroups
+            idx = self._get_group_index(self.df_rc, self.groups)
+            gidx = list(idx.keys())
+            if not self.sort:
+                # restore the order of first appearance
+                gidx = sorted(gidx, key=lambda f: idx[f][0] if len(idx[f]) > 0 else len(self.df_rc))
+            self.ngroups = len(idx)
+
+        # The three calls per subplot (data subset, label sizing, label placement) usually see the same keys
+        key = (tuple(self.groups or []), self.sort, tuple(gidx))
+        if key in self._changes_cache:
+            self.indices, self.changes = self._changes_cache[key]
+            return
 
         # Order the group labels with natsorting
-        gidx = []
-        for i, (nn, g) in enumerate(groups):
-            gidx += [nn]
         if self.sort:
             gidx = natsorted(gidx)
         self.indices = pd.DataFrame(gidx)
-        self.changes = self.indices.copy()
-
-        # Set initial level to 1
-        for col in self.indices.columns:
-            self.changes.loc[0, col] = 1
-
-        # Determines values for all other rows
-        for i in range(1, self.ngroups):
-            for col in self.indices.columns:
-                if self.indices[col].iloc[i - 1] == self.indices[col].iloc[i]:
-                    self.changes.loc[i, col] = 0
-                else:
-                    self.changes.loc[i, col] = 1
+
+        # Flag the first box and every box where a grouping level differs from the previous box
+        vals = self.indices.values
+        changes = np.ones(vals.shape, dtype=int)
+        changes[1:] = vals[1:] != vals[:-1]
+        self.changes = pd.DataFrame(changes, columns=self.indices.columns)
+
+        self._changes_cache[key] = (self.indices, self.changes)
 
     def get_rc_subset(self):
         """Override of parent method to subset the data by the row/col/wrap values.
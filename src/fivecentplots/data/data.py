@@ -1,6 +1,4 @@
 import pdb
-from natsort import natsorted
-import scipy.stats as ss
 import pandas as pd
 import numpy as np
 from .. import utilities
@@ -126,8 +124,12 @@ class Data:
 
         # Define DataFrames
         self.df_all = self._check_df(kwargs['df'])
+        self.batch = kwargs.get('batch', None)  # fcp.Batch with cached filters and groups of the DataFrame
+        if self.batch is not None and kwargs['df'] is not self.batch.df:
+            self.batch = None
         self.df_fig = None
         self.df_sub = None
+        self._group_index = {}  # cached positional indices and values of the groups in a DataFrame subset
         self.changes = pd.DataFrame()  # used with boxplots
         self.indices = pd.DataFrame()  # used with boxplots
 
@@ -178,6 +180,7 @@ class Data:
         # Apply an optional filter to the data
         self.filter = kwargs.get('filter', None)
         self._filter_data(kwargs)
+        self._df_batch = self.df_all
 
         # Define rc grouping column names
         self.col = kwargs.get('col', None)
@@ -473,7 +476,10 @@ class Data:
             kwargs: user-defined keyword args
         """
         if self.filter:
-            self.df_all = utl.df_filter(self.df_all, self.filter)
+            if self.batch is not None:
+                self.df_all = self.batch.df_filter(self.df_all, self.filter)
+            else:
+                self.df_all = utl.df_filter(self.df_all, self.filter)
             if len(self.df_all) == 0:
                 raise DataError('DataFrame is empty after applying filter')
 
@@ -520,12 +526,19 @@ class Data:
         --> Some plot types need to override this func with a custom calc.
         """
         # First get any user defined range values and apply optional auto scaling
-        df_fig = self.df_fig.copy()  # use temporarily for setting ranges
+        df_fig = self.df_fig  # use temporarily for setting ranges (read-only)
         self._get_data_ranges_user_defined()
         df_fig = self._get_auto_scale(df_fig)
 
+        # Grouped min/max tables (built on first use) so each subplot range is a lookup instead of a new subset
+        groups = self._get_range_groups()
+        rc_stats = None
+        row_stats = None
+        col_stats = None
+
         # Apply shared axes
         for ir, ic, plot_num in self._get_subplot_index():
+            df_rc = None
             for ax in self.axs:
                 # Share axes (use self.df_fig to get global min/max)
                 if getattr(self, 'share_%s' % ax) and (ir > 0 or ic > 0):
@@ -548,7 +561,12 @@ class Data:
                         df_sub[self.y[ir]] = df_fig[self.y[ir]].values
                         vals = self._get_data_range(ax, df_sub, plot_num)
                     else:
-                        vals = self._get_data_range(ax, df_fig[self.df_fig[self.row[0]] == self.row_vals[ir]], plot_num)
+                        if row_stats is None and groups is not None:
+                            row_stats = self._get_range_stats(df_fig, self.row)
+                        vals = self._get_data_range_from_stats(ax, self.row_vals[ir], plot_num, row_stats)
+                        if vals is None:
+                            vals = self._get_data_range(ax, df_fig[self.df_fig[self.row[0]] == self.row_vals[ir]],
+                                                        plot_num)
                     self._add_range(ir, ic, ax, 'min', vals[0])
                     self._add_range(ir, ic, ax, 'max', vals[1])
 
@@ -563,13 +581,29 @@ class Data:
                         df_sub[self.y[0]] = df_fig[self.y[0]].values
                         vals = self._get_data_range(ax, df_sub, plot_num)
                     else:
-                        vals = self._get_data_range(ax, df_fig[df_fig[self.col[0]] == self.col_vals[ic]], plot_num)
+                        if col_stats is None and groups is not None:
+                            col_stats = self._get_range_stats(df_fig, self.col)
+                        vals = self._get_data_range_from_stats(ax, self.col_vals[ic], plot_num, col_stats)
+                        if vals is None:
+                            vals = self._get_data_range(ax, df_fig[df_fig[self.col[0]] == self.col_vals[ic]], plot_num)
                     self._add_range(ir, ic, ax, 'min', vals[0])
                     self._add_range(ir, ic, ax, 'max', vals[1])
 
                 # subplot level when not shared
                 else:
-                    df_rc = self._subset(ir, ic)
+                    if rc_stats is None and groups is not None:
+                        if self.wrap is not None:
+                            # same update of the wrap values as in self._subset_wrap
+                            self.wrap_vals = self._get_group_vals(self.df_fig, self.wrap)
+                        rc_stats = self._get_range_stats(self.df_fig, groups)
+                    vals = self._get_data_range_from_stats(ax, self._get_range_key(ir, ic), plot_num, rc_stats)
+                    if vals is not None:
+                        self._add_range(ir, ic, ax, 'min', vals[0])
+                        self._add_range(ir, ic, ax, 'max', vals[1])
+                        continue
+
+                    if df_rc is None:
+                        df_rc = self._subset(ir, ic)
 
                     # Empty rc
                     if len(df_rc) == 0:  # this doesn't exist yet!
@@ -614,25 +648,33 @@ class Data:
         """
         if float(self.interval[0]) > 1:
             self.interval[0] = float(self.interval[0]) / 100
-        stat = pd.DataFrame()
-        stat['mean'] = df[[x, y]].groupby(x).mean().reset_index()[y]
-        stat['count'] = df[[x, y]].groupby(x).count().reset_index()[y]
-        stat['std'] = df[[x, y]].groupby(x).std().reset_index()[y]
-        stat['sderr'] = stat['std'] / np.sqrt(stat['count'])
-        stat['ucl'] = np.nan
-        stat['lcl'] = np.nan
-        for irow, row in stat.iterrows():
-            if row['std'] == 0:
-                conf = [row['mean'], row['mean']]
-            else:
-                conf = ss.t.interval(self.interval[0], int(row['count']) - 1,
-                                     loc=row['mean'], scale=row['sderr'])
-            stat.loc[irow, 'ucl'] = conf[1]
-            stat.loc[irow, 'lcl'] = conf[0]
 
-        self.stat_idx = df.groupby(x).mean().index
-        self.lcl = stat['lcl']
-        self.ucl = stat['ucl']
+        values, codes, self.stat_idx = self._get_interval_groups(df, x, y)
+        stats = utl.group_stats(values, codes, len(self.stat_idx), conf_coeff=self.interval[0])
+
+        # No spread means no interval
+        same = (stats['std'] == 0).values
+        self.lcl = pd.Series(np.where(same, stats['mean'], stats['ci_low']))
+        self.ucl = pd.Series(np.where(same, stats['mean'], stats['ci_high']))
+
+    def _get_interval_groups(self, df: pd.DataFrame, x: str, y: str) -> [np.ndarray, np.ndarray, pd.Index]:
+        """Group the y values of a curve by their x value for the interval calculations.
+
+        Args:
+            df: data subset
+            x: x column name
+            y: y column name
+
+        Returns:
+            y values (NaNs removed)
+            index of the x value of each y value
+            sorted unique x values
+        """
+        codes, xvals = pd.factorize(df[x], sort=True)
+        values = df[y].values.astype(float)
+        keep = (codes >= 0) & ~np.isnan(values)
+
+        return values[keep], codes[keep], pd.Index(xvals, name=x)
 
     def get_interval_nq(self, df: pd.DataFrame, x: str, y: str, **kwargs) -> None:
         """Calculate normal quantile intervals point by point for a curve.
@@ -646,6 +688,8 @@ class Data:
         Returns:
             None but calculates ucl and lcl data columns
         """
+        import scipy.stats as ss
+
         # figure out the nq range kwargs
         decimals = max(utl.get_decimals(self.interval[0]),
                        utl.get_decimals(self.interval[1]))
@@ -656,33 +700,29 @@ class Data:
             step_inner = 1
             step_tail = 1 / 10**decimals
 
-        # also what about not in range?
-        lcl, ucl = [], []
-        lower = df[[x, y]].groupby(x).quantile(0.5)  # is this the best way?
-
-        for idx, (nn, gg) in enumerate(df[[x, y]].groupby(x)):
-            nq = utl.nq(gg[y], step_inner=step_inner, step_tail=step_tail)
-            nq.Sigma = nq.Sigma.apply(lambda x: round(x, decimals))
-            if self.interval[0] in nq.Sigma.values:
-                lcl += [nq.loc[nq.Sigma == self.interval[0], 'Value'].iloc[0]]
-            else:
-                closest = nq['Sigma'].sub(self.interval[0]).abs().idxmin()
-                sigma = nq.Sigma.iloc[closest]
-                if idx == 0:
-                    print(f'IntervalCalc: sigma={self.interval[0]} not available; using closest value of {sigma}')
-                lcl += [nq.Value.iloc[closest]]
-            if self.interval[1] in nq.Sigma.values:
-                ucl += [nq.loc[nq.Sigma == self.interval[1], 'Value'].iloc[0]]
-            else:
-                closest = nq['Sigma'].sub(self.interval[1]).abs().idxmin()
-                sigma = nq.Sigma.iloc[closest]
-                if idx == 0:
-                    print(f'IntervalCalc: sigma={self.interval[1]} not available; using closest value of {sigma}')
-                ucl += [nq.Value.iloc[closest]]
-
-        self.lcl = pd.Series(lcl)
-        self.ucl = pd.Series(ucl)
-        self.stat_idx = lower.reset_index()[x]
+        values, codes, xvals = self._get_interval_groups(df, x, y)
+        count = np.bincount(codes, minlength=len(xvals))
+
+        # The available sigma values of utl.nq only depend on the group size (see utl.sigma), so find the closest
+        # available sigma for each distinct size instead of for each x value
+        with np.errstate(divide='ignore'):
+            sig = np.round(np.trunc(10 * abs(ss.norm.ppf(1 / np.maximum(count, 2)))) / 10)
+        sigmas = np.tile(np.asarray(self.interval[:2], dtype=float), (len(xvals), 1))
+        for smax in np.unique(sig):
+            tail = min(3, smax)
+            index = np.round(np.concatenate([np.arange(-smax, -tail, step_tail),
+                                             np.arange(-tail, tail, step_inner),
+                                             np.arange(tail, smax + 1e-9, step_tail)]), decimals)
+            for ii in range(2):
+                if self.interval[ii] not in index:
+                    sigmas[sig == smax, ii] = index[np.abs(index - self.interval[ii]).argmin()]
+        for ii in range(2):
+            if len(sigmas) > 0 and sigmas[0, ii] != self.interval[ii]:
+                print(f'IntervalCalc: sigma={self.interval[ii]} not available; using closest value of {sigmas[0, ii]}')
+
+        self.lcl = pd.Series(utl.group_quantile(values, codes, len(xvals), ss.norm.cdf(sigmas[:, 0])))
+        self.ucl = pd.Series(utl.group_quantile(values, codes, len(xvals), ss.norm.cdf(sigmas[:, 1])))
+        self.stat_idx = pd.Series(xvals)
 
     def get_interval_percentile(self, df: pd.DataFrame, x: str, y: str, **kwargs) -> None:
         """Calculate percentile intervals point by point for a curve.
@@ -697,10 +737,10 @@ class Data:
             None but calculates ucl and lcl data columns
 
         """
-        lower = df[[x, y]].groupby(x).quantile(self.interval[0])
-        self.lcl = lower.reset_index()[y]
-        self.ucl = df[[x, y]].groupby(x).quantile(self.interval[1]).reset_index()[y]
-        self.stat_idx = lower.reset_index()[x]
+        values, codes, xvals = self._get_interval_groups(df, x, y)
+        self.lcl = pd.Series(utl.group_quantile(values, codes, len(xvals), self.interval[0]))
+        self.ucl = pd.Series(utl.group_quantile(values, codes, len(xvals), self.interval[1]))
+        self.stat_idx = pd.Series(xvals)
 
     def _get_data_range(self, ax: str, df: pd.DataFrame, plot_num: int) -> tuple:
         """Determine the min/max values for a given axis based on user inputs.
@@ -737,18 +777,76 @@ class Data:
         if 'str' in dtypes or 'object' in dtypes or 'datetime64[ns]' in dtypes:
             return None, None
 
-        # Calculate actual min / max vals for the axis
+        # Calculate actual min / max vals for the axis (column-wise to avoid stacking the data)
+        if self.ax_scale in ['log%s' % ax, 'loglog', 'semilog%s' % ax, 'log']:
+            axmin = dfax.where(dfax > 0).min().min()
+        else:
+            axmin = dfax.min().min()
+        axmax = dfax.max().max()
+
+        return self._get_data_range_limits(ax, axmin, axmax, plot_num, df, cols)
+
+    def _get_data_range_from_stats(self, ax: str, key, plot_num: int, stats: [dict, None]) -> [tuple, None]:
+        """Determine the min/max values for a given axis of a subplot from a table of grouped stats.
+
+        Args:
+            ax: name of the axis ('x', 'y', etc)
+            key: group value of the subplot in the stats table
+            plot_num: index number of the current subplot
+            stats: grouped stats from self._get_range_stats
+
+        Returns:
+            min, max tuple or None if the range must be calculated from the data subset
+        """
+        if stats is None:
+            return None
+        if not hasattr(self, ax) or getattr(self, ax) in [None, []]:
+            return None, None
+
+        # Quantile-based limits need the actual data
+        if isinstance(getattr(self, '%smin' % ax)[plot_num], str) \
+                or isinstance(getattr(self, '%smax' % ax)[plot_num], str):
+            return None
+
+        cols = getattr(self, ax)
+        if any(f not in stats['cols'] for f in cols):
+            return None
+        if key not in stats['index']:
+            return None, None
+
+        irow = stats['index'][key]
+        icols = [stats['cols'].index(f) for f in cols]
+        if self.ax_scale in ['log%s' % ax, 'loglog', 'semilog%s' % ax, 'log']:
+            axmin = np.fmin.reduce(stats['posmin'][irow, icols])
+        else:
+            axmin = np.fmin.reduce(stats['min'][irow, icols])
+        axmax = np.fmax.reduce(stats['max'][irow, icols])
+
+        return self._get_data_range_limits(ax, axmin, axmax, plot_num)
+
+    def _get_data_range_limits(self, ax: str, axmin: float, axmax: float, plot_num: int,
+                               df: [pd.DataFrame, None] = None, cols: [list, None] = None) -> tuple:
+        """Apply padding and user-specified limits to the data min/max values of an axis.
+
+        Args:
+            ax: name of the axis ('x', 'y', etc)
+            axmin: min data value of the axis (min positive value for log scales)
+            axmax: max data value of the axis
+            plot_num: index number of the current subplot
+            df (optional): data table used for quantile-based limits. Defaults to None.
+            cols (optional): column names of the axis in df. Defaults to None.
+
+        Returns:
+            min, max tuple
+        """
         if self.ax_scale in ['log%s' % ax, 'loglog', 'semilog%s' % ax, 'log']:
-            axmin = dfax[dfax > 0].stack().min()
-            axmax = dfax.stack().max()
             axdelta = np.log10(axmax) - np.log10(axmin)
         else:
-            axmin = dfax.stack().min()
-            axmax = dfax.stack().max()
             axdelta = axmax - axmin
         if axdelta <= 0:
             axmin -= 0.1 * axmin
             axmax += 0.1 * axmax
+        dfax = df[cols] if df is not None else None
 
         # Check user-specified min values
         vmin = getattr(self, '%smin' % ax)[plot_num]
@@ -840,9 +938,13 @@ class Data:
 
         return vmin, vmax
 
-    def get_df_figure(self):
+    def get_df_figure(self, ifigs: [list, None] = None):
         """Generator to subset the main DataFrame based on fig_item grouping.
 
+        Args:
+            ifigs (optional): only yield the figures with these index values (used to split the figures between
+                parallel workers). Defaults to None which yields all figures.
+
         Yields:
             figure index (None if no self.fig_vals)
             figure value (i.e., unique value in the self.fig DataFrame column)
@@ -863,16 +965,9 @@ class Data:
         else:
             # with fig grouping
             for ifig, fig_val in enumerate(self.fig_vals):
-                if isinstance(fig_val, tuple):
-                    for ig, gg in enumerate(fig_val):
-                        if ig == 0:
-                            self.df_fig = self.df_all[self.df_all[self.fig_groups[ig]] == gg].copy()
-                        else:
-                            self.df_fig = self.df_fig[self.df_fig[self.fig_groups[ig]] == gg]
-                elif isinstance(self.fig_groups, list):
-                    self.df_fig = self.df_all[self.df_all[self.fig_groups[0]] == fig_val].copy()
-                else:
-                    self.df_fig = self.df_all[self.df_all[self.fig_groups] == fig_val].copy()
+                if ifigs is not None and ifig not in ifigs:
+                    continue
+                self.df_fig = self._subset_group(self.df_all, self.fig, utl.validate_list(fig_val))
 
                 self._get_legend_groupings(self.df_fig)
                 self._get_rc_groupings(self.df_fig)
@@ -880,6 +975,7 @@ class Data:
                 yield ifig, fig_val, self.fig, self
 
         self.df_fig = None
+        self._group_index = {}
 
     def _get_fig_groupings(self):
         """Determine the figure grouping levels."""
@@ -893,73 +989,195 @@ class Data:
         Args:
             ir: current axes row index
             ic: current axes column index
-            df: data subset
+            df: data subset (not modified)
             x: x column name
             y: y column name
 
         Returns:
-            updated DataFrame
-            fit coefficients list
-            rsq (for poly fit only)
+            new DataFrame with only the fit columns
+            fit coefficients list (empty for a spline)
+            rsq
         """
-        df2 = df.copy()
-        df['%s Fit' % x] = np.nan
-        df['%s Fit' % y] = np.nan
-
-        if self.fit is True or isinstance(self.fit, int):
-            # Set range of the fit
-            if isinstance(self.fit_range_x, list):
-                df2 = df2[(df2[x] >= self.fit_range_x[0])
-                          & (df2[x] <= self.fit_range_x[1])].copy()
-                if self.ranges[ir, ic]['ymin'] is not None:
-                    df2 = df2[(df2[y]) >= self.ranges[ir, ic]['ymin']]
-                if self.ranges[ir, ic]['ymax'] is not None:
-                    df2 = df2[(df2[y]) <= self.ranges[ir, ic]['ymax']]
-            elif isinstance(self.fit_range_y, list):
-                df2 = df2[(df2[y] >= self.fit_range_y[0])
-                          & (df2[y] <= self.fit_range_y[1])].copy()
-                if self.ranges[ir, ic]['xmin'] is not None:
-                    df2 = df2[(df2[x]) >= self.ranges[ir, ic]['xmin']]
-                if self.ranges[ir, ic]['xmax'] is not None:
-                    df2 = df2[(df2[x]) <= self.ranges[ir, ic]['xmax']]
+        return self.get_fit_data_groups(ir, ic, df, x, y, np.zeros(len(df), dtype=int), 1)[0]
+
+    def get_fit_data_groups(self, ir: int, ic: int, df: pd.DataFrame, x: str, y: str, codes: np.ndarray,
+                            ngroups: int) -> list:
+        """Make the fit data of every curve in a data subset at once.
+
+        Args:
+            ir: current axes row index
+            ic: current axes column index
+            df: data subset (not modified)
+            x: x column name
+            y: y column name
+            codes: curve index (0 to ngroups - 1) of each row of df; rows with a negative index are not fit
+            ngroups: number of curves
+
+        Returns:
+            list with the fit DataFrame, coefficients, and rsq of each curve (see get_fit_data)
+        """
+        spline = str(self.fit).lower() == 'spline'
+        codes = np.asarray(codes)
+        xx = df[x].values.astype(float)
+        yy = df[y].values.astype(float)
+
+        # Set range of the fit
+        keep = (codes >= 0) & ~np.isnan(xx) & ~np.isnan(yy)
+        ranges = self.ranges[ir, ic]
+        if isinstance(self.fit_range_x, list):
+            keep &= (xx >= self.fit_range_x[0]) & (xx <= self.fit_range_x[1])
+            limits = ['ymin', 'ymax']
+        elif isinstance(self.fit_range_y, list):
+            keep &= (yy >= self.fit_range_y[0]) & (yy <= self.fit_range_y[1])
+            limits = ['xmin', 'xmax']
+        else:
+            limits = ['xmin', 'xmax', 'ymin', 'ymax']
+        for limit in limits:
+            if ranges[limit] is not None:
+                vals = xx if limit[0] == 'x' else yy
+                keep &= vals >= ranges[limit] if limit[1:] == 'min' else vals <= ranges[limit]
+
+        # Fit every curve
+        count = np.bincount(codes[keep], minlength=ngroups)
+        if spline:
+            rows = np.flatnonzero(keep)[np.argsort(codes[keep], kind='stable')]
+            rows = np.split(rows, np.cumsum(count)[:-1])
+            splines = [self._fit_spline(xx[f], yy[f]) if len(f) > 0 else None for f in rows]
+            rsq = np.array([np.nan if f is None else f[1] for f in splines])
+        else:
+            coeffs, rsq = utl.group_polyfit(xx[keep], yy[keep], codes[keep], ngroups, int(self.fit))
+
+        # Fit lines spanning the x-axis range with the same number of points as each curve
+        valid = codes >= 0
+        order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')]
+        npts = np.bincount(codes[valid], minlength=ngroups)
+        start = np.concatenate([[0], np.cumsum(npts)[:-1]])
+        pos = np.arange(len(order)) - np.repeat(start, npts)
+        size = np.repeat(npts, npts)
+        xfit = pos * ((ranges['xmax'] - ranges['xmin']) / np.maximum(size - 1, 1)) + ranges['xmin']  # np.linspace
+        xfit[(pos == size - 1) & (size > 1)] = ranges['xmax']
+
+        # Fit values of all the curves in one DataFrame sliced by curve
+        yfit = np.full(len(order), np.nan)
+        curve = codes[order]
+        if spline:
+            for ig in np.flatnonzero(count > 0):
+                yfit[start[ig]:start[ig] + npts[ig]] = splines[ig][0](xfit[start[ig]:start[ig] + npts[ig]])
+        else:
+            yfit = np.zeros(len(order))
+            for coeff in coeffs[curve].T:  # Horner's method like np.polyval
+                yfit = yfit * xfit + coeff
+        fitted = count[curve] > 0
+        fit_all = pd.DataFrame({'%s Fit' % x: np.where(fitted, xfit, np.nan),
+                                '%s Fit' % y: np.where(fitted, yfit, np.nan)}, index=df.index[order])
+
+        fits = []
+        for ig in range(ngroups):
+            fit = fit_all.iloc[start[ig]:start[ig] + npts[ig]]
+            if count[ig] == 0:
+                fits += [(fit, [] if spline else np.ones(int(self.fit)) * np.nan, 0)]
             else:
-                df2 = df2.copy()
-                if self.ranges[ir, ic]['xmin'] is not None:
-                    df2 = df2[(df2[x]) >= self.ranges[ir, ic]['xmin']]
-                if self.ranges[ir, ic]['xmax'] is not None:
-                    df2 = df2[(df2[x]) <= self.ranges[ir, ic]['xmax']]
-                if self.ranges[ir, ic]['ymin'] is not None:
-                    df2 = df2[(df2[y]) >= self.ranges[ir, ic]['ymin']]
-                if self.ranges[ir, ic]['ymax'] is not None:
-                    df2 = df2[(df2[y]) <= self.ranges[ir, ic]['ymax']]
-
-            # Convert to arrays
-            xx = np.array(df2[x])
-            yy = np.array(df2[y])
-            if len(xx) == 0 or len(yy) == 0:
-                return df, np.ones(int(self.fit)) * np.nan, 0
-
-            # Fit the polynomial
-            coeffs = np.polyfit(xx, yy, int(self.fit))
-
-            # Find R^2
-            yval = np.polyval(coeffs, xx)
-            ybar = yy.sum() / len(yy)
-            ssreg = np.sum((yval - ybar)**2)
-            sstot = np.sum((yy - ybar)**2)
-            rsq = ssreg / sstot
-
-            # Add fit line
-            df['%s Fit' % x] = np.linspace(self.ranges[ir, ic]['xmin'],
-                                           self.ranges[ir, ic]['xmax'], len(df))
-            df['%s Fit' % y] = np.polyval(coeffs, df['%s Fit' % x])
-
-            return df, coeffs, rsq
-
-        # TODO:: put spline code here
-        # if str(self.fit).lower() == 'spline':
-
-        #     return df, [], np.nan
+                fits += [(fit, [] if spline else coeffs[ig], rsq[ig])]
+
+        return fits
+
+    def _fit_spline(self, xx: np.ndarray, yy: np.ndarray) -> [object, float]:
+        """Fit a cubic smoothing spline to one curve.
+
+        The smoothing is set by the noise estimated from the second differences of neighboring points and repeated x
+        values are replaced by their mean.
+
+        Args:
+            xx: x values
+            yy: y values
+
+        Returns:
+            spline function (or a constant for a single x value)
+            rsq
+        """
+        from scipy.interpolate import UnivariateSpline
+
+        xu, inv = np.unique(xx, return_inverse=True)
+        yu = np.bincount(inv, yy) / np.bincount(inv)
+        if len(xu) < 2:
+            return lambda f: np.full(len(f), yu[0]), np.nan
+        noise = np.std(np.diff(yu, 2)) / np.sqrt(6) if len(xu) > 2 else 0
+        spl = UnivariateSpline(xu, yu, w=np.full(len(xu), 1 / noise) if noise > 0 else None, k=min(3, len(xu) - 1),
+                               s=None if noise > 0 else 0)
+
+        yval = spl(xx)
+        ybar = yy.mean()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsq = np.sum((yval - ybar)**2) / np.sum((yy - ybar)**2)
+
+        return spl, rsq
+
+    def _get_group_cache(self, df: pd.DataFrame) -> tuple:
+        """Get the cache of the group indices and values of a DataFrame.
+
+        Caches are kept for self.df_all, self.df_fig and the most recent subset and are reset after each figure.
+
+        Args:
+            df: DataFrame to group
+
+        Returns:
+            tuple of (df, dict of group indices by column names, dict of group values by column names and sort)
+        """
+        entry = self._group_index.get(id(df))
+        if entry is None or entry[0] is not df:
+            # Only keep the full and figure DataFrame caches and the cache of this DataFrame
+            self._group_index = {k: v for k, v in self._group_index.items()
+                                 if v[0] is self.df_all or v[0] is self.df_fig}
+            entry = (df, {}, {})
+            self._group_index[id(df)] = entry
+
+        return entry
+
+    def _get_group_index(self, df: pd.DataFrame, cols: list) -> dict:
+        """Get the positional row indices of each unique group in a DataFrame.
+
+        The index is built with a single groupby and cached (see _get_group_cache) so that every fig/row/col/wrap/
+        legend subset is a positional take instead of a new boolean mask over the full DataFrame.
+
+        Args:
+            df: DataFrame to group
+            cols: grouping column names
+
+        Returns:
+            dict of {group value: np.array of row positions}; group values are scalars for a single column
+            and tuples for multiple columns
+        """
+        entry = self._get_group_cache(df)
+
+        key = tuple(cols)
+        if key not in entry[1] and self._use_batch(df, cols):
+            entry[1][key] = self.batch.get_group_index(self.filter, cols)
+        elif key not in entry[1]:
+            entry[1][key] = df.groupby(cols if len(cols) > 1 else cols[0], sort=False).indices
+
+        return entry[1][key]
+
+    def _get_group_vals(self, df: pd.DataFrame, cols: [str, list]) -> list:
+        """Get the unique values of grouping column(s).
+
+        The values are natsorted once and cached (see _get_group_cache) for every subplot of a figure.
+
+        Args:
+            df: DataFrame to group
+            cols: grouping column name(s)
+
+        Returns:
+            list of unique group values (natsorted if self.sort)
+        """
+        entry = self._get_group_cache(df)
+
+        key = (cols if isinstance(cols, str) else tuple(cols), self.sort)
+        if key not in entry[2] and self._use_batch(df, utl.validate_list(cols)):
+            entry[2][key] = self.batch.get_group_vals(self.filter, cols, self.sort)
+        elif key not in entry[2]:
+            entry[2][key] = utl.group_vals(df, cols, self.sort)
+
+        return list(entry[2][key])
 
     def _get_legend_groupings(self, df: pd.DataFrame):
         """Determine the legend groupings.
@@ -996,10 +1214,7 @@ class Data:
                         temp = temp.map(str) + ' | ' + df[leg].map(str)
                 self.legend = ' | '.join(self.legend)
                 df[self.legend] = temp
-            if self.sort:
-                legend_vals = natsorted(list(df.groupby(self.legend).groups.keys()))
-            else:
-                legend_vals = list(df.groupby(self.legend, sort=False).groups.keys())
+            legend_vals = self._get_group_vals(df, self.legend)
             self.nleg_vals = len(legend_vals)
         else:
             legend_vals = [None]
@@ -1108,7 +1323,7 @@ class Data:
 
                 # Subset by legend value
                 if row['Leg'] is not None:
-                    df2 = df[df[self.legend] == row['Leg']].copy()
+                    df2 = self._subset_group(df, [self.legend], [row['Leg']])
 
                 # Filter out all nan data
                 if row['x'] and row['x'] in df2.columns and len(df2[row['x']].dropna()) == 0 \
@@ -1124,6 +1339,83 @@ class Data:
                     None if self.z is None else self.z[0], row['names'], \
                     twin, len(self.legend_vals)
 
+    def _get_range_groups(self) -> [list, None]:
+        """Get the columns that define the row/col/wrap subsets if the subplot ranges can be calculated from
+        grouped stats.
+
+        Returns:
+            list of grouping column names or None if the ranges must be calculated from each data subset
+        """
+        # Plot types that modify the subsets or calculate the range differently need the actual subsets
+        if type(self)._subset_modify is not Data._subset_modify \
+                or type(self)._get_data_range is not Data._get_data_range:
+            return None
+
+        if self.wrap is not None:
+            return None if self.wrap in ['x', 'y'] else self.wrap
+        if self.row == 'y' or self.col == 'x':
+            return None
+
+        groups = (self.row if self.row is not None else []) + (self.col if self.col is not None else [])
+
+        return groups if len(groups) > 0 else None
+
+    def _get_range_key(self, ir: int, ic: int):
+        """Get the group value of a subplot that matches the index of self._get_range_stats.
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+
+        Returns:
+            group value (scalar for a single grouping column, tuple for multiple)
+        """
+        if self.wrap is not None:
+            if ir * self.ncol + ic > self.nwrap - 1:
+                return None
+            vals = utl.validate_list(self.wrap_vals[ir * self.ncol + ic])
+        else:
+            vals = ([self.row_vals[ir]] if self.row is not None else []) \
+                + ([self.col_vals[ic]] if self.col is not None else [])
+
+        return tuple(vals) if len(vals) > 1 else vals[0]
+
+    def _get_range_stats(self, df: pd.DataFrame, groups: [list, None]) -> [dict, None]:
+        """Calculate the min, max, and min positive value (for log scales) of each numeric axis column for all
+        groups in one grouped aggregation.
+
+        Args:
+            df: DataFrame to group
+            groups: grouping column names (None to skip)
+
+        Returns:
+            dict of the axis column names ('cols'), the row number of each group value ('index'), and the
+            'min', 'max', and 'posmin' arrays [group, column] or None
+        """
+        if groups is None:
+            return None
+
+        cols = []
+        for ax in self.axs:
+            for col in utl.validate_list(getattr(self, ax, None)) or []:
+                if col in df.columns and col not in cols and col not in groups \
+                        and pd.api.types.is_numeric_dtype(df[col]):
+                    cols += [col]
+
+        keys = [df[f] for f in groups]
+        grouped = df[cols].groupby(keys, sort=False, observed=True)
+        dfax = df[cols]
+
+        vmin = grouped.min()
+        vmax = grouped.max()
+        posmin = dfax.where(dfax > 0).groupby(keys, sort=False, observed=True).min().loc[vmin.index]
+
+        return {'cols': cols,
+                'index': {key: irow for irow, key in enumerate(vmin.index)},
+                'min': vmin.to_numpy(dtype=float),
+                'max': vmax.to_numpy(dtype=float),
+                'posmin': posmin.to_numpy(dtype=float)}
+
     def _get_rc_groupings(self, df: pd.DataFrame):
         """Determine the row and column or wrap grid groupings.
 
@@ -1133,10 +1425,7 @@ class Data:
         # Set up wrapping (wrap option overrides row/col)
         if self.wrap:
             if self.wrap_vals is None:  # this broke something but removing will cause other failures
-                if self.sort:
-                    self.wrap_vals = natsorted(list(df.groupby(self.wrap).groups.keys()))
-                else:
-                    self.wrap_vals = list(df.groupby(self.wrap, sort=False).groups.keys())
+                self.wrap_vals = self._get_group_vals(df, self.wrap)
             if self.ncols == 0:
                 rcnum = int(np.ceil(np.sqrt(len(self.wrap_vals))))
             else:
@@ -1150,18 +1439,12 @@ class Data:
             # Set up the row grouping
             if self.col:
                 if self.col_vals is None:
-                    if self.sort:
-                        self.col_vals = natsorted(list(df.groupby(self.col).groups.keys()))
-                    else:
-                        self.col_vals = list(df.groupby(self.col, sort=False).groups.keys())
+                    self.col_vals = self._get_group_vals(df, self.col)
                 self.ncol = len(self.col_vals)
 
             if self.row:
                 if self.row_vals is None:
-                    if self.sort:
-                        self.row_vals = natsorted(list(df.groupby(self.row).groups.keys()))
-                    else:
-                        self.row_vals = list(df.groupby(self.row, sort=False).groups.keys())
+                    self.row_vals = self._get_group_vals(df, self.row)
                 self.nrow = len(self.row_vals)
 
         if self.ncol == 0:
@@ -1265,6 +1548,24 @@ class Data:
 
         return df
 
+    def _subset_group(self, df: pd.DataFrame, cols: list, vals: list) -> pd.DataFrame:
+        """Select the rows of a DataFrame that match a group value using a precomputed group index.
+
+        Args:
+            df: DataFrame to subset
+            cols: grouping column names
+            vals: group values (one per column in cols)
+
+        Returns:
+            DataFrame subset (new object; rows in the original order)
+        """
+        index = self._get_group_index(df, cols)
+        idx = index.get(tuple(vals) if len(cols) > 1 else vals[0])
+        if idx is None:
+            return df.iloc[0:0].copy()
+
+        return df.take(idx)
+
     def _subset_modify(self, ir: int, ic: int, df: pd.DataFrame) -> pd.DataFrame:
         """Optional function in a Data childe class user to perform any additional
         DataFrame subsetting that may be required
@@ -1297,15 +1598,15 @@ class Data:
         if self.row not in [None, 'y'] and self.col not in [None, 'x']:
             row = self.row_vals[ir]
             col = self.col_vals[ic]
-            return self.df_fig[(self.df_fig[self.row[0]] == row) & (self.df_fig[self.col[0]] == col)].copy()
+            return self._subset_group(self.df_fig, [self.row[0], self.col[0]], [row, col])
         elif self.row not in [None, 'y'] and (not self.col or self.col in [None, 'x']):
             row = self.row_vals[ir]
-            return self.df_fig[(self.df_fig[self.row[0]] == row)].copy()
+            return self._subset_group(self.df_fig, [self.row[0]], [row])
         elif self.col not in [None, 'x'] and (not self.row or self.row in [None, 'y']):
             col = self.col_vals[ic]
-            return self.df_fig[(self.df_fig[self.col[0]] == col)].copy()
+            return self._subset_group(self.df_fig, [self.col[0]], [col])
         else:
-            return self.df_fig.copy()
+            return self.df_fig
 
     def _subset_wrap(self, ir: int, ic: int) -> pd.DataFrame:
         """For wrap plots, select the revelant subset from self.df_fig.
@@ -1337,14 +1638,9 @@ class Data:
                     if self.legend is not None else [])
             return self.df_fig[cols]
         else:
-            if self.sort:
-                self.wrap_vals = \
-                    natsorted(list(self.df_fig.groupby(self.wrap).groups.keys()))
-            else:
-                self.wrap_vals = list(self.df_fig.groupby(self.wrap, sort=False).groups.keys())
-            wrap = dict(zip(self.wrap,
-                        utl.validate_list(self.wrap_vals[ir * self.ncol + ic])))
-            return self.df_fig.loc[(self.df_fig[list(wrap)] == pd.Series(wrap)).all(axis=1)].copy()
+            self.wrap_vals = self._get_group_vals(self.df_fig, self.wrap)
+            wrap = utl.validate_list(self.wrap_vals[ir * self.ncol + ic])
+            return self._subset_group(self.df_fig, self.wrap, wrap)
 
     def swap_xy(self):
         """Swap the x and y axis attributes."""
@@ -1388,54 +1684,80 @@ class Data:
         if not transform:
             return
 
-        # Container for transformed data
-        df = pd.DataFrame()
-
-        # Transform by unique group
+        # Rows ordered by unique group (rows with a missing group value are dropped like in groupby)
         groups_all = self._groupers
         if len(groups_all) > 0:
-            groups = self.df_all.groupby(groups_all)
+            codes = self.df_all.groupby(groups_all).ngroup().values
+            order = np.argsort(codes, kind='stable')
+            df = self.df_all.iloc[order[codes[order] >= 0]].copy()
         else:
-            groups = [self.df_all]
-        for group in groups:
-            if isinstance(group, tuple):
-                gg = group[1]
-            else:
-                gg = group
-
-            axis = ['x', 'y', 'z']
+            df = self.df_all
 
-            for ax in axis:
-                vals = getattr(self, ax)
-                if not vals:
-                    continue
-                for ival, val in enumerate(vals):
-                    if getattr(self, 'trans_%s' % ax) == 'abs':
-                        gg.loc[:, val] = abs(gg[val])
-                    elif getattr(self, 'trans_%s' % ax) == 'negative' \
-                            or getattr(self, 'trans_%s' % ax) == 'neg':
-                        gg.loc[:, val] = -gg[val]
-                    elif getattr(self, 'trans_%s' % ax) == 'nq':
-                        if ival == 0:
-                            gg = utl.nq(gg[val], val, **self.kwargs)
-                    elif getattr(self, 'trans_%s' % ax) == 'inverse' \
-                            or getattr(self, 'trans_%s' % ax) == 'inv':
-                        gg.loc[:, val] = 1 / gg[val]
-                    elif (isinstance(getattr(self, 'trans_%s' % ax), tuple)
-                            or isinstance(getattr(self, 'trans_%s' % ax), list)) \
-                            and getattr(self, 'trans_%s' % ax)[0] == 'pow':
-                        gg.loc[:,
-                               val] = gg[val]**getattr(self, 'trans_%s' % ax)[1]
-                    elif getattr(self, 'trans_%s' % ax) == 'flip':
-                        maxx = gg.loc[:, val].max()
-                        gg.loc[:, val] -= maxx
-                        gg.loc[:, val] = abs(gg[val])
-
-            if isinstance(group, tuple):
-                vals = group[0] if isinstance(group[0], tuple) else [group[0]]
-                for k, v in dict(zip(groups_all, vals)).items():
-                    gg[k] = v
-
-            df = pd.concat([df, gg])
+        # Elementwise transforms apply to whole columns; only flip and nq depend on the group
+        for ax in ['x', 'y', 'z']:
+            vals = getattr(self, ax)
+            if not vals:
+                continue
+            trans = getattr(self, 'trans_%s' % ax)
+            for ival, val in enumerate(vals):
+                if trans == 'abs':
+                    df[val] = abs(df[val])
+                elif trans == 'negative' or trans == 'neg':
+                    df[val] = -df[val]
+                elif trans == 'nq':
+                    if ival == 0:
+                        df = self._transform_nq(df, val, groups_all)
+                elif trans == 'inverse' or trans == 'inv':
+                    df[val] = 1 / df[val]
+                elif isinstance(trans, (tuple, list)) and trans[0] == 'pow':
+                    df[val] = df[val]**trans[1]
+                elif trans == 'flip':
+                    if len(groups_all) > 0:
+                        maxx = df.groupby(groups_all)[val].transform('max')
+                    else:
+                        maxx = df[val].max()
+                    df[val] = abs(df[val] - maxx)
 
         self.df_all = df
+
+    def _transform_nq(self, df: pd.DataFrame, val: str, groups: list) -> pd.DataFrame:
+        """Replace the data of every group by its normal quantiles.
+
+        Args:
+            df: data to transform
+            val: column name of the values
+            groups: grouping column names
+
+        Returns:
+            DataFrame with Sigma and val columns plus the group values
+        """
+        if len(groups) == 0:
+            return utl.nq(df[val], val, **self.kwargs)
+
+        nqs = []
+        for key, gg in df.groupby(groups if len(groups) > 1 else groups[0]):
+            nq = utl.nq(gg[val], val, **self.kwargs)
+            for k, v in zip(groups, key if isinstance(key, tuple) else [key]):
+                nq[k] = v
+            nqs += [nq]
+
+        return pd.concat(nqs)
+
+    def _use_batch(self, df: pd.DataFrame, cols: list) -> bool:
+        """Check if the groups of a DataFrame can be taken from the cache of self.batch.
+
+        Only the unmodified self.df_all provided by the batch qualifies and the grouping columns must exist in the
+        batch DataFrame and not be axis columns (which may be converted or transformed).
+
+        Args:
+            df: DataFrame to group
+            cols: grouping column names
+
+        Returns:
+            True if the batch cache applies
+        """
+        if self.batch is None or df is not self._df_batch or df is not self.df_all:
+            return False
+
+        axes = [f for ax in ['x', 'x2', 'y', 'y2', 'z'] for f in (getattr(self, ax, None) or [])]
+        return all(f in self.batch.df.columns and f not in axes for f in cols)
@@ -39,7 +39,7 @@ class Gantt(data.Data):
     def _get_data_ranges(self):
         """Gantt-specific data range calculator by subplot."""
         # First get any user defined range values and apply optional auto scaling
-        df_fig = self.df_fig.copy()  # use temporarily for setting ranges
+        df_fig = self.df_fig  # use temporarily for setting ranges (read-only)
         self._get_data_ranges_user_defined()
         df_fig = self._get_auto_scale(df_fig)
 
@@ -73,7 +73,7 @@ class Heatmap(data.Data):
     def _get_data_ranges(self):
         """Heatmap-specific data range calculator by subplot."""
         # First get any user defined range values and apply optional auto scaling
-        df_fig = self.df_fig.copy()  # use temporarily for setting ranges
+        df_fig = self.df_fig  # use temporarily for setting ranges (read-only)
         self._get_data_ranges_user_defined()
         df_fig = self._get_auto_scale(df_fig)
 
@@ -127,6 +127,30 @@ class Heatmap(data.Data):
             self._add_range(ir, ic, 'x2', 'max', None)
             self._add_range(ir, ic, 'y2', 'max', None)
 
+    def _natsort_subset(self, vals: pd.Index, col: [str, None]) -> list:
+        """Natsort the column or index values of a subplot.
+
+        The values of a pivoted subplot are a subset of the unique values of a column of self.df_fig, which are
+        natsorted only once per figure.
+
+        Args:
+            vals: column or index values of the subplot DataFrame
+            col: name of the self.df_fig column that contains the values or None if the data is not pivoted
+
+        Returns:
+            natsorted list of vals
+        """
+        if col is None:
+            return natsorted(vals)
+
+        subset = set(vals)
+        ordered = [f for f in self._get_group_vals(self.df_fig, col) if f in subset]
+        if len(ordered) != len(vals):
+            # the pivot changed the values (i.e., dtype conversion)
+            return natsorted(vals)
+
+        return ordered
+
     def _subset_modify(self, ir: int, ic: int, df: pd.DataFrame) -> pd.DataFrame:
         """Extra modifications for Heatmap subsets
 
@@ -146,9 +170,8 @@ class Heatmap(data.Data):
             df = pd.pivot_table(df, values=self.z[0],
                                 index=self.y[0], columns=self.x[0])
         if self.sort:
-            cols = natsorted(df.columns)
-            df = df[cols]
-            df.index = natsorted(df.index)
+            df = df[self._natsort_subset(df.columns, self.x[0] if self.pivot else None)]
+            df.index = self._natsort_subset(df.index, self.y[0] if self.pivot else None)
 
         # Ensure only int columns are present for imshow case and set range
         if self.auto_cols:
@@ -167,7 +190,9 @@ class Heatmap(data.Data):
                     self.ranges[ir, ic]['ymax'] is not None:
                 df = df.loc[[f for f in df.index if f <= self.ranges[ir, ic]['ymax']]]
 
-        # Check dtypes to properly designate tick labels
+        # Check dtypes to properly designate tick labels (shallow copy so the index/columns of a shared subset
+        # are not modified in place)
+        df = df.copy(deep=False)
         dtypes = [int, np.int32, np.int64]
         if df.index.dtype in dtypes and list(df.index) != \
                 [f + df.index[0] for f in range(0, len(df.index))]:
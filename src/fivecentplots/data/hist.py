@@ -3,7 +3,6 @@ import pdb
 import pandas as pd
 import numpy as np
 from .. import utilities
-from natsort import natsorted
 utl = utilities
 db = pdb.set_trace
 
@@ -49,6 +48,16 @@ class Histogram(data.Data):
         if 'wrap' in kwargs and kwargs['wrap'] == 'y':
             raise data.GroupingError('Cannot wrap by "y" for hist plots')
 
+        # Common bin edges for all groups of a subplot
+        self.shared_bins = utl.kwget(kwargs, self.fcpp, ['hist_shared_bins', 'shared_bins'],
+                                     kwargs.get('shared_bins', False))
+        self.bin_ranges = {}  # (ir, ic) -> shared bin range
+
+        # Column of per-row weights (i.e., pre-binned counts from utl.hist_stream)
+        self.weights = kwargs.get('weights', None)
+        if self.weights is not None and self.weights not in kwargs['df'].columns:
+            raise data.DataError(f'weights column "{self.weights}" not found in DataFrame')
+
         super().__init__(name, req, opt, self.fcpp, **kwargs)
 
         self.use_parent_ranges = False
@@ -74,7 +83,7 @@ class Histogram(data.Data):
         self.ax_limit_padding_ymax = kwargs['ax_limit_padding_ymax']
 
     def df_hist(self, df_in: pd.DataFrame, brange: [float, None] = None) -> pd.DataFrame:
-        """Iterate over groups and build a dataframe of counts.
+        """Build a dataframe of counts for all groups in one pass.
 
         Args:
             df_in: input DataFrame
@@ -83,67 +92,47 @@ class Histogram(data.Data):
         Returns:
             new DataFrame with histogram counts and values
         """
-        hist = pd.DataFrame()
+        if self.kwargs['2D']:
+            cols = utl.df_int_cols(df_in)
+            self.x = ['Value']
+        else:
+            cols = [self.x[0]]
 
+        # Group index of every row
         groups = self._groupers
         if len(groups) > 0:
-            for nn, df in df_in.groupby(self._groupers):
-                if self.kwargs['2D']:
-                    dfx = df[utl.df_int_cols(df)].values
-                    self.x = ['Value']
-                else:
-                    dfx = df[self.x[0]]
-
-                if brange:
-                    counts, vals = np.histogram(dfx[~np.isnan(dfx)], bins=self.bins, density=self.norm, range=brange)
-                else:
-                    counts, vals = np.histogram(dfx[~np.isnan(dfx)], bins=self.bins, density=self.norm)
-
-                # cdf + pdf
-                if self.cdf:
-                    pdf = counts / sum(counts)
-                    counts = np.cumsum(pdf)
-                    self.y = ['Cumulative Probability']
-                elif self.pdf:
-                    counts = counts / sum(counts)
-                    self.y = ['Probability Density']
-
-                temp = pd.DataFrame({self.x[0]: vals[:-1], self.y[0]: counts})
-                for ig, group in enumerate(self._groupers):
-                    if isinstance(nn, tuple):
-                        temp[group] = nn[ig]
-                    else:
-                        temp[group] = nn
-                hist = pd.concat([hist, temp])
+            idx = df_in.groupby(groups).indices
+            keys = list(idx.keys())
+            codes = np.full(len(df_in), -1)
+            for ig, key in enumerate(keys):
+                codes[idx[key]] = ig
         else:
-            if self.kwargs['2D']:
-                dfx = df_in[utl.df_int_cols(df_in)].values
-                self.x = ['Value']
-            else:
-                dfx = df_in[self.x[0]].dropna()
-            if brange:
-                counts, vals = np.histogram(dfx[~np.isnan(dfx)], bins=self.bins, density=self.norm, range=brange)
-            else:
-                counts, vals = np.histogram(dfx[~np.isnan(dfx)], bins=self.bins, density=self.norm)
-
-            # special case of all values being equal
-            if len(counts) == 1:
-                vals = np.insert(vals, 0, vals[0])
-                if self.ax_scale in ['logy', 'log']:
-                    counts = np.insert(counts, 0, 1)
-                else:
-                    counts = np.insert(counts, 0, 0)
-
-            # cdf + pdf
-            if self.cdf:
-                pdf = counts / sum(counts)
-                counts = np.cumsum(pdf)
-                self.y = ['Cumulative Probability']
-            elif self.pdf:
-                counts = counts / sum(counts)
-                self.y = ['Probability Density']
-
-            hist = pd.DataFrame({self.x[0]: vals[:-1], self.y[0]: counts})
+            keys = [None]
+            codes = np.zeros(len(df_in), dtype=int)
+
+        # Count every group (all the image columns of a row belong to the same group)
+        weights = np.repeat(df_in[self.weights].values, len(cols)) if self.weights is not None else None
+        counts, vals = utl.group_hist(df_in[cols].values.ravel(), np.repeat(codes, len(cols)), len(keys),
+                                      self.bins, brange, self.norm, weights)
+
+        # special case of all values being equal
+        if len(groups) == 0 and counts.shape[1] == 1:
+            vals = np.insert(vals, 0, vals[:, 0], axis=1)
+            counts = np.insert(counts, 0, 1 if self.ax_scale in ['logy', 'log'] else 0, axis=1)
+
+        # cdf + pdf
+        if self.cdf:
+            counts = np.cumsum(counts / counts.sum(axis=1)[:, None], axis=1)
+            self.y = ['Cumulative Probability']
+        elif self.pdf:
+            counts = counts / counts.sum(axis=1)[:, None]
+            self.y = ['Probability Density']
+
+        nbins = counts.shape[1]
+        hist = pd.DataFrame({self.x[0]: vals[:, :-1].ravel(), self.y[0]: counts.ravel()},
+                            index=np.tile(np.arange(nbins), len(keys)))
+        for ig, group in enumerate(groups):
+            hist[group] = np.repeat([f[ig] if isinstance(f, tuple) else f for f in keys], nbins)
 
         return hist
 
@@ -178,7 +167,11 @@ class Histogram(data.Data):
                 temp_ranges[ir, ic]['ymin'] = None
                 continue
 
-            hist = self.df_hist(df_rc)
+            # Shared bins span the x-axis range (already computed above)
+            xmin, xmax = self.ranges[ir, ic].get('xmin'), self.ranges[ir, ic].get('xmax')
+            if self.shared_bins and xmin is not None and xmax is not None:
+                self.bin_ranges[ir, ic] = [xmin, xmax]
+            hist = self.df_hist(df_rc, self.bin_ranges.get((ir, ic)))
             if self.cumulative:
                 hist.Counts = hist.Counts.sum()
             vals = self._get_data_range('y', hist, plot_num)
@@ -239,17 +232,12 @@ class Histogram(data.Data):
                    (utl.validate_list(self.legend)
                     if self.legend is not None else [])
             # need this extra line for hist
-            cols = [f for f in cols if f != 'Counts']
+            cols = [f for f in cols if f != 'Counts'] + ([self.weights] if self.weights is not None else [])
             return self.df_fig[cols]
         else:
-            if self.sort:
-                self.wrap_vals = \
-                    natsorted(list(self.df_fig.groupby(self.wrap).groups.keys()))
-            else:
-                self.wrap_vals = list(self.df_fig.groupby(self.wrap, sort=False).groups.keys())
-            wrap = dict(zip(self.wrap,
-                        utl.validate_list(self.wrap_vals[ir * self.ncol + ic])))
-            return self.df_fig.loc[(self.df_fig[list(wrap)] == pd.Series(wrap)).all(axis=1)].copy()
+            self.wrap_vals = self._get_group_vals(self.df_fig, self.wrap)
+            wrap = utl.validate_list(self.wrap_vals[ir * self.ncol + ic])
+            return self._subset_group(self.df_fig, self.wrap, wrap)
 
     def switch_type(self, kwargs):
         """If bars are not enabled, switch everything to line plot.
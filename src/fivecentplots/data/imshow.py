@@ -25,7 +25,7 @@ class ImShow(data.Data):
         if fcpp:
             self.fcpp = fcpp.copy()
         else:
-            self.fcpp, dummy, dummy2 = utl.reload_defaults(kwargs.get('theme', None))
+            self.fcpp, _, _, _ = utl.reload_defaults(kwargs.get('theme', None))
 
         # Color plane splitting
         cfa = utl.kwget(kwargs, self.fcpp, 'cfa', kwargs.get('cfa', None))
@@ -115,7 +115,7 @@ class ImShow(data.Data):
     def _get_data_ranges(self):
         """ImShow-specific data range calculator by subplot."""
         # First get any user defined range values and apply optional auto scaling
-        df_fig = self.df_fig.copy()  # use temporarily for setting ranges
+        df_fig = self.df_fig  # use temporarily for setting ranges (read-only)
         self._get_data_ranges_user_defined()
         df_fig = self._get_auto_scale(df_fig)
 
@@ -202,10 +202,8 @@ class ImShow(data.Data):
                 self.df_rc = self._subset(ir, ic)
 
                 # imshow addition
-                self.df_rc.index.astype = int
                 cols = utl.df_int_cols(self.df_rc)
                 self.df_rc = self.df_rc[cols]
-                self.df_rc.columns.astype = int
 
                 # Deal with empty dfs
                 if len(self.df_rc) == 0:
@@ -2,7 +2,6 @@ from . import data
 import pdb
 import pandas as pd
 from .. import utilities
-from natsort import natsorted
 utl = utilities
 db = pdb.set_trace
 
@@ -65,10 +64,7 @@ class Pie(data.Data):
 
         # custom for pie plot
         self.legend = self.x[0]
-        if self.sort:
-            legend_vals = natsorted(list(df.groupby(self.legend).groups.keys()))
-        else:
-            legend_vals = list(df.groupby(self.legend, sort=False).groups.keys())
+        legend_vals = self._get_group_vals(df, self.legend)
         self.nleg_vals = len(legend_vals)
 
         for leg in legend_vals:
@@ -1,6 +1,24 @@
-# only matplotlib is required; all other plotting libs are optional
-from . import mpl  # noqa
-try:  # noqa
-    from . import bokeh  # noqa
-except:  # noqa
-    pass  # noqa
\ No newline at end of file
+# only matplotlib is required; all other plotting libs are optional and every engine is imported on first use
+import importlib
+
+ENGINES = ['mpl', 'bokeh']
+
+
+def __getattr__(name: str):
+    """Import a plotting engine module the first time it is requested (keeps `import fivecentplots` fast).
+
+    Args:
+        name: engine name
+
+    Returns:
+        engine module
+    """
+    if name not in ENGINES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    try:
+        return importlib.import_module(f'.{name}', __name__)
+    except ImportError as err:
+        if name == 'mpl':
+            raise
+        raise AttributeError(f'plotting engine {name!r} is not available ({err})') from err
@@ -306,13 +306,16 @@ class Layout(BaseLayout):
         """
         pass
 
-    def plot_box(self, ir: int, ic: int, data: 'data.Data', **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
+    def plot_box(self, ir: int, ic: int, data: 'data.Data', stats: [pd.DataFrame, None] = None,
+                 **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
         """Plot boxplot.
 
         Args:
             ir: subplot row index
             ic: subplot column index
             data: Data object
+            stats (optional): precomputed box statistics with one row per box (see utl.group_stats).
+                Defaults to None.
             kwargs: keyword args
 
         Returns:
@@ -339,6 +342,24 @@ class Layout(BaseLayout):
         """
         pass
 
+    def plot_density(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
+                     leg_name: str, twin: bool, ranges: dict):
+        """Plot xy data as a point density image; not supported by bokeh so the markers are plotted.
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+            iline: data subset index (from Data.get_plot_data)
+            df: data to plot
+            x: x-axis column name
+            y: y-axis column name
+            leg_name: legend value name if legend enabled
+            twin: denotes if twin axis is enabled or not
+            ranges: axes limits of the subplot (from Data.ranges)
+        """
+        # bokeh has no density image support so plot the individual markers instead
+        self.plot_xy(ir, ic, iline, df, x, y, leg_name, twin, ranges=ranges)
+
     def plot_gantt(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                    leg_name: str, yvals: list, ngroups: int):
         """Plot gantt graph.
@@ -457,7 +478,7 @@ class Layout(BaseLayout):
 
     def plot_xy(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                 leg_name: str, twin: bool, zorder: int = 1, line_type: [str, None] = None,
-                marker_disable: bool = False):
+                marker_disable: bool = False, ranges: [dict, None] = None):
         """ Plot xy data
 
         Args:
@@ -474,9 +495,8 @@ class Layout(BaseLayout):
             line_type (optional): set the line type to reference the correct Element.
                 Defaults to None.
             marker_disable (optional): flag to disable markers. Defaults to False.
+            ranges (optional): axes limits of the subplot (from Data.ranges; not used by bokeh). Defaults to None.
         """
-        df = df.copy()
-
         if not line_type:
             line_type = self.lines
         else:
@@ -489,6 +509,7 @@ class Layout(BaseLayout):
         points = None
         if self.markers.on and not marker_disable:
             if self.markers.jitter:
+                df = df.copy()
                 df[x] = np.random.normal(df[x], 0.03, size=len(df[y]))
             marker = format_marker(self.axes.obj[ir, ic],
                                    self.markers.type[iline])
@@ -140,6 +140,7 @@ class BaseLayout:
         self.nrow = None  # number of subplot rows
         self.obj_array = None  # row x column array for Element objects
         self.pie = None  # Element object for pie chart
+        self.profiler = kwargs.get('profiler', None)  # utl.Profiler for engine call spans
         self.ref_line = None  # Element object for reference line
         self.rolling_mean = None  # Element object for the rolling mean XY plot on bar chart
         self.text = None  # Element object for arbitrary text
@@ -234,6 +235,13 @@ class BaseLayout:
         self.tick_cleanup = utl.kwget(kwargs, self.fcpp, 'tick_cleanup', 'shrink')
         if isinstance(self.tick_cleanup, str):
             self.tick_cleanup = self.tick_cleanup.lower()
+        self.decimate = utl.kwget(kwargs, self.fcpp, 'decimate', False)
+        if self.decimate is True:
+            self.decimate = 'minmax'
+        elif isinstance(self.decimate, str):
+            self.decimate = self.decimate.lower()
+            if self.decimate not in ['minmax', 'lttb']:
+                raise ValueError(f'decimate must be True, False, "minmax", or "lttb", not "{self.decimate}"')
 
         # Overrides for specific plot types
         if 'bar' in self.name:
@@ -1435,6 +1443,7 @@ class BaseLayout:
                                edge_color=copy.copy(marker_edge_color),
                                edge_width=utl.kwget(kwargs, self.fcpp, 'marker_edge_width', 1.5),
                                fill_color=copy.copy(marker_fill_color),
+                               density=utl.kwget(kwargs, self.fcpp, ['marker_density', 'density'], False),
                                jitter=utl.kwget(kwargs, self.fcpp, ['marker_jitter', 'jitter'],
                                                 kwargs.get('jitter', False)),
                                size=utl.kwget(kwargs, self.fcpp, 'marker_size', 6),
@@ -2399,13 +2408,16 @@ class BaseLayout:
         """
 
     @abc.abstractmethod
-    def plot_box(self, ir: int, ic: int, data: 'data.Data', **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
+    def plot_box(self, ir: int, ic: int, data: 'data.Data', stats: [pd.DataFrame, None] = None,
+                 **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
         """Plot boxplot.
 
         Args:
             ir: subplot row index
             ic: subplot column index
             data: Data object
+            stats (optional): precomputed box statistics with one row per box (see utl.group_stats).
+                Defaults to None.
             kwargs: keyword args
 
         Returns:
@@ -2431,6 +2443,27 @@ class BaseLayout:
             reference to the colorbar object
         """
 
+    @abc.abstractmethod
+    def plot_density(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
+                     leg_name: str, twin: bool, ranges: dict) -> 'MPL_imshow_object':  # noqa: F821
+        """Plot xy data as a rasterized point density image with one bin per axes pixel instead of
+        individual markers.
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+            iline: data subset index (from Data.get_plot_data)
+            df: data to plot
+            x: x-axis column name
+            y: y-axis column name
+            leg_name: legend value name if legend enabled
+            twin: denotes if twin axis is enabled or not
+            ranges: axes limits of the subplot (from Data.ranges)
+
+        Returns:
+            reference to the density image object (or the marker plot for non-numeric axes)
+        """
+
     @abc.abstractmethod
     def plot_gantt(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                    leg_name: str, yvals: list, ngroups: int):
@@ -2550,7 +2583,7 @@ class BaseLayout:
     @abc.abstractmethod
     def plot_xy(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                 leg_name: str, twin: bool, zorder: int = 1, line_type: [str, None] = None,
-                marker_disable: bool = False):
+                marker_disable: bool = False, ranges: [dict, None] = None):
         """ Plot xy data
 
         Args:
@@ -2567,6 +2600,8 @@ class BaseLayout:
             line_type (optional): set the line type to reference the correct Element.
                 Defaults to None.
             marker_disable (optional): flag to disable markers. Defaults to False.
+            ranges (optional): axes limits of the subplot (from Data.ranges) used to decimate only the visible
+                data. Defaults to None.
         """
 
     @abc.abstractmethod
@@ -2717,9 +2752,9 @@ class Element:
                                 kwargs.get('zorder', 0))
 
         # For some elements that are unique by axes, track sizes as DataFrame
-        self._size_all = pd.DataFrame()
-        self._size_all_bg = pd.DataFrame()
         self.size_cols = ['ir', 'ic', 'ii', 'jj', 'width', 'height', 'x0', 'x1', 'y0', 'y1', 'rotation']
+        self._size_all = SizeTable(self.size_cols)
+        self._size_all_bg = SizeTable(self.size_cols)
 
         # fill and edge colors
         if 'fill_alpha' not in kwargs:
@@ -2871,7 +2906,7 @@ class Element:
     @property
     def size_all(self):
         """Return the DataFrame of all the element sizes by subplot index."""
-        return self._size_all
+        return self._size_all.df
 
     @size_all.setter
     def size_all(self, vals: tuple):
@@ -2881,25 +2916,12 @@ class Element:
             vals: 'ir', 'ic', 'ii', 'width', 'height', 'x0', 'x1', 'y0', 'y1', 'rotation'
                    each value can be a single item or a list
         """
-        data = {}
-        if len(vals) != len(self.size_cols):
-            raise ValueError('incorrect size_all table values')
-
-        for icol, col in enumerate(self.size_cols):
-            data[col] = utl.validate_list(vals[icol])
-
-        # temp = pd.DataFrame(data)
-
-        if len(self._size_all) == 0:
-            self._size_all = pd.DataFrame(data)
-
-        else:
-            self._size_all = pd.concat([self._size_all, pd.DataFrame(data)], axis=0).reset_index(drop=True)
+        self._size_all.append(vals)
 
     @property
     def size_all_bg(self):
         """Some elements have a background with a different size (like labels)."""
-        return self._size_all_bg
+        return self._size_all_bg.df
 
     @size_all_bg.setter
     def size_all_bg(self, vals: tuple):
@@ -2909,20 +2931,7 @@ class Element:
             vals: 'ir', 'ic', 'ii', 'jj', 'width', 'height', 'x0', 'x1', 'y0', 'y1'
                 each value can be a single item or a list
         """
-        data = {}
-        if len(vals) != len(self.size_cols):
-            raise ValueError('incorrect size_all table values')
-
-        for icol, col in enumerate(self.size_cols):
-            data[col] = utl.validate_list(vals[icol])
-
-        temp = pd.DataFrame(data)
-
-        if len(self._size_all_bg) == 0:
-            self._size_all_bg = temp.copy()
-
-        else:
-            self._size_all_bg = pd.concat([self._size_all_bg, temp]).reset_index(drop=True)
+        self._size_all_bg.append(vals)
 
     @property
     def size_inches(self):
@@ -2999,11 +3008,23 @@ class Element:
 
             getattr(self, attr).values = new_vals
 
+    def size_all_axes(self, ir: int, ic: int) -> np.ndarray:
+        """Return the size_all rows of a single subplot as a 2D array (columns ordered as `self.size_cols`).
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+
+        Returns:
+            array of rows (empty list if the subplot has no rows)
+        """
+        return self._size_all.axes(ir, ic)
+
     def size_all_reset(self):
         """Reset the size_all arrays."""
 
-        self._size_all = pd.DataFrame()
-        self._size_all_bg = pd.DataFrame()
+        self._size_all.reset()
+        self._size_all_bg.reset()
 
 
 class DF_Element(Element):
@@ -3177,3 +3198,76 @@ class ObjectArray:
             c: new object array column size
         """
         self._obj = self._obj.reshape(r, c)
+
+
+class SizeTable:
+    def __init__(self, cols: list):
+        """Append-only table of element sizes by subplot index.
+
+        Rows are buffered in per-column lists (with the row numbers of each subplot tracked as they are added)
+        so appending is O(1); the DataFrame view is only built when requested and is cached until the next append.
+
+        Args:
+            cols: table column names (must include 'ir' and 'ic')
+        """
+        self.cols = cols
+        self.reset()
+
+    def __len__(self):
+        """Return the number of rows in the table."""
+        return self._len
+
+    def append(self, vals: tuple):
+        """Add one or more rows to the table.
+
+        Args:
+            vals: one value per column; each value can be a single item or a list
+        """
+        if len(vals) != len(self.cols):
+            raise ValueError('incorrect size_all table values')
+
+        vals = [utl.validate_list(f) for f in vals]
+        num = max(len(f) for f in vals)
+        for col, val in zip(self.cols, vals):
+            if len(val) == 1 and num > 1:
+                # broadcast single values like the DataFrame constructor
+                val = val * num
+            elif len(val) != num:
+                raise ValueError('incorrect size_all table values')
+            self._data[col] += val
+
+        for irow, (ir, ic) in enumerate(zip(self._data['ir'][self._len:], self._data['ic'][self._len:])):
+            self._index[(ir, ic)] += [self._len + irow]
+        self._len += num
+        self._df = None
+
+    def axes(self, ir: int, ic: int) -> np.ndarray:
+        """Return the rows for a single subplot as a 2D float array (columns in `self.cols` order).
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+
+        Returns:
+            array of rows (empty list if the subplot has no rows)
+        """
+        rows = self._index.get((ir, ic))
+        if not rows:
+            return []
+
+        return np.array([[self._data[col][irow] for col in self.cols] for irow in rows], dtype=float)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Return the table as a DataFrame."""
+        if self._df is None:
+            self._df = pd.DataFrame(self._data)
+
+        return self._df
+
+    def reset(self):
+        """Clear the table."""
+        self._data = {col: [] for col in self.cols}
+        self._index = defaultdict(list)
+        self._len = 0
+        self._df = None
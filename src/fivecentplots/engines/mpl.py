@@ -1,6 +1,5 @@
 import pandas as pd
 import pdb
-import scipy.stats
 import numpy as np
 import copy
 import math
@@ -34,6 +33,9 @@ warnings.filterwarnings("ignore", "invalid value encountered in double_scalars")
 
 db = pdb.set_trace
 TICK_OVL_MAX = 0.75  # maximum allowed overlap for tick labels in float pixels
+DENSITY_CHUNK = 10_000_000  # number of points binned at a time for density plots
+TEXT_EXTENTS = {}  # text metrics cache: extent of a text at the display origin by text, font, rotation, and dpi
+TEXT_EXTENTS_MAX = 10_000  # cache entries kept before the text metrics cache is cleared
 
 
 def approx_gte(x: float, y: float):
@@ -94,172 +96,82 @@ def cbar_ticks(cbar: 'Colorbar_Object', zmin: float, zmax: float):  # noqa: F821
     return new_ticks
 
 
-def df_tick(ticks: 'Element', ticks_size: 'np.array', ax: str) -> pd.DataFrame:
-    """Create a dataframe of tick extents.  Used to look for overlapping ticks.
-
-    Args:
-        ticks: Element class for tick lables
-        ticks_size: Bounding box arrays of all tick labels
-        ax: axes name (x or y)
-
-    Returns:
-        pd.DataFrame of tick labels with start and stop pixel locations
-    """
-
-    idx0 = ticks.size_cols.index(f'{ax}0')
-    idx1 = ticks.size_cols.index(f'{ax}1')
-
-    # Convert the tick size array to DataFrame denoting the start and stop pixel locations
-    tt = pd.DataFrame(ticks_size[:, [idx0, idx1]], columns=['start', 'stop'])
-
-    # Check ascending vs descending
-    if len(tt) > 1 and tt['start'].diff()[1] < 0:
-        tt = tt.iloc[::-1]
-
-    return tt
-
+def hide_overlaps(ticks: 'Element', tt: np.ndarray, ir: int, ic: int, visible: [np.ndarray, None] = None
+                  ) -> np.ndarray:
+    """Find and hide any overlapping tick marks on the same axis.
 
-def df_tick_update(tt: pd.DataFrame) -> pd.DataFrame:
-    """Calculate the next round of overlaps in the ticks dataframe
+    Each pass walks the runs of consecutive overlapping ticks and disables every other tick in the run; the
+    overlaps of the remaining ticks are then recalculated until none are left.
 
     Args:
-        tt: ticks dataframe
+        ticks: Element class for tick lables
+        tt: tick extents array created by tick_extents
+        ir: current axes row index
+        ic: current axes column index
+        visible: boolean tick label visibility status by row of tt (None = all visible)
 
     Returns:
-        updated ticks dataframe
+        updated boolean array of tick label visibility status
     """
-    tt = tt.copy()
-
-    # Shift the start column to line up the stop coordinate of one tick with the start of the next
-    tt['next start'] = tt['start'].shift(-1)
+    visible = np.ones(len(tt), dtype=bool) if visible is None else visible.copy()
+    start, stop = tt[:, 1], tt[:, 2]
+
+    keep = np.flatnonzero(visible)
+    while len(keep) > 1:
+        # Positive difference between the stop of one tick and the start of the next means overlap (allow a little)
+        ol = np.append(stop[keep[:-1]] - start[keep[1:]] > TICK_OVL_MAX, False)
+        if not ol.any():
+            break
+        ol[-1] = True
 
-    # Check the difference between stop coordinate of one tick and start of next; positive means overlap
-    tt['delta'] = tt['stop'] - tt['next start']
-    tt['ol'] = tt['delta'] > TICK_OVL_MAX  # allow a litle bit of overlap (otherwise would choose > 0)
-    if 'visible' not in tt.columns:
-        tt['visible'] = True
+        # Within each run of overlaps keep the even offsets and disable the tick following each of them
+        irow = np.arange(len(ol))
+        run_start = np.maximum.accumulate(np.where(ol & ~np.append(False, ol[:-1]), irow, 0))
+        ol &= (irow - run_start) % 2 == 0
+        visible[keep[1:][ol[:-1]]] = False
+        keep = keep[ol]
 
-    return tt
+    for jj in tt[~visible, 0].astype(int):
+        ticks.obj[ir, ic][jj].set_visible(False)  # turn off the tick visibility
 
+    return visible
 
-def hide_overlaps(ticks: 'Element', tt: pd.DataFrame, ir: int, ic: int) -> pd.DataFrame:
-    """Find and hide any overlapping tick marks on the same axis.
 
-    Args:
-        ticks: Element class for tick lables
-        tt: tick dataframe created by df_ticks
-        ir: current axes row index
-        ic: current axes column index
-
-    Returns:
-        pd.DataFrame of tick label visibility status
-    """
-    tt = df_tick_update(tt)
-    tt_orig = tt.copy()
-    tt = tt[tt['visible']]
-    tt = df_tick_update(tt)
-
-    # While overlaps exist, cycle through and disable the next tick in line
-    while True in tt['ol'].values:
-        tt.loc[tt.index[-1], 'ol'] = True  # modify the last line of the table
-        for i in range(0, len(tt[:-1])):
-            if tt.iloc[i]['ol']:
-                jj = tt.iloc[i + 1].name
-                ticks.obj[ir, ic][jj].set_visible(False)  # turn off the tick visibility
-                tt.loc[jj, 'ol'] = False
-                tt_orig.loc[jj, 'visible'] = False
-
-        # Rebuild the overlap table to reflect ticks that have already been disabled
-        tt = tt[tt['ol']].copy()
-        tt = df_tick_update(tt)
-
-    return tt_orig
-
-
-def hide_overlaps_major_minor(ticks, ticksm, bbox, bboxm, ir, ic) -> pd.DataFrame:
-    """Find and hide any overlapping tick marks on the same axis.  Three cases to address:
+def hide_overlaps_major_minor(ticksm: 'Element', tt: np.ndarray, visible: np.ndarray, ttm: np.ndarray,
+                              ir: int, ic: int) -> np.ndarray:
+    """Find and hide any minor tick marks that overlap a major tick mark on the same axis.  Three cases to address:
     1) the starting position of the minor tick falls within the span of the major tick label
     2) the ending position of the minor tick falls within the span of the major tick label
     3) the minor tick completely covers the major tick
 
     Args:
-        ticks: Element class for major tick lables
-        ticksm: Element class for major tick lables
-        bbox: major tick label visibility status
-        bboxm: minor tick label visibility status
+        ticksm: Element class for minor tick lables
+        tt: major tick extents array created by tick_extents
+        visible: boolean major tick label visibility status by row of tt
+        ttm: minor tick extents array created by tick_extents
         ir: current axes row index
         ic: current axes column index
 
     Returns:
-        updated bboxm table
+        boolean array of minor tick label visibility status
     """
-    bbox = bbox[bbox['visible']]
-    if len(bbox) == 0 or len(bboxm) == 0:
-        return bboxm
-    bboxm_orig = bboxm.copy()
-
-    # Disable minor ticks where starting point falls between the major tick coords
-    ol = [is_in_range(tt, bbox[['start', 'stop']].values) for tt in np.nditer(bboxm['start'].values + TICK_OVL_MAX)]
-    while True in ol:
-        for iol, ool in enumerate(ol):
-            if ool:
-                idx = bboxm.index[iol]
-                ticksm.obj[ir, ic][idx].set_visible(False)
-                bboxm.loc[idx, 'ol'] = False
-                bboxm.loc[idx, 'visible'] = False
-                bboxm_orig.loc[idx, 'visible'] = False
-                bboxm_orig.loc[idx, 'label'] = ticksm.obj[ir, ic][idx]._text
-        bboxm = bboxm[bboxm['visible']]
-        if len(bboxm) == 0:
-            break
-        ol = [is_in_range(tt, bbox[['start', 'stop']].values) for tt in np.nditer(bboxm['start'].values + TICK_OVL_MAX)]
-    if len(bboxm) == 0:
-        return bboxm_orig
-
-    # Disable minor ticks where stopping point falls between the major tick coords
-    bboxm = bboxm.copy()
-    ol = [is_in_range(tt, bbox[['start', 'stop']].values) for tt in np.nditer(bboxm['stop'].values - TICK_OVL_MAX)]
-    while True in ol:
-        for iol, ool in enumerate(ol):
-            if ool:
-                idx = bboxm.index[iol]
-                ticksm.obj[ir, ic][idx].set_visible(False)
-                bboxm.loc[idx, 'ol'] = False
-                bboxm.loc[idx, 'visible'] = False
-                bboxm_orig.loc[idx, 'visible'] = False
-        bboxm = bboxm[bboxm['visible']]
-        if len(bboxm) == 0:
-            break
-        ol = [is_in_range(tt, bbox[['start', 'stop']].values) for tt in np.nditer(bboxm['stop'].values - TICK_OVL_MAX)]
-
-    # Disable minor ticks that completely cover the major tick coords
-    for irow, row in bboxm.iterrows():
-        covered = bbox[(row['start'] - bbox.start < 0) & (bbox.stop - row['stop'] < 0)]
-        if len(covered) > 0:
-            ticksm.obj[ir, ic][row.name].set_visible(False)
-            bboxm_orig.loc[row.name, 'visible'] = False
+    visiblem = np.ones(len(ttm), dtype=bool)
+    tt = tt[visible]
+    if len(tt) == 0 or len(ttm) == 0:
+        return visiblem
 
-    return bboxm_orig
+    # Compare every minor tick with every visible major tick
+    start, stop = tt[:, 1][np.newaxis, :], tt[:, 2][np.newaxis, :]
+    startm, stopm = ttm[:, 1][:, np.newaxis], ttm[:, 2][:, np.newaxis]
+    hidden = ((startm + TICK_OVL_MAX >= start) & (startm + TICK_OVL_MAX <= stop)).any(axis=1) \
+        | ((stopm - TICK_OVL_MAX >= start) & (stopm - TICK_OVL_MAX <= stop)).any(axis=1) \
+        | ((startm < start) & (stop < stopm)).any(axis=1)
+    visiblem[hidden] = False
 
+    for jj in ttm[hidden, 0].astype(int):
+        ticksm.obj[ir, ic][jj].set_visible(False)
 
-def is_in_range(n: float, tbl: np.ndarray):
-    """Convenience function for tick marks to check whether particular number
-    (n) is in the range between borders defined by each row in a 2-column
-    table (tbl).
-
-    From: https://stackoverflow.com/a/71380003
-
-    Args:
-        n: number to check if it is in range
-        tbl: 2-column array defining borders in which to check if n is in range
-
-    Returns:
-        bool True if in range else False
-    """
-    ol = np.apply_along_axis(lambda row: row[0] <= n <= row[1], 1, tbl).tolist()
-    if True in ol:
-        return True
-    return False
+    return visiblem
 
 
 def iterticks(ax: mplp.Axes, minor: bool = False):
@@ -360,6 +272,64 @@ def mpl_get_ticks(ax: mplp.Axes, xon: bool = True, yon: bool = True,
     return tp
 
 
+def text_extent(text: 'Text_Object') -> mtransforms.Bbox:  # noqa: F821
+    """Get the window extent of a text object using the cached text metrics.
+
+    The size of a text box and its offset from the text position only depend on the text, font, rotation,
+    alignment, and dpi so repeated labels are measured once and the cached box is moved to the current position
+    of the text (no draw of the figure is needed).
+
+    Args:
+        text: matplotlib text object
+
+    Returns:
+        Bbox of the text in display units
+    """
+    if not text.get_visible() or text.get_text() == '' or text.get_wrap():
+        return text.get_window_extent()
+
+    font = text.get_fontproperties()
+    key = (text.get_text(), tuple(font.get_family()), font.get_size_in_points(), font.get_style(),
+           font.get_weight(), text.get_rotation(), text.figure.dpi, font.get_variant(), font.get_stretch(),
+           font.get_file(), font.get_math_fontfamily(), text.get_horizontalalignment(),
+           text.get_verticalalignment(), text.get_rotation_mode(), text.get_usetex())
+    x, y = text.get_transform().transform(text.get_unitless_position())
+    if key in TEXT_EXTENTS:
+        return TEXT_EXTENTS[key].translated(x, y)
+
+    bbox = text.get_window_extent()
+    if len(TEXT_EXTENTS) >= TEXT_EXTENTS_MAX:
+        TEXT_EXTENTS.clear()
+    TEXT_EXTENTS[key] = bbox.translated(-x, -y)
+
+    return bbox
+
+
+def tick_extents(ticks: 'Element', ticks_size: [np.ndarray, list], ax: str) -> np.ndarray:
+    """Create an array of tick extents.  Used to look for overlapping ticks.
+
+    Args:
+        ticks: Element class for tick lables
+        ticks_size: Bounding box arrays of all tick labels
+        ax: axes name (x or y)
+
+    Returns:
+        2D array of tick label index, start pixel location, and stop pixel location ordered by position
+    """
+    if len(ticks_size) == 0:
+        return np.zeros((0, 3))
+
+    idx0 = ticks.size_cols.index(f'{ax}0')
+    idx1 = ticks.size_cols.index(f'{ax}1')
+    tt = np.column_stack([np.arange(len(ticks_size)), ticks_size[:, idx0], ticks_size[:, idx1]])
+
+    # Check ascending vs descending
+    if len(tt) > 1 and tt[1, 1] - tt[0, 1] < 0:
+        tt = tt[::-1]
+
+    return tt
+
+
 class Layout(BaseLayout):
 
     def __init__(self, data: 'Data', defaults: list = [], **kwargs):  # noqa: F821
@@ -1087,6 +1057,32 @@ class Layout(BaseLayout):
         # Get the largest of labels and titles
         return np.maximum(heights, heightst)
 
+    @utl.profiled
+    def _draw_for_measurement(self):
+        """Render the figure if the positions of the text elements are only known after a draw.
+
+        Text sizes come from the cached text metrics (see text_extent) and text positions from their transforms,
+        so a figure is only rendered if an axes is placed at draw time (fixed aspect ratio or an axes locator,
+        i.e., images, pies, and colorbars).  The plotted data artists are hidden for this pre-draw since
+        rasterizing the lines, markers, and images of large data sets is most of the cost of the draw.
+        """
+        if all(ax.get_aspect() == 'auto' and ax.get_axes_locator() is None for ax in self.fig.obj.axes):
+            return
+
+        hidden = []
+        for ax in self.fig.obj.axes:
+            for artist in list(ax.lines) + list(ax.collections) + list(ax.images):
+                if artist.get_visible():
+                    artist.set_visible(False)
+                    hidden += [artist]
+
+        try:
+            self.fig.obj.canvas.draw()
+        finally:
+            for artist in hidden:
+                artist.set_visible(True)
+
+    @utl.profiled
     def _get_element_sizes(self, data: 'Data'):  # noqa: F821
         """Calculate the actual rendered size of select elements by pre-plotting
         them.  This is needed to correctly adjust the figure dimensions.
@@ -1098,7 +1094,7 @@ class Layout(BaseLayout):
             updated version of `data`
         """
         # Render the figure to extract true dimensions of various elements
-        self.fig.obj.canvas.draw()
+        self._draw_for_measurement()
 
         # labels
         for label in ['x', 'x2', 'y', 'y2', 'z', 'row', 'col', 'wrap']:
@@ -1110,7 +1106,7 @@ class Layout(BaseLayout):
                     continue
 
                 # text label size
-                bbox = lab.obj[ir, ic].get_window_extent()
+                bbox = text_extent(lab.obj[ir, ic])
                 width = bbox.width
                 height = bbox.height
                 lab.size_all = (ir, ic, 0, 0, width, height, bbox.x0, bbox.x1, bbox.y0, bbox.y1, np.nan)
@@ -1135,7 +1131,8 @@ class Layout(BaseLayout):
 
         # titles
         if self.title.on:
-            self.title.size = self.title.obj.get_window_extent().width, self.title.obj.get_window_extent().height
+            bbox = text_extent(self.title.obj)
+            self.title.size = bbox.width, bbox.height
 
         # legend
         if self.legend.on and self.legend.location in [0, 11]:
@@ -1179,7 +1176,7 @@ class Layout(BaseLayout):
                         continue
 
                     # get the label dimensions and the max size available for this label
-                    bbox = lab.obj[ir, ic][ii, jj].get_window_extent()
+                    bbox = text_extent(lab.obj[ir, ic][ii, jj])
                     if ii < len(lens):
                         label_max_width = lens[jj] * divider
                     else:
@@ -1188,7 +1185,7 @@ class Layout(BaseLayout):
                     # rotate labels that are longer than the box axis size
                     if bbox.width > label_max_width and not (self.box_scale == 'auto' and ii == 0):
                         lab.obj[ir, ic][ii, jj].set_rotation(90)
-                        bbox = lab.obj[ir, ic][ii, jj].get_window_extent()
+                        bbox = text_extent(lab.obj[ir, ic][ii, jj])
 
                     # update the size_all dataframe
                     lab.size_all = (ir, ic, ii, jj, bbox.width, bbox.height, bbox.x0, bbox.x1, bbox.y0, bbox.y1,
@@ -1240,7 +1237,7 @@ class Layout(BaseLayout):
                     # text label size
                     if lab.obj[ir, ic][ii, 0] is None:
                         continue
-                    bbox = lab.obj[ir, ic][ii, 0].get_window_extent()
+                    bbox = text_extent(lab.obj[ir, ic][ii, 0])
                     lab.size_all = (ir, ic, ii, 0, bbox.width, bbox.height, bbox.x0, bbox.x1, bbox.y0, bbox.y1, np.nan)
 
                     # text label rect background size
@@ -1258,7 +1255,7 @@ class Layout(BaseLayout):
         # pie labels
         if self.pie.on:
             for ir, ic in np.ndindex(lab.obj.shape):
-                bboxes = [f.get_window_extent() for f in self.pie.obj[1]]
+                bboxes = [text_extent(f) for f in self.pie.obj[1]]
                 ax_bbox = self.axes.obj[ir, ic].get_window_extent()
                 for ibox, bbox in enumerate(bboxes):
                     if self.pie.obj[1][ibox].get_text() == '':
@@ -1312,6 +1309,7 @@ class Layout(BaseLayout):
 
         return data
 
+    @utl.profiled
     def _get_figure_size(self, data: 'Data', **kwargs):  # noqa: F821
         """Determine the size of the mpl figure canvas in pixels and inches.
 
@@ -1551,7 +1549,7 @@ class Layout(BaseLayout):
             tt.obj[ir, ic] = tlabs
 
             # Get the label sizes and store sizes as 2D array
-            bboxes = [t.get_window_extent() for t in tlabs]
+            bboxes = [text_extent(t) for t in tlabs]
             tt.size_all = ([ir for f in bboxes],
                            [ic for f in bboxes],
                            [0 for f in bboxes],
@@ -1575,6 +1573,7 @@ class Layout(BaseLayout):
 
         tt.size = [tt.size_all.width.max(), tt.size_all.height.max()]
 
+    @utl.profiled
     def _get_tick_label_sizes(self):
         """Get the tick label sizes for each axis."""
 
@@ -1593,6 +1592,7 @@ class Layout(BaseLayout):
                 self._get_tick_label_size(self.axes2, tick, '2', 'major')
                 self._get_tick_label_size(self.axes2, tick, '2', 'minor')
 
+    @utl.profiled
     def _get_tick_overlaps(self, axis: str = ''):
         """Deal with overlapping and out of range ticks.
 
@@ -1616,28 +1616,12 @@ class Layout(BaseLayout):
         for ir, ic in np.ndindex(self.axes.obj.shape):
             # size_all by idx: ir, ic, width, height, x0, x1, y0, y1
             # major
-            if len(xticks.size_all) > 0:
-                xticks_size_all = xticks.size_all[(xticks.size_all.ir == ir) & (xticks.size_all.ic == ic)]
-                xticks_size_all = np.array(xticks_size_all)
-            else:
-                xticks_size_all = []
-            if len(yticks.size_all) > 0:
-                yticks_size_all = yticks.size_all[(yticks.size_all.ir == ir) & (yticks.size_all.ic == ic)]
-                yticks_size_all = np.array(yticks_size_all)
-            else:
-                yticks_size_all = []
+            xticks_size_all = xticks.size_all_axes(ir, ic)
+            yticks_size_all = yticks.size_all_axes(ir, ic)
 
             # minor
-            if len(xticksm.size_all) > 0:
-                xticksm_size_all = xticksm.size_all[(xticksm.size_all.ir == ir) & (xticksm.size_all.ic == ic)]
-                xticksm_size_all = np.array(xticksm_size_all)
-            else:
-                xticksm_size_all = []
-            if len(yticksm.size_all) > 0:
-                yticksm_size_all = yticksm.size_all[(yticksm.size_all.ir == ir) & (yticksm.size_all.ic == ic)]
-                yticksm_size_all = np.array(yticksm_size_all)
-            else:
-                yticksm_size_all = []
+            xticksm_size_all = xticksm.size_all_axes(ir, ic)
+            yticksm_size_all = yticksm.size_all_axes(ir, ic)
 
             # Prevent single tick label axis by adding a text label at one or more range limits
             if len(xticks_size_all) <= 1 \
@@ -1714,7 +1698,7 @@ class Layout(BaseLayout):
                 ax_x0 = self.axes.obj[ir, ic].get_window_extent().x0
                 tick_x0 = xticks_size_all[0][idx]
                 if ax_x0 - tick_x0 > self.ws_col:
-                    slop = xticks.obj[ir, ic][0].get_window_extent().width / 2
+                    slop = text_extent(xticks.obj[ir, ic][0]).width / 2
                     if self.tick_cleanup == 'remove' or slop / sf > self.ws_col:
                         xticks.obj[ir, ic][0].set_visible(False)
                     else:
@@ -1723,22 +1707,17 @@ class Layout(BaseLayout):
             # TODO: Shrink/remove overlapping ticks in grid plots at y-origin
 
             # Remove overlapping ticks on same axis
-            if len(xticks_size_all) > 0:
-                xbbox = df_tick(xticks, xticks_size_all, 'x')
-                xbbox = hide_overlaps(xticks, xbbox, ir, ic)
-            if len(xticksm_size_all) > 0:
-                xbboxm = df_tick_update(df_tick(xticksm, xticksm_size_all, 'x'))
-                xbboxm = hide_overlaps_major_minor(xticks, xticksm, xbbox, xbboxm, ir, ic)
-                xbboxm = hide_overlaps(xticksm, xbboxm, ir, ic)
-
-            if len(yticks_size_all) > 0:
-                ybbox = df_tick(yticks, yticks_size_all, 'y')
-                ybbox = hide_overlaps(yticks, ybbox, ir, ic)
-            if len(yticksm_size_all) > 0:
-                ybboxm = df_tick_update(df_tick(yticksm, yticksm_size_all, 'y'))
-                ybboxm = hide_overlaps_major_minor(yticks, yticksm, ybbox, ybboxm, ir, ic)
-                ybboxm = hide_overlaps(yticksm, ybboxm, ir, ic)
-
+            for tick, major, major_size_all, minor, minor_size_all in \
+                    [('x', xticks, xticks_size_all, xticksm, xticksm_size_all),
+                     ('y', yticks, yticks_size_all, yticksm, yticksm_size_all)]:
+                tt = tick_extents(major, major_size_all, tick)
+                visible = hide_overlaps(major, tt, ir, ic)
+                if len(minor_size_all) > 0:
+                    ttm = tick_extents(minor, minor_size_all, tick)
+                    visiblem = hide_overlaps_major_minor(minor, tt, visible, ttm, ir, ic)
+                    hide_overlaps(minor, ttm, ir, ic, visiblem)
+
+    @utl.profiled
     def _get_tick_xs(self):
         """Calculate extra whitespace at the edge of the plot for the last tick."""
         xticks = self.tick_labels_major_x
@@ -1750,16 +1729,8 @@ class Layout(BaseLayout):
         for ir, ic in np.ndindex(self.axes.obj.shape):
             # size_all by idx:
             #   ir, ic, width, height, x0, x1, y0, y1
-            if len(xticks.size_all) > 0:
-                xticks_size_all = xticks.size_all[(xticks.size_all.ir == ir) & (xticks.size_all.ic == ic)]
-                xticks_size_all = np.array(xticks_size_all)
-            else:
-                xticks_size_all = []
-            if len(yticks.size_all) > 0:
-                yticks_size_all = yticks.size_all[(yticks.size_all.ir == ir) & (yticks.size_all.ic == ic)]
-                yticks_size_all = np.array(yticks_size_all)
-            else:
-                yticks_size_all = []
+            xticks_size_all = xticks.size_all_axes(ir, ic)
+            yticks_size_all = yticks.size_all_axes(ir, ic)
 
             if len(xticks_size_all) > 0:
                 if xticks.rotation == 90:
@@ -1848,6 +1819,7 @@ class Layout(BaseLayout):
 
         return data
 
+    @utl.profiled
     def plot_bar(self, ir: int, ic: int, iline: int, df: pd.DataFrame,
                  leg_name: str, data: 'Data', ngroups: int, stacked: bool,  # noqa: F821
                  std: [None, float], xvals: np.ndarray, inst: pd.Series,
@@ -1969,26 +1941,43 @@ class Layout(BaseLayout):
 
         return data
 
-    def plot_box(self, ir: int, ic: int, data: 'Data', **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
+    @utl.profiled
+    def plot_box(self, ir: int, ic: int, data: 'Data', stats: [pd.DataFrame, None] = None,  # noqa: F821
+                 **kwargs) -> 'MPL_Boxplot_Object':  # noqa: F821
         """Plot boxplot.
 
         Args:
             ir: subplot row index
             ic: subplot column index
             data: Data object
+            stats (optional): precomputed box statistics with one row per box (see utl.group_stats).
+                Defaults to None.
             kwargs: keyword args
 
         Returns:
             box plot MPL object
         """
         bp = None
+        codes = np.concatenate([np.full(len(f), i) for i, f in enumerate(data)])
+        if stats is None:
+            stats = utl.group_stats(np.concatenate(data), codes, len(data))
 
         if self.violin.on:
-            bp = self.axes.obj[ir, ic].violinplot(data,
-                                                  showmeans=False,
-                                                  showextrema=False,
-                                                  showmedians=False,
-                                                  )
+            # Same as Axes.violinplot but with a binned kde of all the violins in one batch
+            coords = np.linspace(stats['min'].values, stats['max'].values, 100, axis=1)
+            density = utl.kde(np.concatenate(data), coords, codes, len(data))
+            vpstats = []
+            for irow, row in enumerate(stats.to_dict('records')):
+                vals = density[irow]
+                if row['count'] > 0 and np.isnan(vals).all():
+                    vals = (coords[irow] == row['min']).astype(float)  # constant data
+                vpstats += [{'coords': coords[irow], 'vals': vals, 'mean': row['mean'], 'median': row['med'],
+                             'min': row['min'], 'max': row['max'], 'quantiles': []}]
+            bp = self.axes.obj[ir, ic].violin(vpstats,
+                                              showmeans=False,
+                                              showextrema=False,
+                                              showmedians=False,
+                                              )
             for ipatch, patch in enumerate(bp['bodies']):
                 patch.set_facecolor(self.violin.fill_color[ipatch])
                 patch.set_edgecolor(self.violin.edge_color[ipatch])
@@ -1996,10 +1985,7 @@ class Layout(BaseLayout):
                 patch.set_zorder(2)
                 patch.set_lw(self.violin.edge_width)
                 if self.violin.box_on:
-                    q25 = np.percentile(data[ipatch], 25)
-                    med = np.percentile(data[ipatch], 50)
-                    q75 = np.percentile(data[ipatch], 75)
-                    iqr = q75 - q25
+                    q25, med, q75, iqr = stats.loc[ipatch, ['q1', 'med', 'q3', 'iqr']]
                     offset = 0.05 * len(data) / 7
                     bb = mtransforms.Bbox([[1 + ipatch - offset, q25],
                                            [1 + ipatch + offset, q75]])
@@ -2008,8 +1994,8 @@ class Layout(BaseLayout):
                                             boxstyle="round,pad=0, rounding_size=0.05",
                                             ec="none", fc=self.violin.box_color, zorder=12)
                     self.axes.obj[ir, ic].add_patch(p_bbox)
-                    whisker_max = min(max(data[ipatch]), q75 + 1.5 * iqr)
-                    whisker_min = max(min(data[ipatch]), q25 - 1.5 * iqr)
+                    whisker_max = min(stats.loc[ipatch, 'max'], q75 + 1.5 * iqr)
+                    whisker_min = max(stats.loc[ipatch, 'min'], q25 - 1.5 * iqr)
                     self.axes.obj[ir, ic].plot([ipatch + 1, ipatch + 1],
                                                [whisker_min, whisker_max],
                                                linestyle=self.violin.whisker_style,
@@ -2023,13 +2009,22 @@ class Layout(BaseLayout):
                                                zorder=13)
 
         elif self.box.on and not self.violin.on:
-            bp = self.axes.obj[ir, ic].boxplot(data,
-                                               labels=[''] * len(data),
-                                               showfliers=False,
-                                               medianprops={'color': self.box.median_color},
-                                               notch=self.box.notch,
-                                               patch_artist=True,
-                                               zorder=3)
+            # Same plumbing as Axes.boxplot but with the box statistics already computed
+            bxpstats = stats[['mean', 'iqr', 'cilo', 'cihi', 'whishi', 'whislo', 'q1', 'med', 'q3']].to_dict('records')
+            for bs in bxpstats:
+                bs.update({'fliers': np.array([]), 'label': ''})
+            bp = self.axes.obj[ir, ic].bxp(bxpstats,
+                                           vert=mpl.rcParams['boxplot.vertical'],
+                                           patch_artist=True,
+                                           shownotches=self.box.notch,
+                                           showmeans=mpl.rcParams['boxplot.showmeans'],
+                                           showcaps=mpl.rcParams['boxplot.showcaps'],
+                                           showbox=mpl.rcParams['boxplot.showbox'],
+                                           showfliers=False,
+                                           boxprops={'linestyle': 'solid'},
+                                           medianprops={'color': self.box.median_color},
+                                           meanline=mpl.rcParams['boxplot.meanline'],
+                                           zorder=3)
             for ipatch, patch in enumerate(bp['boxes']):
                 patch.set_edgecolor(self.box.edge_color[ipatch])
                 patch.set_facecolor(self.box.fill_color[ipatch])
@@ -2051,6 +2046,7 @@ class Layout(BaseLayout):
 
         return bp
 
+    @utl.profiled
     def plot_contour(self, ir: int, ic: int, df: pd.DataFrame, x: str, y: str, z: str,
                      data: 'Data') -> ['MPL_contour_object', 'MPL_colorbar_object']:  # noqa: F821
         """Plot a contour plot.
@@ -2082,6 +2078,7 @@ class Layout(BaseLayout):
         if LooseVersion(mpl.__version__) < LooseVersion('2.2'):
             zi = mlab.griddata(xx, yy, zz, xi, yi, interp=self.contour.interp)
         else:
+            import scipy.interpolate
             zi = scipy.interpolate.griddata((xx, yy), zz,
                                             (xi[None, :], yi[:, None]),
                                             method=self.contour.interp)
@@ -2119,6 +2116,91 @@ class Layout(BaseLayout):
 
         return cc, self.cbar.obj
 
+    @utl.profiled
+    def plot_density(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
+                     leg_name: str, twin: bool, ranges: dict) -> 'MPL_imshow_object':  # noqa: F821
+        """Plot xy data as a rasterized point density image with one bin per axes pixel instead of
+        individual markers.
+
+        Args:
+            ir: subplot row index
+            ic: subplot column index
+            iline: data subset index (from Data.get_plot_data)
+            df: data to plot
+            x: x-axis column name
+            y: y-axis column name
+            leg_name: legend value name if legend enabled
+            twin: denotes if twin axis is enabled or not
+            ranges: axes limits of the subplot (from Data.ranges)
+
+        Returns:
+            reference to the density image object (or the marker plot for non-numeric axes)
+        """
+        # Categorical and datetime axes cannot be binned onto a pixel grid so plot the markers instead
+        if not all(pd.api.types.is_numeric_dtype(df[f]) for f in [x, y]):
+            return self.plot_xy(ir, ic, iline, df, x, y, leg_name, twin, ranges=ranges)
+
+        ax = self.axes2.obj[ir, ic] if twin else self.axes.obj[ir, ic]
+        scale = str(self.axes.scale).lower()
+        xkey = 'x2' if twin and self.axes.twin_y else 'x'
+        ykey = 'y2' if twin and self.axes.twin_x else 'y'
+        xvals = np.asarray(df[x], dtype=float)
+        yvals = np.asarray(df[y], dtype=float)
+        # One bin per rendered pixel of the axes area at the figure dpi
+        shape = [max(int(round(self.axes.size_inches[1] * self.fig.dpi)), 1),
+                 max(int(round(self.axes.size_inches[0] * self.fig.dpi)), 1)]
+
+        # Bin limits follow the axes ranges so subplots with shared ranges share the same pixel grid
+        limits = []
+        for key, vals, log in [(xkey, xvals, scale in LOGX), (ykey, yvals, scale in LOGY)]:
+            vals = vals[np.isfinite(vals) & (vals > 0)] if log else vals[np.isfinite(vals)]
+            vmin = ranges.get(f'{key}min') if ranges.get(f'{key}min') is not None else \
+                (vals.min() if len(vals) > 0 else 1)
+            vmax = ranges.get(f'{key}max') if ranges.get(f'{key}max') is not None else \
+                (vals.max() if len(vals) > 0 else 1)
+            if vmax <= vmin:
+                vmax = vmin + (abs(vmin) if vmin != 0 else 1)
+            limits += [(vmin, vmax, log)]
+
+        # Count the points in each pixel; bin the data in chunks so temporary arrays stay bounded
+        counts = np.zeros(shape[0] * shape[1], dtype=np.int64)
+        for start in range(0, len(xvals), DENSITY_CHUNK):
+            idx = []
+            for vals, (vmin, vmax, log), num in zip([xvals, yvals], limits, shape[::-1]):
+                vals = vals[start:start + DENSITY_CHUNK]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    if log:
+                        vals, vmin, vmax = np.log10(vals), np.log10(vmin), np.log10(vmax)
+                    idx += [np.floor((vals - vmin) / (vmax - vmin) * num)]
+            valid = np.isfinite(idx[0]) & np.isfinite(idx[1]) \
+                & (idx[0] >= 0) & (idx[0] < shape[1]) & (idx[1] >= 0) & (idx[1] < shape[0])
+            counts += np.bincount((idx[1][valid] * shape[1] + idx[0][valid]).astype(np.int64),
+                                  minlength=len(counts))
+        counts = counts.reshape(shape)
+
+        # Opacity scales with the log of the point count in each pixel
+        level = np.ma.masked_equal(counts, 0).astype(float)
+        if counts.max() > 0:
+            level = 0.25 + 0.75 * np.log1p(level) / np.log1p(counts.max())
+        color = mpl.colors.to_rgba(self.markers.edge_color[(iline, leg_name)])
+        cmap = mpl.colors.LinearSegmentedColormap.from_list('density', [color[0:3] + (0,), color])
+
+        if limits[0][2] or limits[1][2]:
+            # images are resampled linearly in data space, so log axes need a mesh with log-spaced edges
+            edges = [np.logspace(np.log10(vmin), np.log10(vmax), num + 1) if log
+                     else np.linspace(vmin, vmax, num + 1) for (vmin, vmax, log), num in zip(limits, shape[::-1])]
+            im = ax.pcolormesh(edges[0], edges[1], level, cmap=cmap, vmin=0, vmax=1, zorder=40, rasterized=True)
+        else:
+            im = ax.imshow(level, cmap=cmap, vmin=0, vmax=1, origin='lower', aspect='auto', interpolation='nearest',
+                           extent=[limits[0][0], limits[0][1], limits[1][0], limits[1][1]], zorder=40)
+
+        # Add an empty marker/line artist for the legend entry
+        if leg_name is not None:
+            self.plot_xy(ir, ic, iline, df.iloc[0:0], x, y, leg_name, twin)
+
+        return im
+
+    @utl.profiled
     def plot_gantt(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                    leg_name: str, yvals: list, ngroups: int):
         """Plot gantt graph.
@@ -2175,6 +2257,7 @@ class Layout(BaseLayout):
                       color=self.gantt.fill_color[(iline, leg_name)])]
             self.legend.add_value(leg_name, handle, 'lines')
 
+    @utl.profiled
     def plot_heatmap(self, ir: int, ic: int, df: pd.DataFrame, x: str, y: str,
                      z: str, data: 'Data') -> 'MPL_imshow_object':  # noqa: F821
         """Plot a heatmap.
@@ -2241,6 +2324,7 @@ class Layout(BaseLayout):
 
         return im
 
+    @utl.profiled
     def plot_hist(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str,
                   y: str, leg_name: str, data: 'Data') -> ['MPL_histogram_object', 'Data']:  # noqa: F821
         """Plot a histogram.
@@ -2268,7 +2352,9 @@ class Layout(BaseLayout):
                                               zorder=3, align=self.hist.align,
                                               cumulative=self.hist.cumulative,
                                               normed=self.hist.normalize,
+                                              range=data.bin_ranges.get((ir, ic)),
                                               rwidth=self.hist.rwidth,
+                                              weights=df[data.weights] if data.weights is not None else None,
                                               stacked=self.hist.stacked,
                                               orientation='vertical' if not self.hist.horizontal else 'horizontal',
                                               )
@@ -2280,7 +2366,9 @@ class Layout(BaseLayout):
                                               zorder=3, align=self.hist.align,
                                               cumulative=self.hist.cumulative,
                                               density=self.hist.normalize,
+                                              range=data.bin_ranges.get((ir, ic)),
                                               rwidth=self.hist.rwidth,
+                                              weights=df[data.weights] if data.weights is not None else None,
                                               orientation='vertical' if not self.hist.horizontal else 'horizontal',
                                               )
 
@@ -2291,19 +2379,23 @@ class Layout(BaseLayout):
 
         # Add a kde
         if self.kde.on:
-            kde = scipy.stats.gaussian_kde(df[x])
+            # Weights are counts so Scott's rule uses the total count rather than the effective sample size
+            valid = df[x].notna().values
+            weights = df[data.weights].values[valid] if data.weights is not None else None
+            bw = 'scott' if weights is None else max(weights.sum(), 1) ** (-1 / 5)
             if not self.hist.horizontal:
                 x0 = np.linspace(data.ranges[ir, ic]['xmin'], data.ranges[ir, ic]['xmax'], 1000)
-                y0 = kde(x0)
+                y0 = utl.kde(df[x].values[valid], x0, bw_method=bw, weights=weights)
             else:
                 y0 = np.linspace(data.ranges[ir, ic]['ymin'], data.ranges[ir, ic]['ymax'], 1000)
-                x0 = kde(y0)
+                x0 = utl.kde(df[x].values[valid], y0, bw_method=bw, weights=weights)
             kwargs = self.make_kw_dict(self.kde)
             kwargs['color'] = RepeatedList(kwargs['color'][iline], 'color')
-            kde = self.plot_line(ir, ic, x0, y0, **kwargs)
+            self.plot_line(ir, ic, x0, y0, **kwargs)
 
         return hist, data
 
+    @utl.profiled
     def plot_imshow(self, ir: int, ic: int, df: pd.DataFrame, data: 'Data'):  # noqa: F821
         """Plot an image.
 
@@ -2366,6 +2458,7 @@ class Layout(BaseLayout):
                                           zorder=kwargs.get('zorder', 1))
         return line
 
+    @utl.profiled
     def plot_pie(self, ir: int, ic: int, df: pd.DataFrame, x: str, y: str, data: 'Data',  # noqa: F821
                  kwargs) -> 'MPL_pie_chart_object':  # noqa: F821
         """Plot a pie chart.
@@ -2458,9 +2551,10 @@ class Layout(BaseLayout):
 
         self.axes.obj[ir, ic].add_collection(p)
 
+    @utl.profiled
     def plot_xy(self, ir: int, ic: int, iline: int, df: pd.DataFrame, x: str, y: str,
                 leg_name: str, twin: bool, zorder: int = 1, line_type: [str, None] = None,
-                marker_disable: bool = False):
+                marker_disable: bool = False, ranges: [dict, None] = None):
         """ Plot xy data
 
         Args:
@@ -2477,6 +2571,8 @@ class Layout(BaseLayout):
             line_type (optional): set the line type to reference the correct Element.
                 Defaults to None.
             marker_disable (optional): flag to disable markers. Defaults to False.
+            ranges (optional): axes limits of the subplot (from Data.ranges) used to decimate only the visible
+                data. Defaults to None.
         """
         def format_marker(marker):
             """Format the marker string to mathtext."""
@@ -2487,8 +2583,6 @@ class Layout(BaseLayout):
             else:
                 return r'$%s$' % marker
 
-        df = df.copy()
-
         if not line_type:
             line_type = self.lines
             line_type_name = 'lines'
@@ -2508,10 +2602,24 @@ class Layout(BaseLayout):
         else:
             dfx = df[x]
 
+        # Level-of-detail decimation to the points that can be resolved at the axes size (the axes ranges are
+        #   already calculated from the full data set)
+        decimate = self.decimate and x is not None and not self.markers.jitter and len(df) > 2 * self.axes.size[0]
+        if decimate:
+            scale = str(self.axes.scale).lower()
+            kw = {'size': self.axes.size_inches, 'dpi': self.fig.dpi, 'logx': scale in LOGX, 'logy': scale in LOGY}
+            if ranges is not None:
+                xkey = 'x2' if twin and self.axes.twin_y else 'x'
+                ykey = 'y2' if twin and self.axes.twin_x else 'y'
+                kw['xlim'] = [ranges.get(f'{xkey}min'), ranges.get(f'{xkey}max')]
+                kw['ylim'] = [ranges.get(f'{ykey}min'), ranges.get(f'{ykey}max')]
+
         points = None
         if self.markers.on and not marker_disable:
             if self.markers.jitter:
                 dfx = np.random.normal(df[x], 0.03, size=len(df[y]))
+            dfm = df.iloc[utl.decimate(df[x], df[y], method='pixel', **kw)] if decimate else df
+            dfmx = dfm[x] if decimate else dfx
             marker = format_marker(self.markers.type[iline])
             if marker != 'None':
                 # use scatter plot for points
@@ -2519,8 +2627,8 @@ class Layout(BaseLayout):
                     c = self.markers.edge_color[(iline, leg_name)]
                 else:
                     c = self.markers.fill_color[(iline, leg_name)] if self.markers.filled else 'none'
-                points = ax.scatter(dfx, df[y],
-                                    s=df[self.markers.size]**2 if isinstance(self.markers.size, str)
+                points = ax.scatter(dfmx, dfm[y],
+                                    s=dfm[self.markers.size]**2 if isinstance(self.markers.size, str)
                                     else self.markers.size[iline]**2,
                                     marker=marker,
                                     c=c,
@@ -2531,7 +2639,7 @@ class Layout(BaseLayout):
                                     )
             else:
                 # what is the use case here?
-                points = ax.plot(dfx, df[y],
+                points = ax.plot(dfmx, dfm[y],
                                  marker=marker,
                                  color=line_type.color[(iline, leg_name)],
                                  linestyle=line_type.style[iline],
@@ -2547,8 +2655,13 @@ class Layout(BaseLayout):
             except TypeError:
                 mask = dfx == dfx
 
+            dfx, dfy = dfx[mask], df[y][mask]
+            if decimate:
+                idx = utl.decimate(dfx, dfy, method=self.decimate, **kw)
+                dfx, dfy = dfx.iloc[idx], dfy.iloc[idx]
+
             # Plot the line
-            lines = ax.plot(dfx[mask], df[y][mask],
+            lines = ax.plot(dfx, dfy,
                             color=line_type.color[(iline, leg_name)],
                             linestyle=line_type.style[iline],
                             linewidth=line_type.width[iline],
@@ -2560,6 +2673,7 @@ class Layout(BaseLayout):
                     and leg_name not in list(self.legend.values['Key']):
                 self.legend.add_value(leg_name, points if points is not None else lines, line_type_name)
 
+    @utl.profiled
     def save(self, filename: str, idx: int = 0):
         """Save a plot window.
 
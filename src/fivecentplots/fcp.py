@@ -18,7 +18,7 @@ import pandas as pd
 import pdb
 import copy
 import shutil
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from . import utilities
 from . import data
@@ -41,16 +41,23 @@ osjoin = os.path.join
 cur_dir = Path(__file__).parent
 user_dir = Path.home()
 
-# transfer theme file or use built-in
-if not (user_dir / '.fivecentplots').exists():
-    os.makedirs(user_dir / '.fivecentplots')
-if not (user_dir / '.fivecentplots' / 'defaults.py'):
-    shutil.copy(cur_dir / 'themes' / 'gray.py', user_dir / '.fivecentplots' / 'defaults.py')
-if (user_dir / '.fivecentplots' / 'defaults.py').exists():
-    sys.path = [str(user_dir / '.fivecentplots')] + sys.path
-    from defaults import *  # noqa, use local file
-else:
-    from . themes.gray import *  # noqa
+# theme values are resolved lazily (see __getattr__) so import does not touch the filesystem or sys.path
+THEME_ATTRS = ['fcp_params', 'colors', 'markers', 'rcParams']
+
+
+def __getattr__(name: str):
+    """Return the default theme values (user theme file or built-in gray theme) on first access.
+
+    Args:
+        name: theme attribute name
+
+    Returns:
+        theme value
+    """
+    if name in THEME_ATTRS:
+        return utl.reload_defaults()[THEME_ATTRS.index(name)]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 # install requirements for other packages beyond what is in setup.py
 global INSTALL
@@ -68,6 +75,213 @@ class EngineError(Exception):
         Exception.__init__(self, *args, **kwargs)
 
 
+class Batch:
+    PLOTS = ['bar', 'boxplot', 'contour', 'gantt', 'heatmap', 'hist', 'imshow', 'nq', 'pie', 'plot']
+
+    def __init__(self, df: pd.DataFrame, **kwargs):
+        """Plot session that shares one DataFrame and its data preparation between many plots.
+
+        The DataFrame is validated and copied once.  The row mask of each `filter` string and the positional
+        group indices and (natsorted) unique values of the grouping columns are cached by the session and reused
+        by every plot made through it.  Axis columns are still converted and transformed by each plot.
+
+        Args:
+            df: DataFrame containing data to plot
+            kwargs: keyword args applied to every plot of the session (overridden by the kwargs of each plot)
+
+        Examples
+        --------
+            >>> import fivecentplots as fcp
+            >>> from pathlib import Path
+            >>> import pandas as pd
+            >>> df = pd.read_csv(Path(fcp.__file__).parent / 'test_data/fake_data.csv')
+            >>> batch = fcp.Batch(df, save=True, inline=False)
+            >>> batch.plot(x='Voltage', y='I [A]', legend='Die', filter='Substrate=="Si" & Target Wavelength==450')
+            >>> batch.render([('plot', dict(x='Voltage', y='I [A]', wrap='Die')),
+                              ('boxplot', dict(y='I [A]', groups=['Substrate', 'Die']))], workers=2)
+        """
+        if df is None:
+            raise data.data.DataError('Must provide a DataFrame for plotting!')
+        if len(df) == 0:
+            raise data.data.DataError('DataFrame is empty.  Nothing to plot!')
+
+        self.df = df.copy()
+        self.kwargs = kwargs
+        self.clear()
+
+    def clear(self):
+        """Reset the cached filters and groups (required after modifying self.df)."""
+        self._masks = {}
+        self._group_index = {}
+        self._group_vals = {}
+
+    def df_filter(self, df: pd.DataFrame, filt: str) -> pd.DataFrame:
+        """Filter a DataFrame with the rows of self.df using the cached mask of a filter string.
+
+        Args:
+            df: DataFrame with the same rows as self.df
+            filt: query expression for filtering (see utl.df_filter)
+
+        Returns:
+            filtered DataFrame (df if the filter could not be applied)
+        """
+        mask = self._mask(filt)
+        if mask is None:
+            return df
+
+        return df.loc[mask]
+
+    def get_group_index(self, filt: [str, None], cols: list) -> dict:
+        """Get the cached positional row indices of each group of the (filtered) DataFrame.
+
+        Args:
+            filt: query expression for filtering or None
+            cols: grouping column names
+
+        Returns:
+            dict of {group value: np.array of row positions} (see data.Data._get_group_index)
+        """
+        key = (filt, tuple(cols))
+        if key not in self._group_index:
+            df = self._subset(filt, cols)
+            self._group_index[key] = df.groupby(cols if len(cols) > 1 else cols[0], sort=False).indices
+
+        return self._group_index[key]
+
+    def get_group_vals(self, filt: [str, None], cols: [str, list], sort: bool = True) -> list:
+        """Get the cached unique values of grouping column(s) of the (filtered) DataFrame.
+
+        Args:
+            filt: query expression for filtering or None
+            cols: grouping column name(s)
+            sort (optional): natsort the values. Defaults to True.
+
+        Returns:
+            list of unique group values
+        """
+        key = (filt, cols if isinstance(cols, str) else tuple(cols), sort)
+        if key not in self._group_vals:
+            self._group_vals[key] = utl.group_vals(self._subset(filt, utl.validate_list(cols)), cols, sort)
+
+        return list(self._group_vals[key])
+
+    def _mask(self, filt: [str, None]) -> [np.ndarray, None]:
+        """Get the cached row mask of a filter string.
+
+        Args:
+            filt: query expression for filtering or None
+
+        Returns:
+            boolean np.array with one value per row of self.df or None if there is no (valid) filter
+        """
+        if not filt:
+            return None
+        if filt not in self._masks:
+            self._masks[filt] = utl.df_filter_mask(self.df, filt)
+
+        return self._masks[filt]
+
+    def render(self, specs: list, workers: [int, bool, None] = None) -> list:
+        """Make a list of plots.
+
+        Args:
+            specs: list of (plot function name, kwargs dict) tuples, i.e. [('plot', {'x': 'Voltage', 'y': 'I [A]'})]
+            workers (optional): number of processes used to render the plots in parallel (True or -1 for all
+                cores); parallel plots are always saved and never shown inline. Defaults to None.
+
+        Returns:
+            list of the return values of the plot functions in the order of specs
+        """
+        for name, kwargs in specs:
+            if name not in self.PLOTS:
+                raise ValueError(f'Unknown plot type "{name}"; choose from {self.PLOTS}')
+
+        if workers is True or workers == -1:
+            workers = os.cpu_count()
+        if workers is None or workers <= 1 or len(specs) <= 1:
+            return [getattr(self, name)(**kwargs) for name, kwargs in specs]
+
+        # Distribute the plots round-robin; the session is sent to each process once
+        workers = min(workers, len(specs))
+        chunks = [list(range(len(specs)))[iw::workers] for iw in range(workers)]
+        results = [None] * len(specs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(batch_worker, self, [specs[f] for f in chunk]) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                for ispec, result in zip(chunk, future.result()):
+                    results[ispec] = result
+
+        return results
+
+    def _subset(self, filt: [str, None], cols: list) -> pd.DataFrame:
+        """Get the (filtered) columns of self.df.
+
+        Args:
+            filt: query expression for filtering or None
+            cols: column names
+
+        Returns:
+            DataFrame subset
+        """
+        mask = self._mask(filt)
+        if mask is None:
+            return self.df[cols]
+
+        return self.df.loc[mask, cols]
+
+    def _plot(self, name: str, kwargs: dict):
+        """Make one plot of the session DataFrame.
+
+        Args:
+            name: plot function name
+            kwargs: keyword args of the plot
+
+        Returns:
+            return value of the plot function
+        """
+        return globals()[name](self.df, **{**self.kwargs, **kwargs, 'batch': self})
+
+    def bar(self, **kwargs):
+        """Bar chart of the session DataFrame (see fcp.bar)."""
+        return self._plot('bar', kwargs)
+
+    def boxplot(self, **kwargs):
+        """Box plot of the session DataFrame (see fcp.boxplot)."""
+        return self._plot('boxplot', kwargs)
+
+    def contour(self, **kwargs):
+        """Contour plot of the session DataFrame (see fcp.contour)."""
+        return self._plot('contour', kwargs)
+
+    def gantt(self, **kwargs):
+        """Gantt chart of the session DataFrame (see fcp.gantt)."""
+        return self._plot('gantt', kwargs)
+
+    def heatmap(self, **kwargs):
+        """Heatmap of the session DataFrame (see fcp.heatmap)."""
+        return self._plot('heatmap', kwargs)
+
+    def hist(self, **kwargs):
+        """Histogram of the session DataFrame (see fcp.hist)."""
+        return self._plot('hist', kwargs)
+
+    def imshow(self, **kwargs):
+        """Image of the session DataFrame (see fcp.imshow)."""
+        return self._plot('imshow', kwargs)
+
+    def nq(self, **kwargs):
+        """Normal quantile plot of the session DataFrame (see fcp.nq)."""
+        return self._plot('nq', kwargs)
+
+    def pie(self, **kwargs):
+        """Pie chart of the session DataFrame (see fcp.pie)."""
+        return self._plot('pie', kwargs)
+
+    def plot(self, **kwargs):
+        """XY plot of the session DataFrame (see fcp.plot)."""
+        return self._plot('plot', kwargs)
+
+
 def bar(df, **kwargs):
     """Bar chart.
 
@@ -115,6 +329,28 @@ def bar(df, **kwargs):
     return plotter(data.Bar, **utl.dfkwarg(df, kwargs))
 
 
+def batch_worker(batch, specs):
+    """Make a subset of the plots of a Batch (used by `Batch.render` in a separate process).
+
+    Args:
+        batch (Batch): plot session
+        specs (list): (plot function name, kwargs dict) tuples
+
+    Returns:
+        list of the return values of the plot functions
+    """
+    # Force a non-interactive backend in the worker process
+    import matplotlib
+    matplotlib.use('Agg')
+
+    results = []
+    for name, kwargs in specs:
+        kwargs = {**kwargs, 'save': True, 'show': False, 'inline': False, 'workers': None}
+        results += [getattr(batch, name)(**kwargs)]
+
+    return results
+
+
 def boxplot(df, **kwargs):
     """Box plot modeled after the "Variability Chart" in JMP which Dummy function to return convenient,
     multi-level group labels automatically along the x-axis.
@@ -433,8 +669,10 @@ def hist(df, **kwargs):
     """Histogram plot.
 
     Args:
-        df (DataFrame | numpy array): DataFrame or numpy array containing data to plot
-            [when passing a numpy array it is automatically converted to a DataFrame]
+        df (DataFrame | numpy array | iterable | str): DataFrame or numpy array containing data to plot
+            [when passing a numpy array it is automatically converted to a DataFrame]; data too large for memory
+            can be an iterable of DataFrame or numpy array chunks, a function returning such an iterable, or the
+            path to a csv or parquet file [counted chunk by chunk with fcp.utilities.hist_stream]
 
     Keyword Args:
         x (str): x-axis column name (i.e., the "value" column from which "counts" are calculated) [REQUIRED]
@@ -473,8 +711,12 @@ def hist(df, **kwargs):
         hist_rwidth (float|None): From matplotlib: the relative width of the bars as a fraction of the bin width; None
           means auto-calculation. Defaults to None. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/hist.html#width
+        hist_shared_bins|shared_bins (bool): Use the same bin edges for every group in a subplot, spanning the
+          x-axis range (shared by all subplots if share_x=True). Defaults to False.
         pdf (bool): Convert the histogram into a probability density function plot. Defaults to False. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/hist.html#pdf
+        weights (str): Column of per-row weights that are added to the bin counts instead of 1 (i.e. the "Counts"
+          column of pre-binned data). Defaults to None.
 
     Examples
     --------
@@ -520,7 +762,29 @@ def hist(df, **kwargs):
         >>> fcp.hist(img_rgb, ax_size=[600, 400], legend='Plane', cfa='grbg', colors=fcp.BAYER, **fcp.HIST)
 
             .. figure:: ../_static/images/example_hist2.png
+
+    Histogram of chunks that are never all in memory at once:
+
+        >>> import fivecentplots as fcp
+        >>> import numpy as np
+        >>> def frames():
+        >>>     for i in range(100):
+        >>>         yield np.random.default_rng(i).normal(size=(1000, 1000))
+        >>> fcp.hist(frames, bins=100)
     """
+    if df is not None and not isinstance(df, (pd.DataFrame, np.ndarray)):
+        # Count the chunks one at a time and plot the pre-binned counts
+        groups = []
+        for key in ['fig_groups', 'row', 'col', 'wrap', 'legend', 'groups']:
+            groups += [f for f in utl.validate_list(kwargs.get(key)) or []
+                       if f not in [None, True, False, 'x', 'y'] and f not in groups]
+        brange = [kwargs['xmin'], kwargs['xmax']] \
+            if kwargs.get('xmin') is not None and kwargs.get('xmax') is not None else None
+        df = utl.hist_stream(df, kwargs.get('x'), groups, kwargs.get('hist_bins', kwargs.get('bins', 20)), brange,
+                             filt=kwargs.pop('filter', None))
+        kwargs['x'] = kwargs.get('x') or 'Value'
+        kwargs['hist_bins'] = kwargs['bins'] = df.attrs['bins']
+        kwargs['weights'] = 'Counts'
 
     return plotter(data.Histogram, **utl.dfkwarg(df, kwargs))
 
@@ -730,6 +994,10 @@ def plot(df, **kwargs):
         LINES:
         cmap (str): Color map name (overrides all other color parameters). Defaults to None. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Colormap
+        decimate (boolean|str): Reduce large data sets to the points that can be resolved at the axes size before
+          drawing (axes ranges still use the full data; mpl only) {False; True or 'minmax' -> first/last/min/max
+          point of each line per pixel column; 'lttb' -> largest-triangle-three-buckets line downsampling}; markers
+          keep one point per occupied pixel. Defaults to False.
         line_alpha (str|list): Transparency value for the line(s) between 0-1. Defaults to 1. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Line-styling
         line_color (str|list): Hex color string or list of hex color strings for the plot lines. Defaults to
@@ -741,6 +1009,9 @@ def plot(df, **kwargs):
         lines (boolean): Enable/disable plotting of lines. Defaults to True. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/plot.html#Scatter
         MARKERS:
+        marker_density|density (boolean): Draw the data points of xy plots as a rasterized density image with one bin
+          per axes pixel (opacity scales with the point count) instead of individual markers; lines are not drawn
+          (mpl only). Defaults to False.
         marker_edge_color (str|list): Hex color string for the marker edges. Defaults to fcp.DEFAULT_COLORS. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Marker-colors
         marker_edge_width (float): Marker edge line width in pixels. Defaults to 1.
@@ -811,8 +1082,8 @@ def plot(df, **kwargs):
         perc_int (list of float): Interval with upper and lower bounds based on percentiles between 0-1. Defaults to
           None. Example: https://endangeredoxen.github.io/fivecentplots/0.5.4/plot.html#Confidence-interval
         FIT:
-        fit (int): Polynomial degree for the fit. Defaults to None. Example:
-          https://endangeredoxen.github.io/fivecentplots/0.5.4/plot.html#Line-fit
+        fit (int|str): Polynomial degree for the fit or "spline" for a cubic smoothing spline. Defaults to None.
+          Example: https://endangeredoxen.github.io/fivecentplots/0.5.4/plot.html#Line-fit
         fit_color (str): Hex color string for the fit line. Defaults to #000000.
         fit_eqn (boolean): Display the fit equation on the plot. Defaults to False.
         fit_font_size (float): Font size of the fit eqn and rsq value. Defaults to 12.
@@ -893,6 +1164,7 @@ def plot_bar(data, layout, ir, ic, df_rc, kwargs):
                 df_rc.loc[df_rc.index.isin(gg.index), 'Instance'] = ii
                 df_rc.loc[df_rc.index.isin(gg.index), 'Total'] = len(g.groupby(data.legend))
     else:
+        df_rc = df_rc.copy()
         df_rc['Instance'] = 0
         df_rc['Total'] = 1
 
@@ -945,95 +1217,86 @@ def plot_box(dd, layout, ir, ic, df_rc, kwargs):
 
     """
 
-    # Init arrays
-    data = []
-    labels = []
-    dividers = []
-    stats = []
-
+    # Box index of every row in the plot order of dd.indices (rows outside of every group get -1)
+    yy = df_rc[dd.y[0]].values.astype(float)
     if dd.groups is not None:
-        col = dd.changes.columns
-
-        # Plot the groups
-        for irow, row in dd.indices.iterrows():
-            gg = df_rc.copy().sort_values(by=dd.groups)
-            gg = gg.set_index(dd.groups)
-            if len(gg) > 1:
-                gg = gg.loc[tuple(row)]
-            if isinstance(gg, pd.Series):
-                gg = pd.DataFrame(gg).T
-            else:
-                gg = gg.reset_index()
-            temp = gg[dd.y].dropna()
-            temp['x'] = irow + 1
-            data += [temp]
-            ss = str(layout.box_stat_line.stat).lower()
-            if ss == 'median':
-                stats += [temp.median().iloc[0]]
-            elif ss == 'std':
-                stats += [temp.std().iloc[0]]
-            elif 'q' in ss:
-                if float(ss.strip('q')) < 1:
-                    stats += [temp.quantile(float(ss.strip('q'))).iloc[0]]
-                else:
-                    stats += [temp.quantile(float(ss.strip('q')) / 100).iloc[0]]
-            else:
-                stats += [temp.mean().iloc[0]]
-            # if not isinstance(row, tuple):  # don't believe this case is possible
-            #     row = [row]
-            # else:
-            row = [str(f) for f in row]
-            labels += ['']
-
-            if len(dd.changes.columns) > 1 and \
-                    dd.changes[col[0]].iloc[irow] == 1 \
-                    and len(kwargs['groups']) > 1:
-                dividers += [irow + 0.5]
-
-            # Plot points
-            if isinstance(dd.legend_vals, pd.DataFrame):
-                for jj, jrow in dd.legend_vals.iterrows():
-                    temp = gg.loc[gg[dd.legend] == jrow['names']][dd.y].dropna()
-                    temp['x'] = irow + 1
-                    if len(temp) > 0:
-                        layout.plot_xy(ir, ic, jj, temp, 'x', dd.y[0], jrow['names'], False, zorder=10)
-            else:
-                if len(temp) > 0:
-                    layout.plot_xy(ir, ic, irow, temp, 'x', dd.y[0], None, False, zorder=10)
-
+        order = {f: i for i, f in enumerate(dd.indices.itertuples(index=False, name=None))}
+        codes = np.full(len(df_rc), -1)
+        for key, idx in dd._get_group_index(df_rc, dd.groups).items():
+            codes[idx] = order.get(key if isinstance(key, tuple) else (key, ), -1)
+        ngroups = len(dd.indices)
     else:
-        data = [df_rc[dd.y].dropna()]
-        labels = ['']
-        data[0]['x'] = 1
-        if isinstance(dd.legend_vals, pd.DataFrame):
-            for jj, jrow in dd.legend_vals.iterrows():
-                temp = data[0].loc[df_rc[dd.legend] == jrow['names']].index
-                layout.plot_xy(ir, ic, jj, data[0].loc[temp], 'x', dd.y[0], jrow['names'], False, zorder=10)
-        else:
-            layout.plot_xy(ir, ic, 0, data[0], 'x', dd.y[0], None, False, zorder=10)
-
-    # Remove lowest divider
-    dividers = [f for f in dividers if f > 0.5]
-
-    # Remove temporary 'x' column
-    for dat in data:
-        del dat['x']
+        codes = np.zeros(len(df_rc), dtype=int)
+        ngroups = 1
+    valid = (codes >= 0) & ~np.isnan(yy)
+
+    # Compute all the box statistics in one pass
+    ss = str(layout.box_stat_line.stat).lower()
+    if ss == 'median':
+        stat = 'med'
+    elif ss == 'std':
+        stat = 'std'
+    elif 'q' in ss:
+        stat = float(ss.strip('q'))
+        stat = f'q{stat if stat < 1 else stat / 100}'
+    else:
+        stat = 'mean'
+    stats = utl.group_stats(yy[valid], codes[valid], ngroups,
+                            quantiles=[float(stat[1:])] if stat[0] == 'q' else [],
+                            conf_coeff=layout.box_mean_diamonds.conf_coeff if layout.box_mean_diamonds.on else None)
+    data = np.split(yy[valid][np.argsort(codes[valid], kind='stable')], np.cumsum(stats['count'].values)[:-1])
+
+    # Plot points with one call per legend value or marker style instead of one per box (keep the group-sorted
+    #   row order of the individual box plots so overlapping markers are drawn the same way)
+    if dd.groups is not None:
+        srt = df_rc[dd.groups].reset_index(drop=True).sort_values(by=dd.groups).index.values
+    else:
+        srt = np.arange(len(df_rc))
+
+    def box_points(mask):
+        """Points DataFrame of the selected rows with the box position as x."""
+        idx = srt[mask[srt]]
+        return pd.DataFrame({dd.y[0]: yy[idx], 'x': codes[idx] + 1}, index=df_rc.index[idx])
+
+    if isinstance(dd.legend_vals, pd.DataFrame):
+        for jj, jrow in dd.legend_vals.iterrows():
+            mask = valid & (df_rc[dd.legend] == jrow['names']).values
+            if mask.any():
+                layout.plot_xy(ir, ic, jj, box_points(mask), 'x', dd.y[0], jrow['names'], False, zorder=10)
+    else:
+        batches = {}
+        for irow in range(ngroups):
+            if layout.lines.on:
+                key = irow  # the connecting line of each box is separate
+            elif not layout.markers.on:
+                key = None
+            else:
+                key = tuple(str(f if isinstance(f, str) else f[irow]) for f in
+                            [layout.markers.type, layout.markers.size, layout.markers.edge_color,
+                             layout.markers.fill_color, layout.markers.edge_width])
+            batches.setdefault(key, []).append(irow)
+        for batch in batches.values():
+            mask = valid & np.isin(codes, batch)
+            if mask.any():
+                layout.plot_xy(ir, ic, batch[0], box_points(mask), 'x', dd.y[0], None, False, zorder=10)
 
     # Range lines
     if layout.box_range_lines.on:
-        for id, dat in enumerate(data):
-            kwargs = layout.box_range_lines.kwargs.copy()
-            layout.plot_line(ir, ic, id + 1 - 0.2, dat.max().iloc[0], x1=id + 1 + 0.2, y1=dat.max().iloc[0], **kwargs)
-            layout.plot_line(ir, ic, id + 1 - 0.2, dat.min().iloc[0], x1=id + 1 + 0.2, y1=dat.min().iloc[0], **kwargs)
-            kwargs['style'] = kwargs['style2']
-            layout.plot_line(ir, ic, id + 1, dat.min().iloc[0], x1=id + 1, y1=dat.max().iloc[0], **kwargs)
+        for irow, (low, high) in enumerate(zip(stats['min'], stats['max'])):
+            kw = layout.box_range_lines.kwargs.copy()
+            layout.plot_line(ir, ic, irow + 1 - 0.2, high, x1=irow + 1 + 0.2, y1=high, **kw)
+            layout.plot_line(ir, ic, irow + 1 - 0.2, low, x1=irow + 1 + 0.2, y1=low, **kw)
+            kw['style'] = kw['style2']
+            layout.plot_line(ir, ic, irow + 1, low, x1=irow + 1, y1=high, **kw)
 
     # Add boxes
-    for ival, val in enumerate(data):
-        data[ival] = val[dd.y[0]].values
-    layout.plot_box(ir, ic, data, **kwargs)
+    layout.plot_box(ir, ic, data, stats=stats, **kwargs)
 
-    # Add divider lines
+    # Add divider lines at each change of the first group column (except the first box)
+    if dd.groups is not None and len(dd.changes.columns) > 1 and len(kwargs['groups']) > 1:
+        dividers = list(np.flatnonzero(dd.changes[dd.changes.columns[0]].values == 1)[1:] + 0.5)
+    else:
+        dividers = []
     if layout.box_divider.on and len(dividers) > 0:
         layout.ax_vlines = copy.deepcopy(layout.box_divider)
         layout.ax_vlines.values = dividers
@@ -1044,23 +1307,18 @@ def plot_box(dd, layout, ir, ic, df_rc, kwargs):
         layout.ax_vlines.values = []
 
     # Add mean/median connecting lines
-    if layout.box_stat_line.on and len(stats) > 0:
-        x = np.linspace(1, dd.ngroups, dd.ngroups)
-        layout.plot_line(ir, ic, x, stats, **layout.box_stat_line.kwargs)
-
-    # add group means
-    if layout.box_group_means.on is True:
-        mgroups = df_rc.groupby(dd.groups[0:1])
-        x = -0.5
-        for ii, (nn, mm) in enumerate(mgroups):
-            y = mm[dd.y[0]].mean()
-            y = [y, y]
-            if ii == 0:
-                x2 = len(mm[dd.groups].drop_duplicates()) + x + 1
-            else:
-                x2 = len(mm[dd.groups].drop_duplicates()) + x
-            layout.plot_line(ir, ic, [x, x2], y, **layout.box_group_means.kwargs)
-            x = x2
+    if layout.box_stat_line.on and dd.groups is not None:
+        x = np.linspace(1, ngroups, ngroups)
+        layout.plot_line(ir, ic, x, list(stats[stat]), **layout.box_stat_line.kwargs)
+
+    # add group means over each run of boxes with the same first group value
+    if layout.box_group_means.on is True and dd.groups is not None:
+        first = dd.indices[dd.indices.columns[0]].values
+        run = np.cumsum(np.r_[False, first[1:] != first[:-1]])
+        runs = stats[['sum', 'count']].groupby(run).sum()
+        edges = np.r_[-0.5, np.cumsum(np.bincount(run)) + 0.5]
+        for ii, y in enumerate(runs['sum'] / runs['count']):
+            layout.plot_line(ir, ic, [edges[ii], edges[ii + 1]], [y, y], **layout.box_group_means.kwargs)
 
     # add grand mean
     if layout.box_grand_mean.on is True:
@@ -1078,12 +1336,9 @@ def plot_box(dd, layout, ir, ic, df_rc, kwargs):
 
     # add mean confidence diamonds
     if layout.box_mean_diamonds.on:
-        mgroups = df_rc.groupby(dd.groups)
-        for ii, (nn, mm) in enumerate(mgroups):
-            low, high = utl.ci(mm[dd.y[0]], layout.box_mean_diamonds.conf_coeff)
-            mm = mm[dd.y[0]].mean()
-            x1 = -layout.box_mean_diamonds.width[0] / 2
-            x2 = layout.box_mean_diamonds.width[0] / 2
+        x1 = -layout.box_mean_diamonds.width[0] / 2
+        x2 = layout.box_mean_diamonds.width[0] / 2
+        for ii, (mm, low, high) in enumerate(zip(stats['mean'], stats['ci_low'], stats['ci_high'])):
             points = [[ii + 1 + x1, mm],
                       [ii + 1, high],
                       [ii + 1 + x2, mm],
@@ -1158,7 +1413,49 @@ def plot_control_limit(ir: int, ic: int, iline: int, layout: 'engines.Layout', d
     return data
 
 
-def plot_fit(data, layout, ir, ic, iline, df, x, y, twin, leg_name, ngroups):
+def get_fits(data, layout, ir, ic, lines, grouped):
+    """
+    Compute the fit data of every curve in a subplot at once
+
+    Args:
+        data (obj): Data object
+        layout (obj): layout object
+        ir (int): current subplot row number
+        ic (int): current subplot column number
+        lines (list): curve data subsets from data.get_plot_data
+        grouped (list): groupby object of each curve subset (None if not grouped)
+
+    Returns:
+        list with the fit data of each group of each curve subset (None if there is no fit)
+    """
+    fits = [None] * len(lines)
+    if not layout.fit.on or not layout.markers.on and (not layout.lines.on or data.stat is not None):
+        return fits
+
+    # Curves with the same x and y columns are fit together; codes number every legend value x group
+    pairs = {}
+    for ii, (iline, df, x, y, z, leg_name, twin, ngroups) in enumerate(lines):
+        pairs.setdefault((x, y), []).append(ii)
+    for (x, y), curves in pairs.items():
+        codes, spans, ncurves = [], [], 0
+        for ii in curves:
+            if grouped[ii] is not None:
+                code = grouped[ii].ngroup().fillna(-1).values.astype(int)
+                num = grouped[ii].ngroups
+            else:
+                code, num = np.zeros(len(lines[ii][1]), dtype=int), 1
+            codes += [np.where(code >= 0, code + ncurves, -1)]
+            spans += [(ii, ncurves, num)]
+            ncurves += num
+        df = pd.concat([lines[ii][1][[x, y]] for ii in curves])
+        batch = data.get_fit_data_groups(ir, ic, df, x, y, np.concatenate(codes), ncurves)
+        for ii, start, num in spans:
+            fits[ii] = batch[start:start + num]
+
+    return fits
+
+
+def plot_fit(data, layout, ir, ic, iline, df, x, y, twin, leg_name, ngroups, fit=None):
     """
     Plot a fit line
 
@@ -1174,12 +1471,13 @@ def plot_fit(data, layout, ir, ic, iline, df, x, y, twin, leg_name, ngroups):
         twin (bool): denote twin axis
         leg_name (str): legend value
         ngroups (int): number of groups in this data set
+        fit (tuple): precomputed fit data from get_fits
 
     """
     if not layout.fit.on:
         return
 
-    df, coeffs, rsq = data.get_fit_data(ir, ic, df, x, y)
+    df, coeffs, rsq = fit if fit is not None else data.get_fit_data(ir, ic, df, x, y)
     if layout.legend._on:
         if layout.fit.legend_text is not None:
             leg_name = layout.fit.legend_text
@@ -1197,7 +1495,7 @@ def plot_fit(data, layout, ir, ic, iline, df, x, y, twin, leg_name, ngroups):
                    leg_name, twin, line_type='fit',
                    marker_disable=True)
 
-    if layout.fit.eqn:
+    if layout.fit.eqn and len(coeffs) > 0:
         eqn = 'y='
         for ico, coeff in enumerate(coeffs[0:-1]):
             if coeff > 0 and ico > 0:
@@ -1437,20 +1735,32 @@ def plot_xy(data, layout, ir, ic, df_rc, kwargs):
 
     """
 
-    for iline, df, x, y, z, leg_name, twin, ngroups in data.get_plot_data(df_rc):
+    lines = list(data.get_plot_data(df_rc))
+    grouped = [df.groupby(utl.validate_list(kwargs['groups']), sort=data.sort) if kwargs.get('groups', False)
+               else None for iline, df, x, y, z, leg_name, twin, ngroups in lines]
+    fits = get_fits(data, layout, ir, ic, lines, grouped)
+
+    for (iline, df, x, y, z, leg_name, twin, ngroups), groups, fit in zip(lines, grouped, fits):
         if data.stat is not None:
             layout.lines.on = False
         if not layout.lines.on and not layout.markers.on:
             pass
-        elif kwargs.get('groups', False):
-            for nn, gg in df.groupby(utl.validate_list(kwargs['groups']), sort=data.sort):
-                layout.plot_xy(ir, ic, iline, gg, x, y, leg_name, twin)
+        elif groups is not None:
+            for igroup, (nn, gg) in enumerate(groups):
+                if layout.markers.density:
+                    layout.plot_density(ir, ic, iline, gg, x, y, leg_name, twin, data.ranges[ir, ic])
+                else:
+                    layout.plot_xy(ir, ic, iline, gg, x, y, leg_name, twin, ranges=data.ranges[ir, ic])
                 plot_fit(data, layout, ir, ic, iline, gg,
-                         x, y, twin, leg_name, ngroups)
+                         x, y, twin, leg_name, ngroups, fit[igroup] if fit else None)
+        elif layout.markers.density:
+            layout.plot_density(ir, ic, iline, df, x, y, leg_name, twin, data.ranges[ir, ic])
+            plot_fit(data, layout, ir, ic, iline, df,
+                     x, y, twin, leg_name, ngroups, fit[0] if fit else None)
         else:
-            layout.plot_xy(ir, ic, iline, df, x, y, leg_name, twin)
+            layout.plot_xy(ir, ic, iline, df, x, y, leg_name, twin, ranges=data.ranges[ir, ic])
             plot_fit(data, layout, ir, ic, iline, df,
-                     x, y, twin, leg_name, ngroups)
+                     x, y, twin, leg_name, ngroups, fit[0] if fit else None)
 
         plot_ref(ir, ic, iline, data, layout, df, x, y)
         if not layout.lines.on and not layout.markers.on:
@@ -1469,72 +1779,38 @@ def plot_xy(data, layout, ir, ic, df_rc, kwargs):
     return data
 
 
-def plotter(dobj, **kwargs):
-    """ Main plotting function
-
-    UPDATE At minimum, it requires a pandas DataFrame with at
-    least two columns and two column names for the x and y axis.  Plots can be
-    customized and enhanced by passing keyword arguments as defined below.
-    Default values that must be defined in order to generate the plot are
-    pulled from the fcp_params default dictionary
+def plot_figure(dd, engine, defaults, ifig, fig_item, fig_cols, kwargs):
+    """
+    Build, draw, and optionally save a single figure
 
     Args:
-        dobj (Data object):  data class for the specific plot type
-
-    Keyword Args:
-        Defined by the specific plot type
+        dd (obj): Data object subset for the current figure
+        engine (module): plotting engine module
+        defaults (tuple): items from the theme file
+        ifig (int|None): current figure index
+        fig_item (str|tuple|None): current figure group value
+        fig_cols (list|None): figure grouping column names
+        kwargs (dict): keyword args
 
     Returns:
-        plots
+        updated Data object
+        updated kwargs
+        filename of the figure
+        True if the figure was saved to disk
     """
+    profiler = kwargs['profiler']
 
-    # Check for deprecated kwargs
-    kwargs = deprecated(kwargs)
-
-    # Apply globals if they don't exist
-    for k, v in fcp.KWARGS.items():
-        if k not in kwargs.keys():
-            kwargs[k] = v
-
-    # Build the Timer
-    kwargs['timer'] = utl.Timer(print=kwargs.get('timer', False), start=True, units='ms')
-
-    # Set the plotting engine
-    verbose = kwargs.get('verbose', False)
-    defaults = utl.reload_defaults(kwargs.get('theme', None), verbose=verbose)
-    engine = utl.kwget(kwargs, defaults[0], 'engine', 'mpl')
-    if not hasattr(engines, engine):
-        if engine in INSTALL.keys():
-            installs = '\npip install '.join(INSTALL[engine])
-            raise EngineError(f'Plotting engine "{engine}" is supported by not installed! '
-                              f'Please run the following:\npip install {installs}')
-        else:
-            raise EngineError(f'Plotting engine "{engine}" is not supported')
-        return
-    else:
-        engine = getattr(engines, engine)
-    kwargs['timer'].get('Layout obj')
-
-    # Build the data object and update kwargs
-    dd = dobj(fcpp=defaults[0], **kwargs)
-    for k, v in kwargs.items():
-        if k in dd.__dict__.keys():
-            kwargs[k] = getattr(dd, k)
-    kwargs['timer'].get('Data obj')
-
-    # Iterate over discrete figures
-    for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
-        kwargs['timer'].get('dd.get_df_figure')
-        # Create a layout object
+    # Create a layout object
+    with profiler.span('Layout'):
         layout = engine.Layout(dd, defaults, **kwargs)
         kwargs = layout.kwargs
-        kwargs['timer'].get('layout class')
 
-        # Make the figure
+    # Make the figure
+    with profiler.span('make_figure'):
         dd = layout.make_figure(dd, **kwargs)
-        kwargs['timer'].get('ifig=%s | make_figure' % ifig)
 
-        # Turn off empty subplots and populate layout.axes.visible)
+    # Turn off empty subplots and populate layout.axes.visible)
+    with profiler.span('hide_empty_subplots'):
         for ir, ic, df_rc in dd.get_rc_subset():
             if len(df_rc) == 0:  # could set this value in Data after first time to avoid recalc
                 if dd.wrap is None:
@@ -1544,115 +1820,271 @@ def plotter(dobj, **kwargs):
                 if layout.axes2.obj[ir, ic] is not None:
                     layout.axes2.obj[ir, ic].axis('off')
                 continue
-        kwargs['timer'].get('ifig=%s | turn off empty subplots' % ifig)
 
-        # Make the subplots
-        for ir, ic, df_rc in dd.get_rc_subset():
-            if not layout.axes.visible[ir, ic]:
-                continue
+    # Make the subplots
+    for ir, ic, df_rc in dd.get_rc_subset():
+        if not layout.axes.visible[ir, ic]:
+            continue
 
+        with profiler.span('subplot', ir=ir, ic=ic):
             # Set the axes colors
-            layout.set_axes_colors(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_colors' % (ifig, ir, ic))
+            with profiler.span('set_axes_colors'):
+                layout.set_axes_colors(ir, ic)
 
             # Add and format gridlines
-            layout.set_axes_grid_lines(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_grid_lines' % (ifig, ir, ic))
+            with profiler.span('set_axes_grid_lines'):
+                layout.set_axes_grid_lines(ir, ic)
 
             # Add horizontal and vertical lines
-            layout.add_hvlines(ir, ic, df_rc)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | add_hvlines' % (ifig, ir, ic))
+            with profiler.span('add_hvlines'):
+                layout.add_hvlines(ir, ic, df_rc)
 
             # Plot the data
-            dd = globals()['plot_{}'.format(dd.name)](dd, layout, ir, ic, df_rc, kwargs)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | plot' % (ifig, ir, ic))
+            with profiler.span('plot_{}'.format(dd.name)):
+                dd = globals()['plot_{}'.format(dd.name)](dd, layout, ir, ic, df_rc, kwargs)
 
             # Set linear or log axes scaling
-            layout.set_axes_scale(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_scale' % (ifig, ir, ic))
+            with profiler.span('set_axes_scale'):
+                layout.set_axes_scale(ir, ic)
 
             # Set axis ranges
-            layout.set_axes_ranges(ir, ic, dd.ranges)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_ranges' % (ifig, ir, ic))
+            with profiler.span('set_axes_ranges'):
+                layout.set_axes_ranges(ir, ic, dd.ranges)
 
             # Add axis labels
-            layout.set_axes_labels(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_labels' % (ifig, ir, ic))
+            with profiler.span('set_axes_labels'):
+                layout.set_axes_labels(ir, ic)
 
             # Add rc labels
-            layout.set_axes_rc_labels(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_rc_labels' % (ifig, ir, ic))
+            with profiler.span('set_axes_rc_labels'):
+                layout.set_axes_rc_labels(ir, ic)
 
             # Adjust tick marks
-            layout.set_axes_ticks(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | set_axes_ticks' % (ifig, ir, ic))
+            with profiler.span('set_axes_ticks'):
+                layout.set_axes_ticks(ir, ic)
 
             # Add box labels
             if dd.name == 'box':
-                layout.add_box_labels(ir, ic, dd)
-                kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | add_box_labels' % (ifig, ir, ic))
+                with profiler.span('add_box_labels'):
+                    layout.add_box_labels(ir, ic, dd)
 
             # Add arbitrary text
-            layout.add_text(ir, ic)
-            kwargs['timer'].get('ifig=%s | ir=%s | ic=%s | add_text' % (ifig, ir, ic))
+            with profiler.span('add_text'):
+                layout.add_text(ir, ic)
 
-        # Make the legend
+    # Make the legend
+    with profiler.span('add_legend'):
         layout.add_legend(dd.legend_vals)
-        kwargs['timer'].get('ifig=%s | add_legend' % (ifig))
 
-        # Add a figure title
+    # Add a figure title
+    with profiler.span('set_figure_title'):
         layout.set_figure_title()
-        kwargs['timer'].get('ifig=%s | set_figure_title' % (ifig))
 
-        # Final adjustments
+    # Final adjustments
+    with profiler.span('set_figure_final_layout'):
         layout.set_figure_final_layout(dd, **kwargs)
-        kwargs['timer'].get('ifig=%s | set_figure_final_layout' % (ifig))
 
-        # Build the save filename
-        filename = utl.set_save_filename(dd.df_fig, ifig, fig_item, fig_cols, layout, kwargs)
-        if 'filepath' in kwargs.keys():
-            filename = os.path.join(kwargs['filepath'], filename)
+    # Build the save filename
+    filename = utl.set_save_filename(dd.df_fig, ifig, fig_item, fig_cols, layout, kwargs)
+    if 'filepath' in kwargs.keys():
+        filename = os.path.join(kwargs['filepath'], filename)
 
-        # Optionally save and open
-        if kwargs.get('save', False) or kwargs.get('show', False):
-            if ifig:
-                idx = ifig
-            else:
-                idx = 0
+    # Optionally save and open
+    saved = False
+    if kwargs.get('save', False) or kwargs.get('show', False):
+        if ifig:
+            idx = ifig
+        else:
+            idx = 0
+        with profiler.span('save'):
             layout.save(filename, idx)
-            if kwargs.get('return_filename'):
-                layout.close()
+        saved = True
+        if kwargs.get('return_filename'):
+            layout.close()
+            return dd, kwargs, filename, saved
+        if kwargs.get('print_filename', False):
+            print(filename)
+        if kwargs.get('show', False):
+            utl.show_file(filename)
+
+        # Disable inline unless explicitly called in kwargs
+        if not kwargs.get('inline'):
+            kwargs['inline'] = False
+
+    # Return inline plot
+    with profiler.span('show'):
+        if not kwargs.get('inline', True):
+            layout.close()
+        else:
+            layout.show()
+
+    return dd, kwargs, filename, saved
+
+
+def plotter(dobj, **kwargs):
+    """ Main plotting function
+
+    UPDATE At minimum, it requires a pandas DataFrame with at
+    least two columns and two column names for the x and y axis.  Plots can be
+    customized and enhanced by passing keyword arguments as defined below.
+    Default values that must be defined in order to generate the plot are
+    pulled from the fcp_params default dictionary
+
+    Args:
+        dobj (Data object):  data class for the specific plot type
+
+    Keyword Args:
+        Defined by the specific plot type
+
+    Returns:
+        plots
+    """
+
+    # Check for deprecated kwargs
+    kwargs = deprecated(kwargs)
+
+    # Apply globals if they don't exist
+    for k, v in fcp.KWARGS.items():
+        if k not in kwargs.keys():
+            kwargs[k] = v
+
+    # Keep the unmodified kwargs for any parallel figure workers
+    kwargs_workers = kwargs.copy()
+
+    # Build the profiler
+    profiler = kwargs['profiler'] = utl.Profiler.from_kwargs(kwargs)
+
+    with profiler, profiler.span(dobj.__name__):
+        # Set the plotting engine
+        verbose = kwargs.get('verbose', False)
+        with profiler.span('reload_defaults'):
+            defaults = utl.reload_defaults(kwargs.get('theme', None), verbose=verbose)
+        engine = utl.kwget(kwargs, defaults[0], 'engine', 'mpl')
+        if not hasattr(engines, engine):
+            if engine in INSTALL.keys():
+                installs = '\npip install '.join(INSTALL[engine])
+                raise EngineError(f'Plotting engine "{engine}" is supported by not installed! '
+                                  f'Please run the following:\npip install {installs}')
+            else:
+                raise EngineError(f'Plotting engine "{engine}" is not supported')
+            return
+        else:
+            engine = getattr(engines, engine)
+
+        # Build the data object and update kwargs
+        with profiler.span('Data'):
+            dd = dobj(fcpp=defaults[0], **kwargs)
+            for k, v in kwargs.items():
+                if k in dd.__dict__.keys():
+                    kwargs[k] = getattr(dd, k)
+
+        # Optionally render the figure groups in a process pool
+        workers = kwargs.get('workers', None)
+        if workers is True or workers == -1:
+            workers = os.cpu_count()
+        if workers is not None and workers > 1:
+            dd._get_fig_groupings()
+            if dd.fig_vals is not None and len(dd.fig_vals) > 1:
+                with profiler.span('plotter_parallel', workers=workers):
+                    return plotter_parallel(dobj, dd, workers, kwargs_workers)
+
+        # Iterate over discrete figures
+        for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
+            with profiler.span('figure', ifig=ifig):
+                dd, kwargs, filename, saved = plot_figure(dd, engine, defaults, ifig, fig_item, fig_cols, kwargs)
+            if saved and kwargs.get('return_filename'):
                 if 'filepath' in kwargs.keys():
                     return osjoin(kwargs['filepath'], filename)
                 else:
                     return osjoin(os.getcwd(), filename)
-            if kwargs.get('print_filename', False):
-                print(filename)
-            if kwargs.get('show', False):
-                utl.show_file(filename)
 
-            # Disable inline unless explicitly called in kwargs
-            if not kwargs.get('inline'):
-                kwargs['inline'] = False
-        kwargs['timer'].get('ifig=%s | save' % (ifig))
+        # Save data used in the figures
+        if kwargs.get('save_data', False):
+            with profiler.span('save_data'):
+                if isinstance(kwargs['save_data'], str):
+                    filename = kwargs['save_data']
+                else:
+                    filename = os.path.splitext(filename)[0] + '.csv'
+                dd.df_all[dd.cols_all].to_csv(filename, index=False)
 
-        # Return inline plot
-        if not kwargs.get('inline', True):
-            layout.close()
-        else:
-            layout.show()
-        kwargs['timer'].get('ifig=%s | return inline' % (ifig))
+
+def plotter_parallel(dobj, dd, workers, kwargs):
+    """Render the figure groups of a plot in a pool of worker processes.
+
+    Each worker builds its own Data object from the original kwargs and only renders its share of the
+    figure groups, so the DataFrame is sent to each process once rather than once per figure.  Figures are
+    always saved to disk (using the same filenames as a serial plot) and never shown inline.
+
+    Args:
+        dobj (Data object): data class for the specific plot type
+        dd (obj): Data object with the figure groupings already populated
+        workers (int): number of worker processes
+        kwargs (dict): user-defined keyword args before any modification by the Data object
+
+    Returns:
+        list of the saved file paths in figure order
+    """
+    kwargs['save'] = True
+    kwargs['show'] = False
+    kwargs['inline'] = False
+    kwargs['return_filename'] = False
+    kwargs['print_filename'] = False
+    kwargs.pop('workers', None)
+    kwargs.pop('profile', None)  # spans recorded in other processes cannot be returned to the caller
+
+    # Distribute the figure indices round-robin so each worker gets a similar load
+    nfigs = len(dd.fig_vals)
+    workers = min(workers, nfigs)
+    chunks = [list(range(nfigs))[iw::workers] for iw in range(workers)]
+
+    filenames = [None] * nfigs
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(plotter_worker, dobj, chunk, kwargs) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            for ifig, filename in zip(chunk, future.result()):
+                filenames[ifig] = filename
 
     # Save data used in the figures
     if kwargs.get('save_data', False):
         if isinstance(kwargs['save_data'], str):
             filename = kwargs['save_data']
         else:
-            filename = filename.split('.')[0] + '.csv'
+            filename = os.path.splitext(filenames[-1])[0] + '.csv'
         dd.df_all[dd.cols_all].to_csv(filename, index=False)
-        kwargs['timer'].get('ifig=%s | save_data' % (ifig))
 
-    kwargs['timer'].get_total()
+    return filenames
+
+
+def plotter_worker(dobj, ifigs, kwargs):
+    """Render a subset of the figure groups of a plot (used by `plotter_parallel` in a separate process).
+
+    Args:
+        dobj (Data object): data class for the specific plot type
+        ifigs (list): indices of the figure groups to render
+        kwargs (dict): user-defined keyword args
+
+    Returns:
+        list of the absolute paths of the saved files
+    """
+    # Force a non-interactive backend in the worker process
+    import matplotlib
+    matplotlib.use('Agg')
+
+    kwargs['profiler'] = utl.Profiler.from_kwargs(kwargs)
+    defaults = utl.reload_defaults(kwargs.get('theme', None))
+    engine = getattr(engines, utl.kwget(kwargs, defaults[0], 'engine', 'mpl'))
+
+    dd = dobj(fcpp=defaults[0], **kwargs)
+    for k, v in kwargs.items():
+        if k in dd.__dict__.keys():
+            kwargs[k] = getattr(dd, k)
+
+    filenames = []
+    for ifig, fig_item, fig_cols, dd in dd.get_df_figure(ifigs):
+        dd, kwargs, filename, saved = plot_figure(dd, engine, defaults, ifig, fig_item, fig_cols, kwargs)
+        filenames += [os.path.abspath(filename)]
+
+    return filenames
 
 
 def set_theme(theme=None, verbose=False):
@@ -1667,6 +2099,7 @@ def set_theme(theme=None, verbose=False):
     else:
         my_theme_dir = osjoin(user_dir, '.fivecentplots')
         ignores = ['defaults.py', 'defaults_old.py']
+        os.makedirs(my_theme_dir, exist_ok=True)
 
     if theme is not None:
         theme = theme.replace('.py', '')
@@ -1722,9 +2155,6 @@ def set_theme(theme=None, verbose=False):
         shutil.copy2(osjoin(user_dir, '.fivecentplots', 'defaults.py'),
                      osjoin(user_dir, '.fivecentplots', 'defaults_old.py'))
 
-    if not os.path.exists(osjoin(user_dir, '.fivecentplots')):
-        os.makedirs(osjoin(user_dir, '.fivecentplots'))
-
     if entry is not None and int(entry) <= len(themes):
         shutil.copy2(osjoin(cur_dir, 'themes', themes[int(entry) - 1] + '.py'),
                      osjoin(user_dir, '.fivecentplots', 'defaults.py'))
@@ -2153,6 +2583,10 @@ def lines():
     Keyword Args:
         cmap (str): Color map name (overrides all other color parameters). Defaults to None. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Colormap
+        decimate (boolean|str): Reduce large data sets to the points that can be resolved at the axes size before
+          drawing (axes ranges still use the full data; mpl only) {False; True or 'minmax' -> first/last/min/max
+          point of each line per pixel column; 'lttb' -> largest-triangle-three-buckets line downsampling}; markers
+          keep one point per occupied pixel. Defaults to False.
         line_alpha (str|list): Transparency value for the line(s) between 0-1. Defaults to 1. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Line-styling
         line_color (str|list): Hex color string or list of hex color strings for the plot lines. Defaults to
@@ -2220,6 +2654,9 @@ def markers():
     """Dummy function to return the markers API with `help()` (not used directly for plotting).
 
     Keyword Args:
+        marker_density|density (boolean): Draw the data points of xy plots as a rasterized density image with one bin
+          per axes pixel (opacity scales with the point count) instead of individual markers; lines are not drawn
+          (mpl only). Defaults to False.
         marker_edge_color (str|list): Hex color string for the marker edges. Defaults to fcp.DEFAULT_COLORS. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#Marker-colors
         marker_edge_width (float): Marker edge line width in pixels. Defaults to 1.
@@ -2298,6 +2735,11 @@ def options():
           (convenient to disable if doing automated batch plotting). Defaults to True.
         print_filename (boolean): Print the output filename. Defaults to False. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/grouping.html#figure-plots
+        profile (boolean|str|Profiler): Record a hierarchical time profile (plot, figure, subplot, stage, and engine
+          call) of the plotting process: True prints a summary table, a filename ending with ".csv", ".json", or
+          ".trace.json" (Chrome trace) exports the spans, and a utl.Profiler instance collects the spans for further
+          analysis via Profiler.df. Defaults to None.
+        profile_memory (boolean): Add the tracemalloc memory change of each span to the profile. Defaults to False.
         return_filename (boolean): Return the output filename. Defaults to False.
         save (boolean): Save the plot to disc. Defaults to False.
         save_data (boolean): Save the DataFrame subset that is created and used by a given plot. Defaults to False.
@@ -2307,6 +2749,9 @@ def options():
         theme (str): Select a theme file for the current plot only. Defaults to None. Example:
           https://endangeredoxen.github.io/fivecentplots/0.5.4/styles.html#On-the-fly
         timer (boolean): Debug feature to get a time log for each step in the plotting process. Defaults to False.
+        workers (int): Number of processes used to render fig groupings in parallel; forces save=True and returns the
+          list of saved filenames. Defaults to None. Example:
+          https://endangeredoxen.github.io/fivecentplots/0.5.4/grouping.html#figure-plots
 
     """
 
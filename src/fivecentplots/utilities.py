@@ -1,37 +1,25 @@
-import importlib
+import contextlib
+import copy
+import json
+import threading
+import time
+import tracemalloc
+import types
 import os
 import sys
 import pdb
 import numpy as np
 import pandas as pd
-import scipy.stats as ss
-import datetime
 import subprocess
 import pathlib
 import re
 import shlex
 import inspect
-from matplotlib.font_manager import FontProperties, findfont
-try:
-    from PIL import ImageFont  # used only for bokeh font size calculations
-except ImportError:
-    pass
-try:
-    import cv2  # required for testing
-except (ImportError, ModuleNotFoundError):
-    pass
+from functools import lru_cache, wraps
+from natsort import natsorted
 db = pdb.set_trace
-
-# Get user default file
-user_dir = pathlib.Path.home()
-default_path = user_dir / '.fivecentplots'
-if default_path.exists() and default_path not in sys.path:
-    sys.path = [str(default_path)] + sys.path
-    try:
-        from defaults import *  # noqa
-    except ModuleNotFoundError:
-        from . themes.gray import *  # noqa
-
+_THEME_CACHE = {}  # theme file values by (path, modification time, contents hash)
+_THEME_LOCK = threading.Lock()
 
 # Convenience kwargs
 HIST = {'ax_scale': 'logy', 'markers': False, 'line_width': 2, 'preset': 'HIST'}
@@ -79,82 +67,211 @@ class CFAError(Exception):
         Exception.__init__(self, *args, **kwargs)
 
 
-class Timer:
-    def __init__(self, print: bool = True, start: bool = False, units: str = 's'):
-        """Quick timer class to optimize/debug speed of various functions.
+class Profiler:
+    def __init__(self, enabled: bool = True, memory: bool = False, print: bool = False):
+        """Hierarchical profiler to find the slow stages of the plotting process.
+
+        Spans are nested (plot -> figure -> subplot -> stage -> engine call) and timed with
+        ``time.perf_counter_ns``.  A Profiler instance can be passed to any plot via the ``profile`` kwarg
+        and reused across several plots; the recorded spans are then available from ``df``, ``to_json`` or
+        ``to_chrome_trace``.
 
         Args:
-            print (optional): enable/disable print messages. Defaults to True.
-            start (optional): start timer on class init. Defaults to False.
-            units (optional): convert timedelta into "s" or "ms". Defaults to 's'.
+            enabled (optional): record spans; if False, ``span`` returns a no-op context. Defaults to True.
+            memory (optional): also record the change in traced memory of each span with ``tracemalloc``.
+                Defaults to False.
+            print (optional): print the duration of each span as it closes. Defaults to False.
         """
+        self.enabled = enabled or print
+        self.memory = memory
         self.print = print
-        self.init = None
-        self.units = units
-        self._total = 0
-        if start:
-            self.start()
-        if units not in ['s', 'ms']:
-            raise ValueError('timer only supports "s" and "ms" time units')
+        self.path = None
+        self.spans = []
+        self._stack = []
+        self._t0 = time.perf_counter_ns()
+        self._tracing = False
+
+    def __enter__(self):
+        """Start tracing memory allocations, if enabled and not already running."""
+        if self.enabled and self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *args):
+        """Stop memory tracing and export the results."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        if self.print:
+            print(f'Total time: {self.total:.3f} [ms]')
+        if self.path is True:
+            print(self.summary().to_string())
+        elif self.path is not None:
+            self.save(self.path)
+
+    @classmethod
+    def from_kwargs(cls, kwargs: dict) -> 'Profiler':
+        """Build the profiler for a plot from the user kwargs.
+
+        Args:
+            kwargs: user-defined keyword args; uses ``profile``, ``profile_memory`` and ``timer``
+
+        Returns:
+            Profiler instance (the user's own instance if ``profile`` is a Profiler)
+        """
+        profile = kwargs.get('profile', None)
+        if isinstance(profile, Profiler):
+            return profile
+        prof = cls(enabled=profile not in [None, False], memory=kwargs.get('profile_memory', False),
+                   print=kwargs.get('timer', False))
+        if profile not in [None, False]:
+            prof.path = profile
+        return prof
 
     @property
-    def now(self):
-        """Current datetime."""
-        return datetime.datetime.now()
+    def df(self) -> pd.DataFrame:
+        """DataFrame of the recorded spans in start order (times in ms, memory in bytes)."""
+        cols = ['id', 'parent', 'depth', 'name', 'path', 'start', 'duration', 'self_time', 'memory']
+        if len(self.spans) == 0:
+            return pd.DataFrame(columns=cols)
+
+        df = pd.DataFrame(self.spans)
+        df['duration'] = (df['stop'] - df['start']) / 1E6
+        df['start'] = (df['start'] - self._t0) / 1E6
+        children = df.groupby('parent')['duration'].sum()
+        df['self_time'] = df['duration'] - df['id'].map(children).fillna(0)
+        meta = pd.DataFrame(list(df['meta'])).reindex(df.index)
+        df = pd.concat([df[cols], meta], axis=1)
+
+        return df
 
     @property
-    def total(self):
-        """Total time."""
-        return self._total
+    def total(self) -> float:
+        """Total time of the top-level spans in ms."""
+        return sum((f['stop'] - f['start']) / 1E6 for f in self.spans if f['depth'] == 0)
 
-    @total.setter
-    def total(self, val):
-        """Add to the running total."""
-        self._total += val
+    def reset(self):
+        """Clear all recorded spans."""
+        self.spans = []
+        self._stack = []
+        self._t0 = time.perf_counter_ns()
 
-    def get(self, label: str = '', restart: bool = True, stop: bool = False):
-        """Get the current timer value.
+    def save(self, filename: str):
+        """Write the recorded spans to disk based on the file extension.
 
         Args:
-            label (optional): prepend the time with a string label. Defaults to ''.
-            reset (optional): restart the timer on get call. Defaults to True.
-            stop (optional): ends the timer. Defaults to False.
+            filename: ".csv" for the ``df`` table, ".trace.json" for a Chrome trace, or ".json" for a list of
+                span records
         """
-        if not self.init:
-            print('timer has not been started')
-            return
-
-        delta = self.now - self.init
-        if self.units == 'ms':
-            delta = delta.seconds * 1000 + delta.microseconds / 1000
+        filename = str(filename)
+        if filename.endswith('.trace.json'):
+            self.to_chrome_trace(filename)
+        elif filename.endswith('.json'):
+            self.to_json(filename)
+        elif filename.endswith('.csv'):
+            self.df.to_csv(filename, index=False)
         else:
-            delta = delta.seconds + delta.microseconds / 1E6
-        self.total = delta
+            raise ValueError(f'profile file "{filename}" must end with ".csv", ".json", or ".trace.json"')
+
+    @contextlib.contextmanager
+    def _span(self, name: str, meta: dict):
+        """Record a single span (see ``span``)."""
+        span = {'id': len(self.spans), 'parent': self._stack[-1]['id'] if self._stack else -1,
+                'depth': len(self._stack), 'name': name,
+                'path': (self._stack[-1]['path'] + '/' if self._stack else '') + name,
+                'start': 0, 'stop': 0, 'memory': np.nan, 'meta': meta}
+        self.spans += [span]
+        self._stack += [span]
+        mem = tracemalloc.get_traced_memory()[0] if self.memory and tracemalloc.is_tracing() else None
+        span['start'] = time.perf_counter_ns()
+        try:
+            yield span
+        finally:
+            span['stop'] = time.perf_counter_ns()
+            if mem is not None:
+                span['memory'] = tracemalloc.get_traced_memory()[0] - mem
+            self._stack.pop()
+            if self.print:
+                print('  ' * span['depth'] + f'{name}: {(span["stop"] - span["start"]) / 1E6:.3f} [ms]')
+
+    def span(self, name: str, **meta):
+        """Context manager to time a block of code as a child of the currently open span.
 
-        if label != '':
-            label += ': '
+        Args:
+            name: span label
+            meta: extra values stored with the span (e.g., ifig, ir, ic)
 
-        if self.print is True:
-            print(label + str(delta) + ' [%s]' % self.units)
+        Returns:
+            context manager
+        """
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._span(name, meta)
 
-        if restart is True:
-            self.start()
+    def summary(self) -> pd.DataFrame:
+        """Total, self, and mean time of each span name sorted by self time."""
+        df = self.df
+        summ = df.groupby('name').agg(calls=('id', 'count'), total=('duration', 'sum'),
+                                      self_time=('self_time', 'sum'), mean=('duration', 'mean'))
 
-        if stop is True:
-            self.stop()
+        return summ.sort_values('self_time', ascending=False)
 
-    def get_total(self):
-        """Return the total time."""
-        if self.print:
-            print(f'Total time: {self.total} [{self.units}]')
+    def to_chrome_trace(self, filename: [str, None] = None) -> dict:
+        """Convert the spans to the Chrome trace event format (chrome://tracing or https://ui.perfetto.dev).
+
+        Args:
+            filename (optional): json file to write. Defaults to None.
+
+        Returns:
+            trace dict
+        """
+        events = []
+        for span in self.spans:
+            args = {k: (v if isinstance(v, (int, float, str, bool)) else str(v)) for k, v in span['meta'].items()}
+            if not np.isnan(span['memory']):
+                args['memory'] = int(span['memory'])
+            events += [{'name': span['name'], 'cat': 'fcp', 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                        'ts': (span['start'] - self._t0) / 1E3, 'dur': (span['stop'] - span['start']) / 1E3,
+                        'args': args}]
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+        if filename:
+            with open(filename, 'w') as output:
+                json.dump(trace, output)
+
+        return trace
+
+    def to_json(self, filename: [str, None] = None) -> str:
+        """Convert the spans ``df`` into a json list of records.
+
+        Args:
+            filename (optional): json file to write. Defaults to None.
+
+        Returns:
+            json string
+        """
+        return self.df.to_json(filename, orient='records')
+
+
+def profiled(func):
+    """Decorator to record a Layout method as a span of the ``self.profiler`` (if any).
+
+    Args:
+        func: method to wrap
 
-    def start(self):
-        """Start the timer."""
-        self.init = self.now
+    Returns:
+        wrapped method
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        profiler = getattr(self, 'profiler', None)
+        if profiler is None or not profiler.enabled:
+            return func(self, *args, **kwargs)
+        with profiler.span(func.__qualname__):
+            return func(self, *args, **kwargs)
 
-    def stop(self):
-        """Stop the timer."""
-        self.init = None
+    return wrapper
 
 
 def ci(data: pd.Series, coeff: float = 0.95) -> [float, float]:
@@ -168,6 +285,8 @@ def ci(data: pd.Series, coeff: float = 0.95) -> [float, float]:
         lower confidence interval, upper confidence interval
         returns np.nan if standard err < 0
     """
+    import scipy.stats as ss
+
     sem = data.sem()
     size = len(data.dropna()) - 1
 
@@ -178,6 +297,138 @@ def ci(data: pd.Series, coeff: float = 0.95) -> [float, float]:
         return np.nan, np.nan
 
 
+def decimate(x: [pd.Series, np.ndarray], y: [pd.Series, np.ndarray], size: list, method: str = 'minmax',
+             logx: bool = False, logy: bool = False, xlim: [list, None] = None, ylim: [list, None] = None,
+             dpi: [float, None] = None) -> np.ndarray:
+    """Find the level-of-detail subset of an xy curve that can actually be resolved at a given axes size.
+
+    Only the points inside the x-axis limits are binned; of the points outside the limits only the direct
+    neighbors of visible points are kept so lines still run to the edge of the axes.
+
+    Args:
+        x: x-values
+        y: y-values
+        size: axes [width, height] in pixels (or in inches if dpi is given)
+        method (optional): decimation algorithm {'minmax' -> keep the first, last, min, and max point of the
+            curve in each pixel column | 'lttb' -> largest-triangle-three-buckets with two points per pixel
+            column | 'pixel' -> keep one point per occupied pixel (for markers)}. Defaults to 'minmax'.
+        logx (optional): x-axis is log scale. Defaults to False.
+        logy (optional): y-axis is log scale. Defaults to False.
+        xlim (optional): x-axis [min, max] limits (None for either one uses the data limit). Defaults to None.
+        ylim (optional): y-axis [min, max] limits (None for either one uses the data limit). Defaults to None.
+        dpi (optional): dots per inch of the rendered figure; size is in inches if given. Defaults to None.
+
+    Returns:
+        sorted integer index array of the points to keep (non-finite points are always kept so line breaks
+        are preserved)
+    """
+    def values(vals, log):
+        vals = np.asarray(vals)
+        if np.issubdtype(vals.dtype, np.datetime64) or np.issubdtype(vals.dtype, np.timedelta64):
+            vals = np.where(pd.isna(vals), np.nan, vals.astype('int64').astype(float))
+        else:
+            vals = vals.astype(float)
+        if log:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                vals = np.log10(np.where(vals > 0, vals, np.nan))
+        return vals
+
+    def limits(lim, log):
+        lim = [None, None] if lim is None else list(lim)
+        return [np.nan if f is None else values(np.asarray([f]), log)[0] for f in lim]
+
+    try:
+        xx, yy = values(x, logx), values(y, logy)
+        xlim, ylim = limits(xlim, logx), limits(ylim, logy)
+    except (TypeError, ValueError):
+        # non-numeric data cannot be bucketed
+        return np.arange(len(x))
+
+    finite = np.isfinite(xx) & np.isfinite(yy)
+    idx = np.flatnonzero(finite)
+    xx, yy = xx[idx], yy[idx]
+    if dpi is not None:
+        size = [size[0] * dpi, size[1] * dpi]
+    width, height = max(int(size[0]), 1), max(int(size[1]), 1)
+
+    # Points outside the x-axis limits only matter as the neighbors of visible points
+    inside = np.ones(len(xx), dtype=bool)
+    if np.isfinite(xlim[0]):
+        inside &= xx >= xlim[0]
+    if np.isfinite(xlim[1]):
+        inside &= xx <= xlim[1]
+    edges = np.zeros(len(xx), dtype=bool)
+    if not inside.all():
+        edges[:-1] |= inside[1:]
+        edges[1:] |= inside[:-1]
+        edges &= ~inside
+        if method == 'pixel':
+            edges[:] = False
+        visible = np.flatnonzero(inside)
+        xx, yy = xx[visible], yy[visible]
+    else:
+        visible = np.arange(len(xx))
+
+    def bucket(vals, num, lim):
+        vmin = lim[0] if np.isfinite(lim[0]) else vals.min()
+        vmax = lim[1] if np.isfinite(lim[1]) else vals.max()
+        if vmax <= vmin:
+            return np.zeros(len(vals), dtype=int)
+        return np.clip(((vals - vmin) / (vmax - vmin) * num).astype(int), 0, num - 1)
+
+    def result(keep):
+        return np.union1d(np.union1d(idx[visible[keep]], idx[edges]), np.flatnonzero(~finite))
+
+    if len(xx) == 0:
+        return result(np.array([], dtype=int))
+
+    if method == 'pixel':
+        if len(xx) <= width:
+            return result(np.arange(len(xx)))
+        cells = bucket(xx, width, xlim) * height + bucket(yy, height, ylim)
+        keep = np.unique(cells, return_index=True)[1]
+
+    elif method == 'lttb':
+        num = 2 * width
+        if len(xx) <= 2 * num:
+            return result(np.arange(len(xx)))
+        bounds = np.linspace(1, len(xx) - 1, num - 1).astype(int)
+        keep = np.zeros(num, dtype=int)
+        keep[-1] = len(xx) - 1
+        for ib in range(num - 2):
+            # Keep the point of each bucket that makes the largest triangle with the last kept point and
+            # the average of the next bucket
+            lo, hi = bounds[ib], bounds[ib + 1]
+            nhi = bounds[ib + 2] if ib + 2 < len(bounds) else len(xx)
+            xavg, yavg = xx[hi:nhi].mean(), yy[hi:nhi].mean()
+            xa, ya = xx[keep[ib]], yy[keep[ib]]
+            area = np.abs((xa - xavg) * (yy[lo:hi] - ya) - (xa - xx[lo:hi]) * (yavg - ya))
+            keep[ib + 1] = lo + area.argmax()
+
+    else:
+        if len(xx) <= 4 * width:
+            return result(np.arange(len(xx)))
+        if np.all(np.diff(xx) >= 0) or np.all(np.diff(xx) <= 0):
+            # monotonic x -> one bucket per pixel column
+            bins = bucket(xx, width, xlim)
+            if xx[0] > xx[-1]:
+                bins = width - 1 - bins
+        else:
+            # unordered x -> equal sized buckets in data order
+            bins = np.arange(len(xx)) * width // len(xx)
+        starts = np.flatnonzero(np.diff(bins, prepend=-1))
+        stops = np.append(starts[1:], len(bins)) - 1
+        counts = stops - starts + 1
+        keep = [starts, stops]
+        for ufunc in [np.minimum, np.maximum]:
+            # first point in each bucket that matches the bucket extreme
+            match = np.flatnonzero(yy == np.repeat(ufunc.reduceat(yy, starts), counts))
+            keep += [match[np.unique(bins[match], return_index=True)[1]]]
+        keep = np.concatenate(keep)
+
+    return result(keep)
+
+
 def dfkwarg(args: tuple, kwargs: dict) -> dict:
     """Add the DataFrame to kwargs.
 
@@ -200,9 +451,9 @@ def df_filter(df: pd.DataFrame, filt_orig: str, drop_cols: bool = False,
               keep_filtered: bool = False) -> pd.DataFrame:
     """Filter the DataFrame.
 
-    Due to limitations in pd.query, column names must not have spaces.  This function will temporarily replace
-    spaces in the column names with underscores, but the supplied query string must contain column names
-    without any spaces
+    Due to limitations in pd.query, column names must not have spaces.  The query string is rewritten with
+    sanitized column names (see _df_filter_parse, which caches the result by filter string and column names) and
+    evaluated with pd.eval on only the columns it uses, so the DataFrame itself is never renamed
 
     Args:
         df:  DataFrame to filter
@@ -213,6 +464,65 @@ def df_filter(df: pd.DataFrame, filt_orig: str, drop_cols: bool = False,
     Returns:
         filtered DataFrame
     """
+    # Apply the filter
+    mask = df_filter_mask(df, filt_orig)
+    if mask is None:
+        return df
+
+    _, _, cols_filt, cols_used = _df_filter_parse(get_current_values(df, filt_orig), tuple(df.columns))
+    if keep_filtered:
+        dropped = df.loc[~mask].copy()
+        dropped.loc[:, list(cols_filt)] = np.nan
+        df = pd.concat([df.loc[mask], dropped])
+    else:
+        df = df.loc[mask]
+
+    if drop_cols:
+        df = df.drop(columns=list(set(cols_used)))
+
+    return df
+
+
+def df_filter_mask(df: pd.DataFrame, filt_orig: str) -> [np.ndarray, None]:
+    """Get the rows of a DataFrame that match a filter expression (see df_filter for the syntax).
+
+    Args:
+        df:  DataFrame to filter
+        filt_orig:  query expression for filtering
+
+    Returns:
+        boolean np.array with one value per row of df or None if the filter could not be applied
+    """
+    filt, names, _, _ = _df_filter_parse(get_current_values(df, filt_orig), tuple(df.columns))
+
+    try:
+        mask = np.asarray(pd.eval(filt, local_dict={k: df[v] for k, v in names}), dtype=bool)
+        if mask.shape != (len(df), ):
+            raise ValueError('filter does not select rows')
+
+        return mask
+
+    except:  # noqa
+        print('Could not filter data!\n   Original filter string: %s\n   '
+              'Modified filter string: %s' % (filt_orig, filt))
+
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _df_filter_parse(filt: str, columns: tuple) -> [str, tuple, tuple, tuple]:
+    """Rewrite a filter string for pd.eval using sanitized column names.
+
+    Args:
+        filt: query expression for filtering (after get_current_values)
+        columns: DataFrame column names
+
+    Returns:
+        modified filter string
+        (sanitized name, column name) pairs of the columns in the modified filter string
+        column names that are set to NaN in the rows removed by the filter (keep_filtered)
+        column names on the left side of each comparison (drop_cols)
+    """
     def special_chars(text: str, skip: list = []) -> str:
         """Replace special characters in a text string.
 
@@ -232,17 +542,12 @@ def df_filter(df: pd.DataFrame, filt_orig: str, drop_cols: bool = False,
             text = text.replace(k, v).lstrip(' ').rstrip(' ')
         return text
 
-    # Parse the filter string
-    filt = get_current_values(df, filt_orig)
-
-    # Rename the columns to remove special characters
-    cols_orig = [f for f in df.columns]
+    # Sanitized names of the columns
+    cols_orig = [f for f in columns]
     cols_new = ['fCp%s' % f for f in cols_orig.copy()]
     cols_new = [special_chars(f) for f in cols_new]
     cols_used = []
 
-    df.columns = cols_new
-
     # Reformat the filter string for compatibility with pd.query
     operators = ['==', '<', '>', '!=']
     ands = [f.lstrip().rstrip() for f in filt.split('&')]
@@ -304,35 +609,12 @@ def df_filter(df: pd.DataFrame, filt_orig: str, drop_cols: bool = False,
     else:
         filt = ands[0]
 
-    # Apply the filter
-    try:
-        if keep_filtered:
-            df_orig = df.copy()
-
-        df = df.query(filt)
-
-        if keep_filtered:
-            dropped = df_orig.copy().loc[~df_orig.index.isin(df.index)]
-            cols_filt = [f for f in cols_new if f in filt]
-            dropped.loc[:, cols_filt] = np.nan
-            df = pd.concat([df, dropped])
-
-        df.columns = cols_orig
-
-        if drop_cols:
-            cols_used = list(set(cols_used))
-            for col in cols_used:
-                del df[col]
-
-        return df
-
-    except:  # noqa
-        print('Could not filter data!\n   Original filter string: %s\n   '
-              'Modified filter string: %s' % (filt_orig, filt))
+    # Only the columns in the filter are needed to evaluate it
+    tokens = set(re.findall(r'fCp\w+', filt))
+    names = tuple((new, orig) for new, orig in zip(cols_new, cols_orig) if new in tokens)
+    cols_filt = tuple(orig for new, orig in zip(cols_new, cols_orig) if new in filt)
 
-        df.columns = cols_orig
-
-        return df
+    return filt, names, cols_filt, tuple(cols_used)
 
 
 def df_from_array2d(arr: np.ndarray) -> pd.DataFrame:
@@ -548,20 +830,530 @@ def get_text_dimensions(text: str, font: str, font_size: int, font_style: str, f
         size tuple
     """
     try:
-        ImageFont
-    except NameError:
+        from PIL import ImageFont  # noqa, used only for bokeh font size calculations
+    except ImportError:
         print('get_text_dimensions requires pillow which was not found.  Please '
               'run pip install pillow and try again.')
         return False
 
+    if isinstance(font, list):
+        font = tuple(font)
+
+    return _get_text_dimensions(text, font, font_size, font_style, font_weight)
+
+
+@lru_cache(maxsize=4096)
+def _get_text_dimensions(text: str, font: [str, tuple], font_size: int, font_style: str, font_weight: str) -> tuple:
+    """Cached text size calculation for get_text_dimensions (the same labels and fonts repeat across plots).
+
+    Args:
+        text: the text from which to calculate size
+        font: name of the font family or the font itself
+        font_size: font size
+        font_style: normal vs italic
+        font_weight: normal vs bold
+
+    Returns:
+        size tuple
+    """
+    size = _get_truetype_font(_find_font_file(font, font_style, font_weight), font_size).getsize(text)
+
+    return size[0] * 1.125, size[1] * 1.125  # no idea why it is off
+
+
+@lru_cache(maxsize=256)
+def _find_font_file(font: [str, tuple], font_style: str, font_weight: str) -> str:
+    """Cached lookup of the font file that matches a font family, style, and weight.
+
+    Args:
+        font: name of the font family or the font itself
+        font_style: normal vs italic
+        font_weight: normal vs bold
+
+    Returns:
+        font file path
+    """
+    from matplotlib.font_manager import FontProperties, findfont
+
     fp = FontProperties()
-    fp.set_family(font)
+    fp.set_family(list(font) if isinstance(font, tuple) else font)
     fp.set_style(font_style)
     fp.set_weight(font_weight)
-    fontfile = findfont(fp, fallback_to_default=True)
-    size = ImageFont.truetype(fontfile, font_size).getsize(text)
 
-    return size[0] * 1.125, size[1] * 1.125  # no idea why it is off
+    return findfont(fp, fallback_to_default=True)
+
+
+@lru_cache(maxsize=256)
+def _get_truetype_font(fontfile: str, font_size: int) -> 'ImageFont.FreeTypeFont':  # noqa: F821
+    """Cached pillow font object (loading the font file is slow).
+
+    Args:
+        fontfile: font file path
+        font_size: font size
+
+    Returns:
+        pillow font
+    """
+    from PIL import ImageFont
+
+    return ImageFont.truetype(fontfile, font_size)
+
+
+def group_hist(values: np.ndarray, codes: np.ndarray, ngroups: int, bins: [int, list] = 20,
+               brange: [list, None] = None, density: bool = False,
+               weights: [np.ndarray, None] = None) -> [np.ndarray, np.ndarray]:
+    """Histogram counts of every group of a 1D array in one pass.
+
+    Integer bins reproduce ``np.histogram`` of each group (bin edges spanning the group data unless a range is
+    given) and a sequence of bin edges is shared by all groups.
+
+    Args:
+        values: data values (NaNs are ignored)
+        codes: group index (0 to ngroups - 1) of each value; values with a negative code are ignored
+        ngroups: number of groups
+        bins (optional): number of equal-width bins or the bin edges. Defaults to 20.
+        brange (optional): [min, max] range of the bins shared by all groups. Defaults to None.
+        density (optional): return the probability density instead of the counts. Defaults to False.
+        weights (optional): weight of each value added to its bin instead of 1. Defaults to None.
+
+    Returns:
+        counts with one row per group
+        bin edges with one row per group
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.asarray(codes)
+    weights = None if weights is None else np.asarray(weights, dtype=float)
+    keep = ~np.isnan(values) & (codes >= 0)
+    values, codes = values[keep], codes[keep]
+    weights = None if weights is None else weights[keep]
+
+    if isinstance(bins, (int, np.integer)):
+        # Same edges and bin assignment as np.histogram
+        if brange is not None:
+            first = np.full(ngroups, float(brange[0]))
+            last = np.full(ngroups, float(brange[1]))
+            keep = (values >= brange[0]) & (values <= brange[1])
+            values, codes = values[keep], codes[keep]
+            weights = None if weights is None else weights[keep]
+        else:
+            lims = pd.Series(values).groupby(codes).agg(['min', 'max']).reindex(range(ngroups))
+            first = lims['min'].fillna(0).values
+            last = lims['max'].fillna(1).values
+        same = first == last
+        first, last = np.where(same, first - 0.5, first), np.where(same, last + 0.5, last)
+        edges = np.linspace(first, last, bins + 1, axis=1)
+        idx = ((values - first[codes]) * (bins / (last - first))[codes]).astype(np.intp)
+        idx[idx == bins] -= 1
+        idx[values < edges[codes, idx]] -= 1
+        idx[(values >= edges[codes, idx + 1]) & (idx != bins - 1)] += 1
+    else:
+        # Edges shared by all groups; values equal to the last edge go in the last bin
+        edges = np.asarray(bins, dtype=float)
+        keep = (values >= edges[0]) & (values <= edges[-1])
+        values, codes = values[keep], codes[keep]
+        weights = None if weights is None else weights[keep]
+        bins = len(edges) - 1
+        idx = np.minimum(np.searchsorted(edges, values, side='right') - 1, bins - 1)
+        edges = np.broadcast_to(edges, (ngroups, bins + 1))
+
+    counts = np.bincount(codes * bins + idx, weights, minlength=ngroups * bins).reshape(ngroups, bins)
+    if density:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            counts = counts / counts.sum(axis=1)[:, None] / np.diff(edges, axis=1)
+
+    return counts, edges
+
+
+def group_polyfit(x: np.ndarray, y: np.ndarray, codes: np.ndarray, ngroups: int,
+                  deg: int) -> [np.ndarray, np.ndarray]:
+    """Least-squares polynomial fit of every group of a data set at once.
+
+    The normal equations of all groups are solved in one batch; x is centered and scaled within each group to keep
+    them well conditioned.
+
+    Args:
+        x: x values (no NaNs)
+        y: y values (no NaNs)
+        codes: group index (0 to ngroups - 1) of each value
+        ngroups: number of groups; groups without any values are NaN
+        deg: degree of the polynomial
+
+    Returns:
+        coefficients of each group (one row per group, highest power first like ``np.polyfit``)
+        coefficient of determination (R^2) of each group
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = np.asarray(codes)
+    count = np.bincount(codes, minlength=ngroups)
+    nn = np.maximum(count, 1)
+
+    # Scaled x of each group
+    mean = np.bincount(codes, x, minlength=ngroups) / nn
+    scale = np.sqrt(np.bincount(codes, (x - mean[codes])**2, minlength=ngroups) / nn)
+    scale = np.where(scale > 0, scale, 1)
+    tt = (x - mean[codes]) / scale[codes]
+
+    # Normal equations from the power sums of every group (pinv gives the minimum norm solution if singular)
+    powers = tt[:, None] ** np.arange(2 * deg + 1)
+    sums = np.stack([np.bincount(codes, f, minlength=ngroups) for f in powers.T], axis=1)
+    rhs = np.stack([np.bincount(codes, f * y, minlength=ngroups) for f in powers[:, :deg + 1].T], axis=1)
+    ii = np.arange(deg + 1)
+    beta = (np.linalg.pinv(sums[:, ii[:, None] + ii[None, :]]) @ rhs[:, :, None])[:, :, 0]
+
+    # R^2 of the fit
+    yval = (powers[:, :deg + 1] * beta[codes]).sum(axis=1)
+    ybar = np.bincount(codes, y, minlength=ngroups) / nn
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsq = np.bincount(codes, (yval - ybar[codes])**2, minlength=ngroups) / \
+            np.bincount(codes, (y - ybar[codes])**2, minlength=ngroups)
+
+    # Expand sum(beta_j * ((x - mean) / scale)^j) into powers of x
+    from math import comb
+    coeffs = np.zeros((ngroups, deg + 1))
+    for jj in range(deg + 1):
+        for kk in range(jj + 1):
+            coeffs[:, kk] += beta[:, jj] * comb(jj, kk) * (-mean)**(jj - kk) / scale**jj
+    coeffs[count == 0] = np.nan
+    rsq[count == 0] = np.nan
+
+    return coeffs[:, ::-1], rsq
+
+
+def group_quantile(values: np.ndarray, codes: np.ndarray, ngroups: int, q: [float, np.ndarray]) -> np.ndarray:
+    """Quantile of every group of a 1D array at once.
+
+    Uses the same linear interpolation as ``np.percentile``; unlike ``DataFrame.groupby.quantile`` every group can
+    have its own quantile.
+
+    Args:
+        values: data values (no NaNs)
+        codes: group index (0 to ngroups - 1) of each value
+        ngroups: number of groups; groups without any values are NaN
+        q: quantile between 0-1 shared by all groups or one per group
+
+    Returns:
+        quantile of each group
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.asarray(codes)
+    if len(values) == 0:
+        return np.full(ngroups, np.nan)
+    idx = np.lexsort((values, codes))
+    count = np.bincount(codes, minlength=ngroups)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    out = _sorted_quantile(values[idx], start, np.maximum(count, 1), np.asarray(q, dtype=float))
+
+    return np.where(count > 0, out, np.nan)
+
+
+def _sorted_quantile(vals: np.ndarray, start: np.ndarray, nn: np.ndarray, q: [float, np.ndarray]) -> np.ndarray:
+    """Linear interpolation quantile of each contiguous, sorted group slice (same algorithm as np.percentile).
+
+    Args:
+        vals: values sorted by group and then by value
+        start: index of the first value of each group
+        nn: number of values in each group (at least 1)
+        q: quantile between 0-1 shared by all groups or one per group
+
+    Returns:
+        quantile of each group
+    """
+    virtual = (nn - 1) * q
+    lo = np.floor(virtual).astype(int)
+    hi = np.minimum(lo + 1, nn - 1)
+    gamma = virtual - lo
+    a, b = vals[np.minimum(start + lo, len(vals) - 1)], vals[np.minimum(start + hi, len(vals) - 1)]
+    diff = b - a
+    return np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+
+
+def group_stats(values: np.ndarray, codes: np.ndarray, ngroups: int, quantiles: list = [], whis: float = 1.5,
+                conf_coeff: [float, None] = None) -> pd.DataFrame:
+    """Compute the summary statistics of every group of a 1D array at once.
+
+    Quantiles use the same linear interpolation as ``np.percentile`` and the whiskers and median notches follow
+    ``matplotlib.cbook.boxplot_stats`` so the results can be passed directly to a box plot.
+
+    Args:
+        values: data values (no NaNs)
+        codes: group index (0 to ngroups - 1) of each value
+        ngroups: number of groups; groups without any values get a zero count and sum and NaN for the rest
+        quantiles (optional): extra quantiles between 0-1 to add as "q<value>" columns. Defaults to [].
+        whis (optional): whisker length as a multiple of the interquartile range. Defaults to 1.5.
+        conf_coeff (optional): add "ci_low" and "ci_high" columns with the confidence interval of the mean
+            (see ``ci``). Defaults to None.
+
+    Returns:
+        DataFrame with one row per group and columns count, sum, mean, std, min, max, q1, med, q3, iqr, cilo,
+        cihi, whislo, whishi, and any optional columns
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.asarray(codes)
+
+    # Sort by group and then by value so every group is a contiguous, sorted slice
+    idx = np.lexsort((values, codes))
+    vals, codes = values[idx], codes[idx]
+    count = np.bincount(codes, minlength=ngroups)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    has = count > 0
+    nn = np.where(has, count, 1)  # avoid divide by zero; empty groups are set to NaN at the end
+
+    def reduce(func, vv):
+        """Reduce each non-empty group slice."""
+        out = np.full(ngroups, np.nan)
+        if has.any():
+            out[has] = func.reduceat(vv, start[has])
+        return out
+
+    def quantile(q):
+        return _sorted_quantile(vals, start, nn, q)
+
+    stats = pd.DataFrame({'count': count})
+    stats['sum'] = reduce(np.add, vals)
+    stats['mean'] = stats['sum'] / nn
+    stats['std'] = np.sqrt(reduce(np.add, (vals - stats['mean'].values[codes])**2) / np.maximum(nn - 1, 1))
+    stats.loc[count < 2, 'std'] = np.nan
+    stats['min'] = reduce(np.minimum, vals)
+    stats['max'] = reduce(np.maximum, vals)
+    stats['q1'], stats['med'], stats['q3'] = quantile(0.25), quantile(0.5), quantile(0.75)
+    for q in quantiles:
+        stats[f'q{q}'] = quantile(q)
+
+    # Median notches and whiskers (the most extreme values within whis * IQR of the box)
+    stats['iqr'] = stats['q3'] - stats['q1']
+    stats['cilo'] = stats['med'] - 1.57 * stats['iqr'] / np.sqrt(nn)
+    stats['cihi'] = stats['med'] + 1.57 * stats['iqr'] / np.sqrt(nn)
+    hival = (stats['q3'] + whis * stats['iqr']).values[codes]
+    loval = (stats['q1'] - whis * stats['iqr']).values[codes]
+    whishi = reduce(np.maximum, np.where(vals <= hival, vals, -np.inf))
+    whislo = reduce(np.minimum, np.where(vals >= loval, vals, np.inf))
+    stats['whishi'] = np.where(whishi < stats['q3'], stats['q3'], whishi)
+    stats['whislo'] = np.where(whislo > stats['q1'], stats['q1'], whislo)
+
+    if conf_coeff is not None:
+        import scipy.stats as ss
+        sem = stats['std'] / np.sqrt(nn)
+        valid = (sem > 0).values
+        stats['ci_low'], stats['ci_high'] = np.nan, np.nan
+        if valid.any():
+            low, high = ss.t.interval(conf_coeff, count[valid] - 1, loc=stats.loc[valid, 'mean'],
+                                      scale=sem[valid])
+            stats.loc[valid, 'ci_low'], stats.loc[valid, 'ci_high'] = low, high
+
+    stats.loc[~has, ~stats.columns.isin(['count', 'sum'])] = np.nan
+    stats.loc[~has, 'sum'] = 0
+
+    return stats
+
+
+def group_vals(df: pd.DataFrame, cols: [str, list], sort: bool = True) -> list:
+    """Unique values of grouping column(s), i.e. the keys of ``df.groupby(cols).groups``.
+
+    A single (non-categorical) column is factorized instead of grouped so the row index of every group is never
+    built.
+
+    Args:
+        df: DataFrame to group
+        cols: grouping column name(s)
+        sort (optional): natsort the values; otherwise keep the order of first appearance. Defaults to True.
+
+    Returns:
+        list of unique group values
+    """
+    cols_list = validate_list(cols)
+    if len(cols_list) == 1 and not isinstance(df[cols_list[0]].dtype, pd.CategoricalDtype):
+        vals = list(pd.factorize(df[cols_list[0]], sort=sort)[1])
+    else:
+        vals = list(df.groupby(cols, sort=sort).groups.keys())
+
+    return natsorted(vals) if sort else vals
+
+
+def hist_stream(chunks, x: [str, None] = None, groups: [str, list, None] = None, bins: [int, list] = 20,
+                brange: [list, None] = None, chunksize: int = 1000000, filt: [str, None] = None) -> pd.DataFrame:
+    """Accumulate histogram counts from data that is too large to load at once.
+
+    Chunks are counted one at a time so only a single chunk is ever in memory.  Bin edges are fixed by a sequence
+    of ``bins`` or by ``brange``; otherwise a first pass over the chunks finds the global range (which requires a
+    source that can be read more than once).  The result has one row per bin at the bin center (plus an empty row
+    at each outer edge) and renders like the raw data with ``fcp.hist(df, x=x, weights='Counts', bins=edges)``.
+
+    Args:
+        chunks: iterable of DataFrames or numpy arrays, a function returning such an iterable, or the path to a
+            csv or parquet file
+        x (optional): column of the DataFrame chunks to count; if None, count the integer-named columns (image
+            data) or every value of numpy array chunks. Defaults to None.
+        groups (optional): DataFrame columns to count separately. Defaults to None.
+        bins (optional): number of equal-width bins or the bin edges. Defaults to 20.
+        brange (optional): [min, max] range of the bins. Defaults to None.
+        chunksize (optional): number of rows per chunk read from a file. Defaults to 1000000.
+        filt (optional): query expression applied to each DataFrame chunk before counting (see df_filter).
+            Defaults to None.
+
+    Returns:
+        DataFrame of bin centers (column ``x`` or "Value"), group values, and "Counts"
+    """
+    groups = validate_list(groups) if groups is not None else []
+
+    def read():
+        if isinstance(chunks, (str, pathlib.Path)):
+            if str(chunks).lower().endswith(('.parquet', '.pq')):
+                try:
+                    import pyarrow.parquet as pq
+                except ImportError:
+                    raise ImportError('reading parquet files requires pyarrow which was not found.  Please run '
+                                      'pip install pyarrow and try again.')
+                return (f.to_pandas() for f in pq.ParquetFile(chunks).iter_batches(batch_size=chunksize))
+            return pd.read_csv(chunks, chunksize=chunksize)
+        return chunks() if callable(chunks) else chunks
+
+    def split(chunk):
+        if filt and not isinstance(chunk, pd.DataFrame):
+            raise ValueError('hist_stream can only filter DataFrame chunks')
+        if filt:
+            mask = df_filter_mask(chunk, filt)
+            if mask is None:
+                raise ValueError(f'hist_stream could not apply the filter "{filt}" to a chunk')
+            chunk = chunk.loc[mask]
+        if isinstance(chunk, pd.DataFrame):
+            cols = [x] if x is not None else df_int_cols(chunk)
+            return chunk[cols].values.astype(float).ravel(), chunk[groups] if groups else None, len(cols)
+        return np.asarray(chunk, dtype=float).ravel(), None, 1
+
+    # First pass for the global bin range
+    if isinstance(bins, (int, np.integer)) and brange is None:
+        source = read()
+        if iter(source) is source and not isinstance(chunks, (str, pathlib.Path)) and not callable(chunks):
+            raise ValueError('hist_stream needs brange or a sequence of bins to count a one-time iterator; '
+                             'otherwise pass a list, a function that returns the chunks, or a file path')
+        lo, hi = np.inf, -np.inf
+        for chunk in source:
+            vals = split(chunk)[0]
+            if np.isnan(vals).all():
+                continue
+            lo, hi = min(lo, np.nanmin(vals)), max(hi, np.nanmax(vals))
+        brange = [lo, hi] if lo <= hi else [0, 1]
+
+    # Counts by group
+    counts = {}
+    edges = None
+    for chunk in read():
+        vals, grps, ncols = split(chunk)
+        if len(vals) == 0:
+            continue
+        if grps is not None:
+            idx = grps.groupby(groups).indices
+            keys = list(idx.keys())
+            codes = np.full(len(grps), -1)
+            for ig, key in enumerate(keys):
+                codes[idx[key]] = ig
+        else:
+            keys = [None]
+            codes = np.zeros(len(vals) // ncols, dtype=int)
+        cnts, edges = group_hist(vals, np.repeat(codes, ncols), len(keys), bins, brange)
+        for ig, key in enumerate(keys):
+            counts[key] = counts[key] + cnts[ig] if key in counts else cnts[ig]
+    if edges is None:
+        raise ValueError('hist_stream found no data to count')
+
+    # Bin centers and counts of every group plus empty rows at the outer edges so the data range is unchanged
+    edges = edges[0]
+    nbins = len(edges) + 1
+    keys = list(counts.keys())
+    vals = np.concatenate([edges[:1], (edges[:-1] + edges[1:]) / 2, edges[-1:]])
+    hist = pd.DataFrame({x if x is not None else 'Value': np.tile(vals, len(keys)),
+                         'Counts': np.concatenate([np.concatenate([[0], counts[f], [0]]) for f in keys])})
+    for ig, group in enumerate(groups):
+        hist[group] = np.repeat([f[ig] if isinstance(f, tuple) else f for f in keys], nbins)
+    hist.attrs['bins'] = edges
+
+    return hist
+
+
+def kde(values: np.ndarray, points: np.ndarray, codes: [np.ndarray, None] = None, ngroups: [int, None] = None,
+        bw_method: [str, float] = 'scott', gridsize: int = 2048, weights: [np.ndarray, None] = None) -> np.ndarray:
+    """Gaussian kernel density estimate by linear binning and FFT convolution.
+
+    Uses the bandwidth rules of ``scipy.stats.gaussian_kde`` but scales as O(n + gridsize * log(gridsize))
+    instead of O(n * len(points)).  Every group is binned on its own grid spanning its data range so many groups
+    (i.e., violins) are estimated in one batch.
+
+    Args:
+        values: data values (no NaNs)
+        points: locations at which to evaluate the density; either a 1D array shared by all groups or a 2D array
+            with one row per group
+        codes (optional): group index (0 to ngroups - 1) of each value. Defaults to None (one group).
+        ngroups (optional): number of groups. Defaults to None (codes.max() + 1).
+        bw_method (optional): "scott", "silverman", or a scalar factor that multiplies the standard deviation (same
+            as scipy). Defaults to 'scott'.
+        gridsize (optional): number of bins per group. Defaults to 2048.
+        weights (optional): weight of each value (i.e., counts of pre-binned data); the bandwidth then uses the
+            effective number of samples like scipy. Defaults to None.
+
+    Returns:
+        density at each point (one row per group if codes are given); groups with fewer than two distinct values
+        are NaN
+    """
+    values = np.asarray(values, dtype=float)
+    single = codes is None
+    codes = np.zeros(len(values), dtype=int) if single else np.asarray(codes, dtype=int)
+    if ngroups is None:
+        ngroups = int(codes.max()) + 1 if len(codes) > 0 else 1
+    points = np.asarray(points, dtype=float)
+    points = np.broadcast_to(points, (ngroups, points.shape[-1]))
+
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=float)
+
+    # Bandwidth of each group from the weighted standard deviation and effective number of samples
+    lims = pd.Series(values).groupby(codes).agg(['min', 'max']).reindex(range(ngroups))
+    v1 = np.bincount(codes, weights, minlength=ngroups)
+    v2 = np.bincount(codes, weights**2, minlength=ngroups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights * values, minlength=ngroups) / v1
+        std = np.sqrt(np.bincount(codes, weights * (values - mean[codes])**2, minlength=ngroups) / (v1 - v2 / v1))
+        nn = np.nan_to_num(v1**2 / v2)
+    if bw_method == 'scott':
+        factor = np.maximum(nn, 1) ** (-1 / 5)
+    elif bw_method == 'silverman':
+        factor = (np.maximum(nn, 1) * 3 / 4) ** (-1 / 5)
+    else:
+        factor = float(bw_method)
+    bw = factor * std
+    valid = (nn > 1) & (bw > 0)
+    bw = np.where(valid, bw, 1)
+
+    # Grid of each group padded by 5 bandwidths so the circular convolution does not wrap around
+    lo = np.where(valid, lims['min'].values - 5 * bw, 0)
+    dx = np.where(valid, (lims['max'].values + 5 * bw - lo) / (gridsize - 1), 1)
+
+    # Linear binning: split the weight of each value between its two neighboring grid points
+    keep = valid[codes]
+    cc = codes[keep]
+    tt = (values[keep] - lo[cc]) / dx[cc]
+    ii = np.clip(np.floor(tt).astype(int), 0, gridsize - 2)
+    ww = tt - ii
+    idx = cc * gridsize + ii
+    counts = np.bincount(idx, (1 - ww) * weights[keep], minlength=ngroups * gridsize) + \
+        np.bincount(idx + 1, ww * weights[keep], minlength=ngroups * gridsize)
+    counts = counts.reshape(ngroups, gridsize)
+
+    # Convolve with the gaussian kernel (analytic Fourier transform in units of grid points)
+    freq = np.fft.rfftfreq(gridsize)
+    kernel = np.exp(-0.5 * (2 * np.pi * freq[None, :] * (bw / dx)[:, None]) ** 2)
+    density = np.fft.irfft(np.fft.rfft(counts, axis=1) * kernel, n=gridsize, axis=1)
+    density = np.maximum(density, 0) / (np.where(valid, v1, 1) * dx)[:, None]
+
+    # Interpolate the grid to the requested points
+    tt = (points - lo[:, None]) / dx[:, None]
+    ii = np.clip(np.floor(tt), 0, gridsize - 2).astype(int)
+    ww = tt - ii
+    rows = np.arange(ngroups)[:, None]
+    out = density[rows, ii] * (1 - ww) + density[rows, ii + 1] * ww
+    out[(tt < 0) | (tt > gridsize - 1)] = 0
+    out[~valid] = np.nan
+
+    return out[0] if single else out
 
 
 def kwget(dict1: dict, dict2: dict, vals: [str, list], default: [list, dict]):
@@ -602,8 +1394,8 @@ def img_compare(img1: str, img2: str, show: bool = False) -> bool:
         True/False of existence of differences
     """
     try:
-        cv2
-    except NameError:
+        import cv2  # required for testing
+    except (ImportError, ModuleNotFoundError):
         print('img_compare requires opencv which was not found.  Please '
               'run pip install opencv-python and try again.')
         return False
@@ -675,6 +1467,8 @@ def nq(data, column: str = 'Value', **kwargs) -> pd.DataFrame:
     step_tail = kwargs.get('step_tail', 0.2)  # step size of the tail region
     step_inner = kwargs.get('step_inner', 0.5)  # step size of the non-tail region
 
+    import scipy.stats as ss
+
     # Flatten the DataFrame to an array
     data = data.values.flatten()
 
@@ -688,9 +1482,7 @@ def nq(data, column: str = 'Value', **kwargs) -> pd.DataFrame:
                             np.arange(-tail, tail, step_inner),
                             np.arange(tail, sig + 1e-9, step_tail)])
     # Get the sigma value
-    values = np.zeros(len(index))
-    for ii, idx in enumerate(index):
-        values[ii] = np.percentile(data, ss.norm.cdf(idx) * 100)
+    values = np.percentile(data, ss.norm.cdf(index) * 100)
 
     return pd.DataFrame({'Sigma': index, column: values})
 
@@ -786,73 +1578,86 @@ def rectangle_overlap(r1: [list, tuple], r2: [list, tuple]) -> bool:
 def reload_defaults(theme: [str, None] = None, verbose: bool = False):
     """Reload the fcp params.
 
+    Theme files are executed once and cached until the file changes (see `_load_theme`) so
+    repeat calls do not re-import the theme module or modify sys.path.
+
     Args:
         theme (optional): name of the theme file to load. Defaults to None.
         verbose (bool): optional print more info flag
     """
     theme_dir = pathlib.Path(__file__).parent / 'themes'
-    reset_path = False
     err_msg = 'Requested theme not found; using default'
     user_dir = pathlib.Path.home()
     success = True
 
+    # Default theme is the user theme file if it exists, else the built-in gray theme
+    default = user_dir / '.fivecentplots' / 'defaults.py'
+    if not default.exists():
+        default = theme_dir / 'gray.py'
+
     if theme is not None and os.path.exists(theme):
         # full filename case
         case = 1
-        theme = str(theme)
-        theme_dir = os.sep.join(theme.split(os.sep)[0:-1])
-        theme = theme.split(os.sep)[-1]
-        sys.path = [str(theme_dir)] + sys.path
-        reset_path = True
-        try:
-            defaults = importlib.import_module(theme.replace('.py', ''), theme_dir)
-            importlib.reload(defaults)
-        except (TypeError, NameError, ImportError):
-            print(err_msg)
-            import defaults
-            importlib.reload(defaults)
-            success = False
+        path = pathlib.Path(theme).resolve()
     elif theme is not None and (theme in os.listdir(theme_dir) or theme + '.py' in os.listdir(theme_dir)):
         case = 2
-        sys.path = [str(theme_dir)] + sys.path
-        reset_path = True
-        try:
-            defaults = importlib.import_module(theme.replace('.py', ''), theme_dir)
-            importlib.reload(defaults)
-        except (TypeError, NameError, ImportError):
-            print(err_msg)
-            import defaults
-            importlib.reload(defaults)
-            success = False
-    elif (user_dir / '.fivecentplots' / 'defaults.py').exists():
-        # use default theme
-        case = 3
-        sys.path = [str(user_dir / '.fivecentplots')] + sys.path
-        defaults = importlib.import_module('defaults', str(user_dir / '.fivecentplots'))
-        importlib.reload(defaults)
+        path = theme_dir / (theme if theme.endswith('.py') else theme + '.py')
     else:
-        case = 4
-        sys.path = [str(theme_dir)] + sys.path
-        import gray as defaults
-        importlib.reload(defaults)
+        case = 3 if default.parent != theme_dir else 4
+        path = default
 
-    fcp_params = defaults.fcp_params if hasattr(defaults, 'fcp_params') else {}
-    colors = defaults.colors if hasattr(defaults, 'colors') else []
-    markers = defaults.markers if hasattr(defaults, 'markers') else []
-    rcParams = defaults.rcParams if hasattr(defaults, 'rcParams') else {}
+    try:
+        fcp_params, colors, markers, rcParams = _load_theme(path)
+    except (TypeError, NameError, ImportError, OSError):
+        if case > 2:
+            raise
+        print(err_msg)
+        fcp_params, colors, markers, rcParams = _load_theme(default)
+        success = False
 
     if verbose:
-        print(f'sys.path[0]: {sys.path[0]}')
+        print(f'theme file: {path}')
         print(f'theme: {theme}\ntheme exists: {os.path.exists(str(theme))}')
         print(f'theme_dir: {theme_dir}\nuser_dir: {user_dir}')
         print(f'case: {case}\nsuccess: {success}')
 
-    if reset_path:
-        sys.path = sys.path[1:]
-
     return fcp_params, colors, markers, rcParams  # could convert to dict in future
 
 
+def _load_theme(path: pathlib.Path) -> tuple:
+    """Execute a theme file and return copies of its fcp_params, colors, markers, and rcParams.
+
+    The theme values are cached by resolved path, file modification time, and a hash of the file contents
+    (mtime resolution is too coarse to catch a theme file that is rewritten immediately, as in set_theme) so
+    a theme file is only executed again after it changes; callers always get their own copy of the cached
+    values.
+
+    Args:
+        path: theme file path
+
+    Returns:
+        fcp_params, colors, markers, rcParams
+    """
+    path = pathlib.Path(path).resolve()
+    with open(path, 'rb') as fid:
+        source = fid.read()
+    key = (str(path), path.stat().st_mtime_ns, hash(source))
+
+    with _THEME_LOCK:
+        if key not in _THEME_CACHE:
+            defaults = types.ModuleType(f'fivecentplots_theme_{path.stem}')
+            defaults.__file__ = str(path)
+            exec(compile(source, str(path), 'exec'), defaults.__dict__)
+
+            # Drop any stale version of this theme file
+            for old in [f for f in _THEME_CACHE if f[0] == key[0]]:
+                del _THEME_CACHE[old]
+            _THEME_CACHE[key] = (getattr(defaults, 'fcp_params', {}), getattr(defaults, 'colors', []),
+                                 getattr(defaults, 'markers', []), getattr(defaults, 'rcParams', {}))
+
+        return copy.deepcopy(_THEME_CACHE[key])
+
+
 def see(obj) -> pd.DataFrame:
     """Prints a readable list of class attributes.
 
@@ -960,6 +1765,8 @@ def sigma(x: [pd.Series, np.ndarray]) -> int:
     Returns:
         int value to use for +/- max sigma
     """
+    import scipy.stats as ss
+
     return np.round(np.trunc(10 * abs(ss.norm.ppf(1 / len(x)))) / 10)
 
 
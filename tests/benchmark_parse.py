@@ -1,4 +1,6 @@
+import argparse
 import json
+import sys
 from pathlib import Path
 import pdb
 import pandas as pd
@@ -20,7 +22,9 @@ def benchmarks(file=None):
 
     df = pd.DataFrame()
     for bm in data['benchmarks']:
-        temp = pd.DataFrame(index=[bm['name']], data=bm['stats'])
+        stats = {k: v for k, v in {**bm['stats'], **bm.get('extra_info', {})}.items() if not isinstance(v, list)}
+        temp = pd.DataFrame(index=[bm['name']], data=stats)
+        temp['group'] = bm.get('group')
         df = pd.concat([df, temp])
 
     return df
@@ -30,3 +34,39 @@ def compare(old, new):
     comp = pd.merge(old.reset_index(), new.reset_index(), on='index', how='left')
     comp['% reduction'] = 1 - comp['mean_y']/comp['mean_x']
     return comp[['index', 'mean_x', 'mean_y', '% reduction']].set_index('index')
+
+
+def overhead(df):
+    """Ratio of the fcp to the raw matplotlib mean time and peak memory for each benchmark_suite.py group."""
+    df = df.loc[df['engine'].isin(['fcp', 'mpl'])]
+    comp = df.pivot(index='group', columns='engine', values=['mean', 'peak_memory'])
+    comp['time ratio'] = comp[('mean', 'fcp')] / comp[('mean', 'mpl')]
+    comp['memory ratio'] = comp[('peak_memory', 'fcp')] / comp[('peak_memory', 'mpl')]
+    return comp[['time ratio', 'memory ratio']].droplevel(1, axis=1)
+
+
+def regressions(old, new, threshold=0.1, stats=['mean', 'peak_memory']):
+    """Benchmarks where a stat of the new run is more than threshold (fractional) worse than the old run."""
+    stats = [f for f in stats if f in old.columns and f in new.columns]
+    comp = pd.merge(old[stats], new[stats], left_index=True, right_index=True, suffixes=('_old', '_new'))
+    bad = pd.Series(False, index=comp.index)
+    for stat in stats:
+        comp[f'{stat} change'] = comp[f'{stat}_new'] / comp[f'{stat}_old'] - 1
+        bad |= comp[f'{stat} change'] > threshold
+    return comp.loc[bad]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fail if a pytest-benchmark json file regressed vs a baseline')
+    parser.add_argument('old', help='baseline benchmark json file')
+    parser.add_argument('new', help='new benchmark json file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='allowed fractional increase [0.1]')
+    args = parser.parse_args()
+
+    new = benchmarks(args.new)
+    if 'engine' in new.columns:
+        print(overhead(new).to_string())
+    bad = regressions(benchmarks(args.old), new, args.threshold)
+    if len(bad) > 0:
+        print(bad.to_string())
+        sys.exit(1)
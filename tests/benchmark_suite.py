@@ -0,0 +1,245 @@
+"""Performance benchmarks for every plot type versus a raw matplotlib baseline.
+
+This module is not collected by the default test run; call it explicitly:
+
+    pytest tests/benchmark_suite.py -o addopts="" --benchmark-autosave
+    pytest tests/benchmark_suite.py -o addopts="" --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Each case renders the same random data set once with fivecentplots and once with a hand-written pure
+matplotlib equivalent (same benchmark group), so the fcp overhead can be read directly from the report or
+with ``benchmark_parse.overhead``.  The peak traced memory of one render is saved in the ``extra_info`` of
+each benchmark; ``python benchmark_parse.py old.json new.json`` fails on time or memory regressions.
+
+Data sizes default to 1e3 - 1e5 rows; set the environment variable ``FCP_BENCHMARK_MAX_ROWS=1e7`` to run the
+full sweep.
+"""
+import pytest
+import os
+import pdb
+import tracemalloc
+import numpy as np
+import pandas as pd
+import matplotlib as mpl
+import fivecentplots as fcp
+from functools import lru_cache
+mpl.use('Agg')
+import matplotlib.pyplot as plt  # noqa
+db = pdb.set_trace
+
+ROWS = [f for f in [1E3, 1E4, 1E5, 1E6, 1E7] if f <= float(os.environ.get('FCP_BENCHMARK_MAX_ROWS', 1E5))]
+GRIDS = [(1, 1), (2, 2)]
+MAX_ROWS = {'gantt': 1E4}  # every gantt bar is a separate patch in fcp and matplotlib alike
+SEED = 0
+CATEGORIES = [f'Cat{f}' for f in range(10)]
+TASKS = [f'Task{f:02d}' for f in range(50)]
+KW = dict(inline=False, save=True, theme='gray')
+
+
+def grid_kwargs(grid: tuple) -> dict:
+    """Row/column grouping kwargs for a subplot grid."""
+    return {} if grid == (1, 1) else {'row': 'Row', 'col': 'Col'}
+
+
+def grid_subsets(df: pd.DataFrame, grid: tuple):
+    """Subplots of the raw matplotlib baselines with the matching data subsets."""
+    fig, axes = plt.subplots(*grid, squeeze=False, figsize=(4 * grid[1], 4 * grid[0]))
+    for ir in range(grid[0]):
+        for ic in range(grid[1]):
+            sub = df if grid == (1, 1) else df.loc[(df['Row'] == ir) & (df['Col'] == ic)]
+            yield fig, axes[ir, ic], sub
+
+
+@lru_cache(maxsize=None)
+def make_data(kind: str, rows: int, grid: tuple) -> pd.DataFrame:
+    """Reproducible random data for a given plot type, number of rows, and subplot grid."""
+    rng = np.random.default_rng(SEED)
+    nplots = grid[0] * grid[1]
+
+    if kind in ['heatmap', 'imshow']:
+        # One square grid of rows / nplots cells per subplot
+        side = max(int(np.sqrt(rows / nplots)), 2)
+        yy, xx = np.mgrid[0:side, 0:side]
+        dfs = []
+        for iplot in range(nplots):
+            z = np.sin(xx / side * 6) * np.cos(yy / side * 4) + rng.normal(0, 0.1, xx.shape)
+            if kind == 'imshow':
+                sub = pd.DataFrame(z * 100 + 100)
+            else:
+                sub = pd.DataFrame({'x': xx.ravel(), 'y': yy.ravel(), 'z': z.ravel()})
+            sub['Row'], sub['Col'] = divmod(iplot, grid[1])
+            dfs += [sub]
+        return pd.concat(dfs)
+
+    df = pd.DataFrame({'Row': rng.integers(0, grid[0], rows), 'Col': rng.integers(0, grid[1], rows)})
+    if kind in ['plot', 'contour']:
+        df['x'] = rng.random(rows) * 10
+        df['y'] = rng.random(rows) * 10 if kind == 'contour' else np.sin(df['x']) + rng.normal(0, 0.2, rows)
+        df['z'] = np.sin(df['x']) * np.cos(df['y'])
+    elif kind == 'gantt':
+        df['Task'] = rng.choice(TASKS, rows)
+        start = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+        df['Start'] = start.strftime('%Y-%m-%d')
+        df['Stop'] = (start + pd.to_timedelta(rng.integers(1, 30, rows), unit='D')).strftime('%Y-%m-%d')
+    else:
+        df['Category'] = rng.choice(CATEGORIES, rows)
+        df['Value'] = rng.normal(10, 2, rows)
+        if kind in ['bar', 'pie']:
+            df['Value'] = df['Value'].abs()
+
+    return df
+
+
+def fcp_bar(df, grid, filename):
+    fcp.bar(df, x='Category', y='Value', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_boxplot(df, grid, filename):
+    fcp.boxplot(df, y='Value', groups='Category', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_contour(df, grid, filename):
+    fcp.contour(df, x='x', y='y', z='z', filled=True, filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_gantt(df, grid, filename):
+    fcp.gantt(df, x=['Start', 'Stop'], y='Task', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_heatmap(df, grid, filename):
+    # Fixed axes size; by default each heatmap cell gets a fixed size so the figure grows with the number of cells
+    fcp.heatmap(df, x='x', y='y', z='z', ax_size=[400, 400], filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_hist(df, grid, filename):
+    fcp.hist(df, x='Value', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_imshow(df, grid, filename):
+    fcp.imshow(df, cmap='inferno', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_nq(df, grid, filename):
+    fcp.nq(df, x='Value', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_pie(df, grid, filename):
+    fcp.pie(df, x='Category', y='Value', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def fcp_plot(df, grid, filename):
+    fcp.plot(df, x='x', y='y', filename=filename, **grid_kwargs(grid), **KW)
+
+
+def mpl_bar(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        vals = sub.groupby('Category')['Value'].sum()
+        ax.bar(vals.index, vals.values)
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_boxplot(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        groups = sub.groupby('Category')['Value']
+        ax.boxplot([gg.values for _, gg in groups], labels=list(groups.groups.keys()))
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_contour(df, grid, filename):
+    from scipy.interpolate import griddata
+    for fig, ax, sub in grid_subsets(df, grid):
+        xi = np.linspace(sub['x'].min(), sub['x'].max(), 100)
+        yi = np.linspace(sub['y'].min(), sub['y'].max(), 100)
+        zi = griddata((sub['x'], sub['y']), sub['z'], (xi[None, :], yi[:, None]), method='cubic')
+        fig.colorbar(ax.contourf(xi, yi, zi, 20), ax=ax)
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_gantt(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        ytick = sub['Task'].map({f: i for i, f in enumerate(TASKS)})
+        start = mpl.dates.date2num(pd.to_datetime(sub['Start']))
+        ax.barh(ytick, mpl.dates.date2num(pd.to_datetime(sub['Stop'])) - start, left=start, height=0.8)
+        ax.set_yticks(range(len(TASKS)), TASKS)
+        ax.xaxis_date()
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_heatmap(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        fig.colorbar(ax.imshow(sub.pivot(index='y', columns='x', values='z'), cmap='inferno'), ax=ax)
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_hist(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        ax.hist(sub['Value'], bins=20, histtype='step')
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_imshow(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        ax.imshow(sub.drop(columns=['Row', 'Col']).values, cmap='inferno')
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_nq(df, grid, filename):
+    from scipy.stats import norm
+    for fig, ax, sub in grid_subsets(df, grid):
+        sigma = np.linspace(-4, 4, 801)
+        ax.plot(sigma, np.quantile(sub['Value'], norm.cdf(sigma)), 'o', markerfacecolor='none')
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_pie(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        vals = sub.groupby('Category')['Value'].sum()
+        ax.pie(vals.values, labels=vals.index)
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def mpl_plot(df, grid, filename):
+    for fig, ax, sub in grid_subsets(df, grid):
+        ax.plot(sub['x'], sub['y'], 'o', markerfacecolor='none')
+    fig.savefig(filename)
+    plt.close(fig)
+
+
+def peak_memory(func, *args) -> int:
+    """Peak traced memory in bytes of a single call."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('engine', ['fcp', 'mpl'])
+@pytest.mark.parametrize('grid', GRIDS, ids=lambda f: f'{f[0]}x{f[1]}')
+@pytest.mark.parametrize('rows', [int(f) for f in ROWS])
+@pytest.mark.parametrize('kind', ['bar', 'boxplot', 'contour', 'gantt', 'heatmap', 'hist', 'imshow', 'nq', 'pie',
+                                  'plot'])
+def test_render(benchmark, tmp_path, kind, rows, grid, engine):
+    if rows > MAX_ROWS.get(kind, rows):
+        pytest.skip(f'{kind} is limited to {MAX_ROWS[kind]:.0e} rows')
+
+    df = make_data(kind, rows, grid)
+    func = globals()[f'{engine}_{kind}']
+    filename = str(tmp_path / f'{kind}.png')
+
+    benchmark.group = f'{kind}-{rows}-{grid[0]}x{grid[1]}'
+    benchmark.pedantic(func, args=(df, grid, filename), rounds=5 if rows <= 1E5 else 1, warmup_rounds=1)
+
+    # Measure memory after the warm-up so one-time imports and caches are not counted
+    benchmark.extra_info.update({'kind': kind, 'rows': rows, 'grid': f'{grid[0]}x{grid[1]}', 'engine': engine,
+                                 'peak_memory': peak_memory(func, df, grid, filename)})
+    plt.close('all')
@@ -81,3 +81,101 @@ def test_GroupingError():
         fcp.boxplot(df_box, y='Value', groups=['Sample', 'Batch', 'Region'], wrap='Region')
     with pytest.raises(data.GroupingError):
         fcp.boxplot(df_box, y='Value', groups=['Sample', 'Batch', 'Region'], col='Region')
+
+
+def test_subset_group_index():
+    dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', row='Boost Level', col='Temperature [C]',
+                     legend='Die')
+    for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
+        for ir, ic, df_rc in dd.get_rc_subset():
+            mask = (dd.df_fig['Boost Level'] == dd.row_vals[ir]) & (dd.df_fig['Temperature [C]'] == dd.col_vals[ic])
+            pd.testing.assert_frame_equal(df_rc, dd.df_fig[mask])
+            for iline, df_leg, x, y, z, leg_name, twin, ngroups in dd.get_plot_data(df_rc):
+                pd.testing.assert_frame_equal(df_leg, df_rc[df_rc['Die'] == leg_name])
+
+    dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', wrap=['Boost Level', 'Temperature [C]'])
+    for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
+        for ir, ic, df_rc in dd.get_rc_subset():
+            if ir * dd.ncol + ic > dd.nwrap - 1:
+                continue
+            boost, temp = dd.wrap_vals[ir * dd.ncol + ic]
+            mask = (dd.df_fig['Boost Level'] == boost) & (dd.df_fig['Temperature [C]'] == temp)
+            pd.testing.assert_frame_equal(df_rc, dd.df_fig[mask])
+
+
+def test_data_ranges_grouped_stats():
+    cases = [dict(wrap=['Temperature [C]', 'Boost Level'], share_x=False, share_y=False),
+             dict(wrap=['Temperature [C]', 'Boost Level'], share_x=False, share_y=False, ax_scale='logy'),
+             dict(row='Boost Level', col='Temperature [C]', share_x=False, share_y=False, ymax='q95'),
+             dict(row='Boost Level', col='Temperature [C]', share_row=True),
+             dict(row='Boost Level', col='Temperature [C]', share_col=True, legend='Die')]
+    for kw in cases:
+        # Ranges from the grouped stats table
+        dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', **kw)
+        ranges = [dd.ranges.tolist() for _, _, _, dd in dd.get_df_figure()]
+
+        # Ranges from each individual data subset
+        dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', **kw)
+        dd._get_range_groups = lambda: None
+        assert ranges == [dd.ranges.tolist() for _, _, _, dd in dd.get_df_figure()]
+
+
+def test_box_index_changes():
+    dd = fcp.data.Box(df=df_box.copy(), y='Value', groups=['Batch', 'Sample'])
+    dd.df_rc = dd.df_all
+    dd.get_box_index_changes()
+    keys = [(b, s) for (b, s), _ in df_box.groupby(['Batch', 'Sample'])]
+    assert list(dd.indices.itertuples(index=False, name=None)) == keys
+    batch = dd.indices[0].values
+    np.testing.assert_array_equal(dd.changes[0].values, np.r_[1, batch[1:] != batch[:-1]])
+    np.testing.assert_array_equal(dd.changes[1].values, 1)
+
+    # Repeated calls with the same groups reuse the cached result
+    changes = dd.changes
+    dd.get_box_index_changes()
+    assert dd.changes is changes
+
+
+def test_hist_shared_bins():
+    for shared in [False, True]:
+        dd = fcp.data.Histogram(df=df_box.copy(), x='Value', legend='Region', shared_bins=shared)
+        for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
+            for ir, ic, df_rc in dd.get_rc_subset():
+                hist = dd.df_hist(df_rc, dd.bin_ranges.get((ir, ic)))
+                for region, sub in df_rc.groupby('Region'):
+                    brange = [dd.ranges[ir, ic]['xmin'], dd.ranges[ir, ic]['xmax']] if shared else None
+                    counts, vals = np.histogram(sub['Value'].dropna(), bins=dd.bins, range=brange)
+                    np.testing.assert_array_equal(hist.loc[hist['Region'] == region, 'Counts'], counts)
+                    np.testing.assert_array_equal(hist.loc[hist['Region'] == region, 'Value'], vals[:-1])
+
+
+def test_transform():
+    # Elementwise and groupwise transforms of every group
+    dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', trans_x='abs', trans_y='flip', legend='Die')
+    for die, gg in df.groupby('Die'):
+        sub = dd.df_all.loc[dd.df_all['Die'] == die]
+        np.testing.assert_allclose(sub['Voltage'], gg['Voltage'].abs())
+        np.testing.assert_allclose(sub['I [A]'], (gg['I [A]'] - gg['I [A]'].max()).abs())
+
+    # Normal quantiles of every group
+    dd = fcp.data.NQ(df=df_box.copy(), x='Value', legend='Region')
+    for region, gg in df_box.groupby('Region'):
+        nq = fcp.utilities.nq(gg['Value'], 'Value')
+        pd.testing.assert_frame_equal(dd.df_all.loc[dd.df_all['Region'] == region, ['Sigma', 'Value']], nq)
+
+
+def test_fit_spline_groups():
+    # Batched spline fits of grouped curves match fitting each curve by itself
+    dd = fcp.data.XY(df=df.copy(), x='Voltage', y='I [A]', legend='Die', fit='spline',
+                     filter='Substrate=="Si" & Target Wavelength==450 & Boost Level==0.2')
+    for ifig, fig_item, fig_cols, dd in dd.get_df_figure():
+        for ir, ic, df_rc in dd.get_rc_subset():
+            groups = df_rc.groupby('Temperature [C]')
+            fits = dd.get_fit_data_groups(ir, ic, df_rc, 'Voltage', 'I [A]', groups.ngroup().values, groups.ngroups)
+            assert len(fits) == groups.ngroups
+            for (nn, gg), (fit, coeffs, rsq) in zip(groups, fits):
+                fit1, coeffs1, rsq1 = dd.get_fit_data(ir, ic, gg, 'Voltage', 'I [A]')
+                pd.testing.assert_frame_equal(fit, fit1)
+                assert coeffs == coeffs1 == []
+                assert rsq == rsq1
+                assert 0 < rsq <= 1
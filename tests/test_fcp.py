@@ -1,8 +1,11 @@
 import pytest
 import fivecentplots as fcp
+import fivecentplots.utilities as utl
 import pandas as pd
 import os
 import pdb
+import subprocess
+import sys
 from pathlib import Path
 osjoin = os.path.join
 db = pdb.set_trace
@@ -27,6 +30,50 @@ def test_bad_engine():
         fcp.plot(pd.DataFrame(), engine='v8', inline=False, save=False, show=False)
 
 
+def test_import_time():
+    # Optional/heavy dependencies must not load at import; the import itself gets a generous time budget
+    code = 'import sys, time; t = time.perf_counter(); import fivecentplots; t = time.perf_counter() - t; ' \
+           'print(t, [f for f in ["scipy", "cv2", "bokeh", "PIL", "matplotlib"] if f in sys.modules])'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+    assert out[1] == '[]'
+    assert float(out[0]) < 5
+
+
+def test_import_side_effects(tmp_path):
+    # Import must not write to the home directory or modify sys.path; theme values resolve on first use
+    code = 'import sys; path = list(sys.path); import fivecentplots as fcp; ' \
+           'print(sys.path == path, fcp.fcp_params["ax_fill_color"])'
+    env = dict(os.environ, HOME=str(tmp_path), USERPROFILE=str(tmp_path))
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, env=env)
+    assert out.stdout.split() == ['True', '#eaeaea']
+    assert not (tmp_path / '.fivecentplots').exists()
+
+
+def test_set_theme_fresh_home(tmp_path):
+    # set_theme must create the user theme directory on a home without ~/.fivecentplots
+    code = 'import fivecentplots as fcp; fcp.set_theme("gray")'
+    env = dict(os.environ, HOME=str(tmp_path), USERPROFILE=str(tmp_path))
+    subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, env=env)
+    assert (tmp_path / '.fivecentplots' / 'defaults.py').exists()
+
+
+def test_fit_batch(monkeypatch):
+    # All legend values x groups curves of a subplot are fit in one call
+    df_iv = pd.read_csv(Path(fcp.__file__).parent / 'test_data/fake_data.csv')
+    get_fit_data_groups = fcp.data.data.Data.get_fit_data_groups
+    calls = []
+
+    def recorded_fits(self, ir, ic, df, x, y, codes, ngroups):
+        calls.append(ngroups)
+        return get_fit_data_groups(self, ir, ic, df, x, y, codes, ngroups)
+
+    monkeypatch.setattr(fcp.data.data.Data, 'get_fit_data_groups', recorded_fits)
+    fcp.plot(df_iv, x='Voltage', y='I [A]', legend='Die', groups='Temperature [C]', fit=1,
+             filter='Substrate=="Si" & Target Wavelength==450 & Boost Level==0.2',
+             inline=False, save=False, show=False)
+    assert calls == [6]
+
+
 def test_filepaths():
     filepath = fcp.plot(df, x='x', y='y', return_filename=True, inline=False, save=True, show=False)
     vals = filepath.split(os.sep)
@@ -47,6 +94,51 @@ def test_save_data():
     os.remove('y vs x.csv')
 
 
+def test_profile(tmp_path, capsys):
+    prof = utl.Profiler()
+    df2 = df.assign(Die=(df.index % 3).astype(str))
+    fcp.plot(df2, x='x', y='y', col='Die', inline=False, save=False, show=False, profile=prof)
+    spans = prof.df
+    assert spans['name'].iloc[0] == 'XY'
+    assert len(spans.loc[spans['name'] == 'figure']) == 1
+    assert len(spans.loc[spans['name'] == 'subplot']) == 3
+    assert 'XY/figure/subplot/plot_xy/Layout.plot_xy' in spans['path'].values
+    assert 'set_axes_ticks' in prof.summary().index
+
+    fcp.plot(df, x='x', y='y', inline=False, save=False, show=False, profile=tmp_path / 'fcp.trace.json')
+    assert (tmp_path / 'fcp.trace.json').exists()
+
+    fcp.plot(df, x='x', y='y', inline=False, save=False, show=False, timer=True)
+    out, err = capsys.readouterr()
+    assert 'set_axes_ticks: ' in out
+    assert 'Total time: ' in out
+
+
+def test_batch(tmp_path):
+    df2 = df.assign(Die=(df.index % 3).astype(str), Lot=(df.index % 2).astype(str))
+    specs = [('plot', dict(x='x', y='y', legend='Die', filter='x < 0')),
+             ('plot', dict(x='x', y='y', wrap='Die', filter='Lot=="1"')),
+             ('hist', dict(x='y', col='Lot', legend='Die')),
+             ('bar', dict(x='Die', y='y', filter='x < 0'))]
+
+    batch = fcp.Batch(df2, inline=False, save=True)
+    batch.render([(name, dict(kw, filename=str(tmp_path / f'b{i}.png'))) for i, (name, kw) in enumerate(specs)])
+    batch.render([(name, dict(kw, filename=str(tmp_path / f'w{i}.png'))) for i, (name, kw) in enumerate(specs)],
+                 workers=2)
+    for i, (name, kw) in enumerate(specs):
+        getattr(fcp, name)(df2, filename=str(tmp_path / f'a{i}.png'), inline=False, save=True, **kw)
+        assert (tmp_path / f'a{i}.png').read_bytes() == (tmp_path / f'b{i}.png').read_bytes()
+        assert (tmp_path / f'a{i}.png').read_bytes() == (tmp_path / f'w{i}.png').read_bytes()
+
+    # filters and groups are computed once per session
+    assert list(batch._masks.keys()) == ['x < 0', 'Lot=="1"']
+    assert batch.get_group_vals('x < 0', 'Die') == ['0', '1', '2']
+    assert len(batch.df_filter(batch.df, 'x < 0')) == 174
+
+    with pytest.raises(ValueError):
+        batch.render([('scatter', {})])
+
+
 def test_debug(capsys):
     fcp.plot(df, x='x', y='y', inline=False, save=False, show=False, debug_size=True)
     out, err = capsys.readouterr()
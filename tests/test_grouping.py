@@ -678,6 +678,45 @@ def test_figure(master=False, remove=True, show=False):
             assert not compare
 
 
+def test_figure_workers(master=False, remove=True, show=False):
+
+    name = 'figure_workers'
+    if master:
+        return
+
+    # Make the plot in parallel (should match the serial figure plot)
+    filenames = fcp.plot(df1, x='Voltage', y='I [A]', fig_groups='Die', wrap=['Temperature [C]', 'Boost Level'],
+                         ax_size=[225, 225], filter='Substrate=="Si" & Target Wavelength==450',
+                         save=True, inline=False, filename=name + '.png', workers=2)
+    assert len(filenames) == len(df1.Die.unique())
+
+    # Compare with master
+    for die in df1.Die.unique():
+        tag = ' where %s=%s' % ('Die', die)
+        assert os.path.abspath(name + tag + '.png') in filenames
+        if show:
+            utl.show_file(osjoin(MASTER, 'figure_master' + tag + '.png'))
+            utl.show_file(name + tag + '.png')
+            continue
+        compare = utl.img_compare(name + tag + '.png', osjoin(MASTER, 'figure_master' + tag + '.png'))
+        if remove:
+            os.remove(name + tag + '.png')
+
+        assert not compare
+
+
+def test_figure_workers_save_data(tmp_path):
+    # The saved data file is named after the figure even if a directory name contains a dot
+    filepath = tmp_path / 'a.b'
+    filepath.mkdir()
+    filenames = fcp.plot(df1, x='Voltage', y='I [A]', fig_groups='Die', filter='Substrate=="Si"',
+                         save=True, inline=False, filepath=str(filepath), filename='workers.png', save_data=True,
+                         workers=2)
+    csv = Path(os.path.splitext(filenames[-1])[0] + '.csv')
+    assert csv.parent == filepath
+    assert len(pd.read_csv(csv)) == len(df1.query('Substrate=="Si"'))
+
+
 def test_figure2(master=False, remove=True, show=False):
 
     name = osjoin(MASTER, 'figure2_master') if master else 'figure2'
@@ -802,6 +802,24 @@ def test_patch_solid(benchmark):
     benchmark(plt_patch_solid, True)
 
 
+def test_stream(tmp_path):
+    # Chunks counted one at a time render the same as the full DataFrame
+    chunks = [df.iloc[ii:ii + 100] for ii in range(0, len(df), 100)]
+    fcp.hist(chunks, x='Value', legend='Region', filename=tmp_path / 'stream.png')
+    fcp.hist(df, x='Value', legend='Region', shared_bins=True, filename=tmp_path / 'full.png')
+    assert not utl.img_compare(tmp_path / 'stream.png', tmp_path / 'full.png')
+
+    # The filter is applied to every chunk before counting
+    fcp.hist(chunks, x='Value', legend='Region', filter='Batch==101', filename=tmp_path / 'stream_filt.png')
+    fcp.hist(df, x='Value', legend='Region', filter='Batch==101', shared_bins=True,
+             filename=tmp_path / 'full_filt.png')
+    assert not utl.img_compare(tmp_path / 'stream_filt.png', tmp_path / 'full_filt.png')
+    assert utl.img_compare(tmp_path / 'stream_filt.png', tmp_path / 'stream.png')
+
+    with pytest.raises(ValueError):
+        fcp.hist(chunks, x='Value', filter='Nope=="a"', filename=tmp_path / 'bad.png')
+
+
 def test_invalid():
 
     with pytest.raises(data.GroupingError):
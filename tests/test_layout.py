@@ -20,6 +20,30 @@ def test_init_intervals():
         fcp.plot(df, x='x', y='y', perc_int=[0.25])
 
 
+def test_init_decimate():
+    with pytest.raises(ValueError):
+        fcp.plot(df, x='x', y='y', decimate='every_other')
+
+
+def test_decimate_zoom(tmp_path):
+    import imageio
+
+    # decimating a zoomed plot draws the same curve as the full data inside the axes limits
+    x = np.arange(200000, dtype=float)
+    df_sine = pd.DataFrame({'x': x, 'y': np.sin(x / 50)})
+    extents = []
+    for decimate in [False, True]:
+        filename = str(tmp_path / f'decimate_{decimate}.png')
+        fcp.plot(df_sine, x='x', y='y', decimate=decimate, xmin=0, xmax=2000, markers=False, lines=True,
+                 show=False, save=True, inline=False, filename=filename)
+        img = imageio.imread(filename).astype(int)
+        line = img[..., 2] - img[..., 0] > 40
+        cols = np.flatnonzero(line.any(0))
+        extents += [(cols, [np.flatnonzero(line[:, f])[[0, -1]] for f in cols])]
+    np.testing.assert_array_equal(extents[0][0], extents[1][0])
+    assert np.abs(np.array(extents[0][1]) - np.array(extents[1][1])).max() <= 2
+
+
 def test_element():
     ele = layout.Element()
     with pytest.raises(ValueError):
@@ -60,3 +84,124 @@ def test_object_array():
 
     obj.reshape(4, 2)
     assert obj.obj[2, 1] == 3.0
+
+
+def test_size_table():
+    ele = layout.Element()
+    ele.size_all = (0, 0, 0, 0, 10, 5, 0, 10, 0, 5, np.nan)
+    ele.size_all = ([0, 1], [1, 0], 0, 0, [20, 30], [6, 7], [1, 2], [21, 32], [0, 0], [6, 7], np.nan)
+    ele.size_all = (0, 1, 1, 0, 40, 8, 3, 43, 0, 8, np.nan)
+    assert len(ele.size_all) == 4
+    assert list(ele.size_all.columns) == ele.size_cols
+    assert ele.size_all.width.tolist() == [10, 20, 30, 40]
+
+    # per-axes rows match filtering the DataFrame
+    for ir, ic in [(0, 0), (0, 1), (1, 0)]:
+        expected = ele.size_all[(ele.size_all.ir == ir) & (ele.size_all.ic == ic)]
+        np.testing.assert_array_equal(ele.size_all_axes(ir, ic), np.array(expected))
+    assert len(ele.size_all_axes(1, 1)) == 0
+
+    ele.size_all_reset()
+    assert len(ele.size_all) == 0
+    assert len(ele.size_all_axes(0, 0)) == 0
+
+
+def test_hide_overlaps():
+    import matplotlib.text
+    import fivecentplots.engines.mpl as mpl_engine
+
+    # 9 evenly spaced tick labels that each overlap the next two labels
+    ticks = layout.Element()
+    ticks.obj = np.empty((1, 1), dtype=object)
+    ticks.obj[0, 0] = [matplotlib.text.Text() for f in range(9)]
+    centers = np.arange(9) * 10.
+    ticks.size_all = (0, 0, 0, 0, 25, 10, centers - 12.5, centers + 12.5, 0, 10, np.nan)
+    tt = mpl_engine.tick_extents(ticks, ticks.size_all_axes(0, 0), 'x')
+    visible = mpl_engine.hide_overlaps(ticks, tt, 0, 0)
+    np.testing.assert_array_equal(np.flatnonzero(visible), [0, 4, 8])
+    assert [f.get_visible() for f in ticks.obj[0, 0]] == [f in [0, 4, 8] for f in range(9)]
+
+    # minor tick labels that touch or cover a visible major tick label are hidden
+    ticksm = layout.Element()
+    ticksm.obj = np.empty((1, 1), dtype=object)
+    ticksm.obj[0, 0] = [matplotlib.text.Text() for f in range(3)]
+    ticksm.size_all = (0, 0, 0, 0, [4, 4, 60], 10, [10, 20, 30], [14, 24, 90], 0, 10, np.nan)
+    ttm = mpl_engine.tick_extents(ticksm, ticksm.size_all_axes(0, 0), 'x')
+    visiblem = mpl_engine.hide_overlaps_major_minor(ticksm, tt, visible, ttm, 0, 0)
+    np.testing.assert_array_equal(visiblem, [False, True, False])
+
+
+def test_draw_for_measurement(monkeypatch):
+    import fivecentplots.engines.mpl as mpl_engine
+    draw_for_measurement = mpl_engine.Layout._draw_for_measurement
+    get_element_sizes = mpl_engine.Layout._get_element_sizes
+    sizes = []
+
+    def artists(lay):
+        return [f for ax in lay.fig.obj.axes for f in list(ax.lines) + list(ax.collections) + list(ax.images)]
+
+    def failed_draw():
+        raise RuntimeError('draw failed')
+
+    def checked_draw(self):
+        # only figures with axes placed at draw time (images) are drawn; the data artists are visible again after
+        # the pre-draw, even if the draw fails
+        visible = [f.get_visible() for f in artists(self)]
+        assert any(visible)
+        draw_for_measurement(self)
+        assert [f.get_visible() for f in artists(self)] == visible
+        self.fig.obj.canvas.draw = failed_draw
+        try:
+            if len(self.fig.obj.axes[0].images) > 0:
+                with pytest.raises(RuntimeError):
+                    draw_for_measurement(self)
+            else:
+                draw_for_measurement(self)
+        finally:
+            del self.fig.obj.canvas.draw
+        assert [f.get_visible() for f in artists(self)] == visible
+
+    def recorded_sizes(self, data):
+        data = get_element_sizes(self, data)
+        sizes.append([self.label_x.size, self.label_y.size, self.legend.size, self.title.size,
+                      self.tick_labels_major_x.size_all.copy(), self.tick_labels_major_y.size_all.copy()])
+        return data
+
+    monkeypatch.setattr(mpl_engine.Layout, '_get_element_sizes', recorded_sizes)
+    kwargs = dict(x='Sample', y='Value', legend='Batch', title='Measure', show=False, save=False, inline=False)
+    monkeypatch.setattr(mpl_engine.Layout, '_draw_for_measurement', checked_draw)
+    fcp.plot(df_box, **kwargs)
+    fcp.imshow(pd.DataFrame(np.arange(100).reshape(10, 10)), show=False, save=False, inline=False)
+
+    # repeated text is measured once
+    cached = len(mpl_engine.TEXT_EXTENTS)
+    assert cached > 0
+    fcp.plot(df_box, **kwargs)
+    assert len(mpl_engine.TEXT_EXTENTS) == cached
+
+    # the element sizes from the text metrics cache match a full draw of the figure
+    monkeypatch.setattr(mpl_engine.Layout, '_draw_for_measurement', lambda self: self.fig.obj.canvas.draw())
+    monkeypatch.setattr(mpl_engine, 'TEXT_EXTENTS', {})
+    fcp.plot(df_box, **kwargs)
+    partial, full = sizes[0], sizes[-1]
+    assert partial[:4] == full[:4]
+    pd.testing.assert_frame_equal(partial[4], full[4])
+    pd.testing.assert_frame_equal(partial[5], full[5])
+
+
+def test_density_dpi(monkeypatch):
+    import fivecentplots.engines.mpl as mpl_engine
+    plot_density = mpl_engine.Layout.plot_density
+    images = []
+
+    def recorded_density(self, *args, **kwargs):
+        images.append((plot_density(self, *args, **kwargs), self))
+        return images[-1][0]
+
+    # the density grid has one bin per rendered axes pixel at the figure dpi
+    monkeypatch.setattr(mpl_engine.Layout, 'plot_density', recorded_density)
+    for dpi in [100, 200]:
+        fcp.plot(df, x='x', y='y', density=True, dpi=dpi, show=False, save=False, inline=False)
+        img, lay = images[-1]
+        bbox = lay.axes.obj[0, 0].get_window_extent()
+        assert img.get_array().shape == (round(bbox.height), round(bbox.width))
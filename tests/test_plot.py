@@ -127,6 +127,59 @@ def plt_xy_scatter_swap(bm=False, master=False, remove=True, show=False):
         assert not compare
 
 
+def plt_xy_density(bm=False, master=False, remove=True, show=False):
+
+    name = osjoin(MASTER, 'xy_density_master') if master else 'xy_density'
+
+    # Make the plot
+    fcp.plot(df, x='Voltage', y='I [A]', legend='Die', density=True, show=SHOW, ymax=1.4,
+             filter='Substrate=="Si" & Target Wavelength==450 & Boost Level==0.2',
+             filename=name + '.png', save=not bm, inline=False)
+    if bm:
+        return
+
+    # Compare with master
+    if master:
+        return
+    elif show:
+        utl.show_file(osjoin(MASTER, name + '_master.png'))
+        utl.show_file(name + '.png')
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, name + '_master.png'), show=True)
+    else:
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, name + '_master.png'))
+        if remove:
+            os.remove(name + '.png')
+
+        assert not compare
+
+
+def plt_xy_density_categorical(bm=False, master=False, remove=True, show=False):
+
+    # Shares the xy_categorical master
+    if master:
+        return
+    name = 'xy_density_categorical'
+
+    # Make the plot (non-numeric axes fall back to markers so this matches the plain categorical plot)
+    fcp.plot(df, x='Die', y='I [A]', density=True, show=SHOW,
+             filter='Substrate=="Si" & Target Wavelength==450 & Boost Level==0.2 & Temperature [C]==25 & Voltage==1.5',
+             filename=name + '.png', save=not bm, inline=False)
+    if bm:
+        return
+
+    # Compare with master
+    if show:
+        utl.show_file(osjoin(MASTER, 'xy_categorical_master.png'))
+        utl.show_file(name + '.png')
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, 'xy_categorical_master.png'), show=True)
+    else:
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, 'xy_categorical_master.png'))
+        if remove:
+            os.remove(name + '.png')
+
+        assert not compare
+
+
 def plt_xy_legend(bm=False, master=False, remove=True, show=False):
 
     name = osjoin(MASTER, 'xy_legend_master') if master else 'xy_legend'
@@ -928,6 +981,33 @@ def plt_other_curve_fitting_legend2(bm=False, master=False, remove=True, show=Fa
         assert not compare
 
 
+def plt_other_curve_fitting_spline(bm=False, master=False, remove=True, show=False):
+
+    name = osjoin(MASTER, 'other_curve-fitting_spline_master') if master else 'other_curve-fitting_spline'
+
+    # Make the plot
+    fcp.plot(df, x='Voltage', y='I [A]', title='IV Data', lines=False, show=SHOW, legend='Die',
+             groups='Temperature [C]', filter='Substrate=="Si" & Target Wavelength==450 & Boost Level==0.2',
+             fit='spline', fit_rsq=True, fit_font_size=9, xmax=1.6,
+             filename=name + '.png', save=not bm, inline=False)
+    if bm:
+        return
+
+    # Compare with master
+    if master:
+        return
+    elif show:
+        utl.show_file(osjoin(MASTER, name + '_master.png'))
+        utl.show_file(name + '.png')
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, name + '_master.png'), show=True)
+    else:
+        compare = utl.img_compare(name + '.png', osjoin(MASTER, name + '_master.png'))
+        if remove:
+            os.remove(name + '.png')
+
+        assert not compare
+
+
 def plt_other_stat_bad(bm=False, master=False, remove=True, show=False):
 
     name = osjoin(MASTER, 'other_stat-lines-bad_master') if master else 'other_stat-lines-bad'
@@ -1597,6 +1677,11 @@ def test_other_curve_fitting_range(benchmark):
     benchmark(plt_other_curve_fitting_range, True)
 
 
+def test_other_curve_fitting_spline(benchmark):
+    plt_other_curve_fitting_spline()
+    benchmark(plt_other_curve_fitting_spline, True)
+
+
 def test_other_lcl_only(benchmark):
     plt_other_lcl_only()
     benchmark(plt_other_lcl_only, True)
@@ -1764,6 +1849,16 @@ def test_xy_categorical(benchmark):
     benchmark(plt_xy_categorical, True)
 
 
+def test_xy_density(benchmark):
+    plt_xy_density()
+    benchmark(plt_xy_density, True)
+
+
+def test_xy_density_categorical(benchmark):
+    plt_xy_density_categorical()
+    benchmark(plt_xy_density_categorical, True)
+
+
 def test_xy_legend(benchmark):
     plt_xy_legend()
     benchmark(plt_xy_legend, True)
@@ -1,14 +1,16 @@
+import pytest
 import imageio
 import fivecentplots as fcp
 import numpy as np
 import pandas as pd
 import os
+import sys
 import pdb
 from pathlib import Path
+from natsort import natsorted
 import fivecentplots.utilities as utl
 import fivecentplots.data as data
 import fivecentplots.engines.layout as layout
-import pytest
 osjoin = os.path.join
 db = pdb.set_trace
 
@@ -34,21 +36,41 @@ def test_repeated_list():
     assert test[(0, 1)] == -1
 
 
-def test_timer():
-    test = utl.Timer()
-    assert test.get() is None
-    test.start()
-    test.get('hi')
-    assert test.total > 0
-    test.stop()
-
-    test = utl.Timer(start=True, units='ms', print=True)
-    test.get('hi', stop=True)
-    assert test.total > 0
-    test.get_total()
-
+def test_profiler(tmp_path):
+    test = utl.Profiler(enabled=False)
+    with test.span('hi'):
+        pass
+    assert len(test.spans) == 0
+    assert len(test.df) == 0
+
+    test = utl.Profiler(memory=True, print=True)
+    with test:
+        with test.span('outer', ifig=0):
+            with test.span('inner'):
+                junk = [0] * 10000  # noqa
+            with test.span('inner'):
+                pass
+    df = test.df
+    assert list(df['name']) == ['outer', 'inner', 'inner']
+    assert list(df['path']) == ['outer', 'outer/inner', 'outer/inner']
+    assert list(df['parent']) == [-1, 0, 0]
+    assert df['duration'].iloc[0] >= df['duration'].iloc[1:].sum()
+    np.testing.assert_almost_equal(df['self_time'].iloc[0], df['duration'].iloc[0] - df['duration'].iloc[1:].sum())
+    assert df['memory'].iloc[1] > 0
+    assert df['ifig'].iloc[0] == 0
+    assert test.total == df['duration'].iloc[0]
+    assert test.summary().loc['inner', 'calls'] == 2
+
+    trace = test.to_chrome_trace(tmp_path / 'test.trace.json')
+    assert [f['ph'] for f in trace['traceEvents']] == ['X'] * 3
+    assert trace['traceEvents'][0]['args']['ifig'] == 0
+    test.save(tmp_path / 'test.json')
+    assert len(pd.read_json(tmp_path / 'test.json')) == 3
     with pytest.raises(ValueError):
-        test = utl.Timer(start=True, units='gas')
+        test.save(tmp_path / 'test.txt')
+
+    test.reset()
+    assert len(test.spans) == 0
 
 
 def test_ci(df):
@@ -56,6 +78,41 @@ def test_ci(df):
     assert np.isnan(utl.ci(pd.Series())[0])
 
 
+def test_decimate():
+    x = np.arange(100000)
+    y = np.sin(x / 1000) + np.random.default_rng(0).normal(0, 0.1, len(x))
+    y[5000] = 10
+    y[60000] = np.nan
+
+    # minmax keeps the extremes of each pixel column plus any non-finite points
+    idx = utl.decimate(x, y, [200, 100])
+    assert len(idx) <= 4 * 200 + 1
+    assert np.all(np.diff(idx) > 0)
+    assert 5000 in idx and 60000 in idx and 0 in idx and len(x) - 1 in idx
+    assert np.nanmin(y[idx]) == np.nanmin(y) and np.nanmax(y[idx]) == np.nanmax(y)
+
+    # lttb keeps two points per pixel column
+    idx = utl.decimate(x, y, [200, 100], 'lttb')
+    assert len(idx) == 2 * 200 + 1
+    assert 5000 in idx
+
+    # one marker per occupied pixel
+    idx = utl.decimate(pd.Series(x), pd.Series(y), [200, 100], 'pixel')
+    assert len(idx) <= 200 * 100 + 1
+
+    # only the visible window is binned; its neighbors outside the limits keep the line connected
+    idx = utl.decimate(x, y, [2, 1], xlim=[10000, 20000], dpi=100)
+    assert idx.min() == 9999 and 20001 in idx and 60000 in idx
+    assert len(idx) <= 4 * 200 + 3
+    assert np.max(y[idx][(x[idx] >= 10000) & (x[idx] <= 20000)]) == y[10000:20001].max()
+    np.testing.assert_array_equal(utl.decimate(x, y, [200, 100], xlim=[1000, 1099]),
+                                  np.union1d(np.arange(999, 1101), [60000]))
+
+    # small or non-numeric data is not decimated
+    np.testing.assert_array_equal(utl.decimate(x[:100], y[:100], [200, 100]), np.arange(100))
+    np.testing.assert_array_equal(utl.decimate(np.array(['a'] * 1000), y[:1000], [200, 100]), np.arange(1000))
+
+
 def test_dfkwarg(df):
     kwargs = utl.dfkwarg(df, {})
     assert 'df' in kwargs
@@ -83,6 +140,13 @@ def test_df_filter(df):
     df_bad = utl.df_filter(df_.copy(), 'boom="yo"')
     pd.testing.assert_frame_equal(df_, df_bad)
 
+    # repeated filters reuse the parsed expression and never modify the input
+    cols = list(df_.columns)
+    hits = utl._df_filter_parse.cache_info().hits
+    assert len(utl.df_filter(df_, 'hi (%)==1')) == 21
+    assert utl._df_filter_parse.cache_info().hits > hits
+    assert list(df_.columns) == cols
+
 
 def test_df_from_array2d():
     array = utl.df_from_array2d(np.zeros((5, 5)))
@@ -155,6 +219,152 @@ def test_get_decimals():
     assert utl.get_decimals(1.3420001, max_places=2) == 1
 
 
+def test_group_hist():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(-1, 4, 1000)  # -1 is not in a group
+    values = rng.normal(codes, 1)
+    values[::50] = np.nan
+    values[codes == 2] = 5  # all values equal
+
+    for bins, brange in [(20, None), (7, [-1, 2]), (np.linspace(-3, 3, 10), None)]:
+        for density in [False, True]:
+            counts, edges = utl.group_hist(values, codes, 4, bins, brange, density)
+            assert counts.shape == (4, len(edges[0]) - 1)
+            for ii in range(4):
+                vals = values[(codes == ii) & ~np.isnan(values)]
+                ref_counts, ref_edges = np.histogram(vals, bins, range=brange, density=density)
+                np.testing.assert_array_equal(edges[ii], ref_edges)
+                np.testing.assert_allclose(counts[ii], ref_counts)
+
+    # Weighted counts
+    weights = rng.random(1000)
+    counts, edges = utl.group_hist(values, codes, 4, 20, [-3, 3], weights=weights)
+    for ii in range(4):
+        keep = (codes == ii) & ~np.isnan(values)
+        np.testing.assert_allclose(counts[ii], np.histogram(values[keep], 20, (-3, 3), weights=weights[keep])[0])
+
+
+def test_hist_stream(tmp_path):
+    rng = np.random.default_rng(0)
+    chunks = [pd.DataFrame({'Value': rng.normal(0, 1, 1000), 'Group': rng.choice(['a', 'b'], 1000)})
+              for ii in range(5)]
+    df = pd.concat(chunks)
+
+    # Two-pass global range matches np.histogram of all the data
+    for source in [chunks, lambda: iter(chunks)]:
+        hist = utl.hist_stream(source, 'Value', 'Group', 20)
+        edges = hist.attrs['bins']
+        for group in ['a', 'b']:
+            ref_counts, ref_edges = np.histogram(df.loc[df.Group == group, 'Value'], 20,
+                                                 (df.Value.min(), df.Value.max()))
+            np.testing.assert_allclose(edges, ref_edges)
+            np.testing.assert_array_equal(hist.loc[hist.Group == group, 'Counts'].values[1:-1], ref_counts)
+    assert hist.Value.min() == df.Value.min() and hist.Value.max() == df.Value.max()
+
+    # Files, fixed edges, and numpy chunks
+    df.to_csv(tmp_path / 'data.csv', index=False)
+    hist = utl.hist_stream(tmp_path / 'data.csv', 'Value', bins=np.linspace(-2, 2, 9), chunksize=700)
+    np.testing.assert_array_equal(hist.Counts.values[1:-1], np.histogram(df.Value, np.linspace(-2, 2, 9))[0])
+    arrays = [rng.integers(0, 100, (50, 50)) for ii in range(3)]
+    hist = utl.hist_stream(iter(arrays), bins=10, brange=[0, 100])
+    np.testing.assert_array_equal(hist.Counts.values[1:-1], np.histogram(arrays, 10, (0, 100))[0])
+
+    # A one-time iterator cannot be read twice to find the range
+    with pytest.raises(ValueError):
+        utl.hist_stream(iter(chunks), 'Value')
+
+
+def test_group_polyfit():
+    rng = np.random.default_rng(0)
+    codes = np.repeat([0, 1, 3], [50, 2, 100])  # group 2 is empty and group 1 has only two points
+    x = rng.random(len(codes)) * 10 + 100
+    y = 0.5 * x**2 - x + rng.normal(0, 1, len(x))
+
+    coeffs, rsq = utl.group_polyfit(x, y, codes, 4, 2)
+    assert coeffs.shape == (4, 3)
+    assert np.isnan(coeffs[2]).all() and np.isnan(rsq[2])
+    for ii in [0, 3]:
+        xx, yy = x[codes == ii], y[codes == ii]
+        ref = np.polyfit(xx, yy, 2)
+        np.testing.assert_allclose(np.polyval(coeffs[ii], xx), np.polyval(ref, xx), rtol=1e-9)
+        yval = np.polyval(ref, xx)
+        assert rsq[ii] == pytest.approx(np.sum((yval - yy.mean())**2) / np.sum((yy - yy.mean())**2))
+
+    # Underdetermined groups still pass through their points
+    np.testing.assert_allclose(np.polyval(coeffs[1], x[codes == 1]), y[codes == 1])
+
+
+def test_group_quantile():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 4, 1000)
+    codes = codes[codes != 2]  # group 2 is empty
+    values = rng.normal(0, 1, len(codes))
+
+    q = np.array([0.1, 0.5, 0.7, 0.99])
+    for qq in [0.25, q]:
+        result = utl.group_quantile(values, codes, 4, qq)
+        assert np.isnan(result[2])
+        for ii in [0, 1, 3]:
+            assert result[ii] == pytest.approx(np.percentile(values[codes == ii], np.broadcast_to(qq, 4)[ii] * 100))
+
+
+def test_group_stats():
+    from matplotlib import cbook
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 5, 1000)
+    codes = codes[codes != 3]  # group 3 is empty
+    values = np.round(rng.normal(0, 1, len(codes)), 1)
+
+    stats = utl.group_stats(values, codes, 5, quantiles=[0.9], conf_coeff=0.95)
+    assert len(stats) == 5
+    assert stats.loc[3, 'count'] == 0 and np.isnan(stats.loc[3, 'med'])
+    for ii in [0, 1, 2, 4]:
+        vals = pd.Series(values[codes == ii])
+        ref = cbook.boxplot_stats([vals.values])[0]
+        for key in ['q1', 'med', 'q3', 'iqr', 'whislo', 'whishi', 'cilo', 'cihi', 'mean']:
+            np.testing.assert_almost_equal(stats.loc[ii, key], ref[key])
+        np.testing.assert_almost_equal(stats.loc[ii, 'std'], vals.std())
+        np.testing.assert_almost_equal(stats.loc[ii, 'q0.9'], vals.quantile(0.9))
+        np.testing.assert_almost_equal(stats.loc[ii, ['ci_low', 'ci_high']].values, utl.ci(vals))
+
+
+def test_group_vals():
+    df_ = pd.DataFrame({'Die': ['d10', 'd2', np.nan, 'd1', 'd2'], 'Lot': [2, 1, 1, 2, 1]})
+    assert utl.group_vals(df_, 'Die') == ['d1', 'd2', 'd10']
+    assert utl.group_vals(df_, ['Die'], sort=False) == ['d10', 'd2', 'd1']
+
+    # same values as the keys of a groupby
+    for cols in ['Die', 'Lot', ['Lot', 'Die']]:
+        assert utl.group_vals(df_, cols) == natsorted(list(df_.groupby(cols).groups.keys()))
+        assert utl.group_vals(df_, cols, sort=False) == list(df_.groupby(cols, sort=False).groups.keys())
+
+
+def test_kde():
+    import scipy.stats
+    rng = np.random.default_rng(0)
+    values = np.r_[rng.normal(0, 1, 5000), rng.normal(6, 0.5, 5000)]
+    x0 = np.linspace(-4, 9, 500)
+    for bw in ['scott', 'silverman', 0.2]:
+        ref = scipy.stats.gaussian_kde(values, bw_method=bw)(x0)
+        np.testing.assert_allclose(utl.kde(values, x0, bw_method=bw), ref, atol=1e-4 * ref.max())
+
+    # Batched groups with their own evaluation points; constant groups are nan
+    values = np.r_[values, 1, 1, 1]
+    codes = np.repeat([0, 1, 2], [5000, 5000, 3])
+    points = np.array([np.linspace(-4, 4, 100), np.linspace(3, 9, 100), np.linspace(0, 2, 100)])
+    density = utl.kde(values, points, codes)
+    assert density.shape == (3, 100)
+    for ii in range(2):
+        ref = scipy.stats.gaussian_kde(values[codes == ii])(points[ii])
+        np.testing.assert_allclose(density[ii], ref, atol=1e-4 * ref.max())
+    assert np.isnan(density[2]).all()
+
+    # Weighted values
+    weights = rng.random(len(values))
+    ref = scipy.stats.gaussian_kde(values, weights=weights)(x0)
+    np.testing.assert_allclose(utl.kde(values, x0, weights=weights), ref, atol=1e-4 * ref.max())
+
+
 def test_get_text_dimensions():
     dim = (208.125, 16.875)
     assert utl.get_text_dimensions('no alarms and no surprises', 'Deja Vu Sans', 12, 'normal', 'bold') == dim
@@ -241,6 +451,25 @@ def test_reload_defaults():
     assert fcp_params['ax_fill_color'] == '#eaeaea'
 
 
+def test_reload_defaults_cache(tmp_path):
+    theme = tmp_path / 'my_theme.py'
+    theme.write_text("fcp_params = {'ax_fill_color': '#111111'}\ncolors = ['#000000']\n")
+    path = list(sys.path)
+
+    fcp_params, colors, markers, rcParams = utl.reload_defaults(theme)
+    assert fcp_params['ax_fill_color'] == '#111111' and colors == ['#000000'] and rcParams == {}
+    assert sys.path == path
+
+    # returned values are copies of the cached theme
+    fcp_params['ax_fill_color'] = '#222222'
+    assert utl.reload_defaults(theme)[0]['ax_fill_color'] == '#111111'
+
+    # editing the theme file invalidates the cache
+    theme.write_text("fcp_params = {'ax_fill_color': '#333333'}\n")
+    os.utime(theme, ns=(theme.stat().st_atime_ns, theme.stat().st_mtime_ns + 10**9))
+    assert utl.reload_defaults(theme)[0]['ax_fill_color'] == '#333333'
+
+
 def test_see():
     obj = layout.Element('boss')
     assert utl.see(obj).set_index('Attribute').loc['name'].iloc[0] == 'boss'